@@ -0,0 +1,63 @@
+"""
+Import-time benchmark of irodsrulewrapper.rule, based on 'python -X importtime'. Each run is a fresh interpreter.
+It reports the median import time, the slowest modules (cumulative time) and checks that the deferred work (SSL
+context, process pool, users and groups store warm start) did not happen at import.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 10] [--top 15] [--max-ms 250]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULE = "irodsrulewrapper.rule"
+
+# Executed after the import: fails if some deferred work happened at import
+DEFERRED_CHECK = """
+import sys
+import irodsrulewrapper.rule
+from irodsrulewrapper.utils import BaseRuleManager
+assert BaseRuleManager.__dict__["ssl_context"].context is None, "the SSL context is created at import"
+assert "concurrent.futures.process" not in sys.modules, "the process pool is imported at import"
+"""
+
+
+def run_importtime():
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"], capture_output=True, text=True, check=True
+    )
+    # Lines: "import time: self [us] | cumulative | imported package"
+    timings = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Import-time benchmark of {MODULE}.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the median import time is above")
+    args = parser.parse_args(argv)
+
+    subprocess.run([sys.executable, "-c", DEFERRED_CHECK], check=True)
+    runs = [run_importtime() for _ in range(args.runs)]
+    median_ms = statistics.median(timings[MODULE] for timings in runs) / 1000
+    print(f"{MODULE}: median {median_ms:.1f} ms over {args.runs} runs")
+
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for name, cumulative in slowest:
+        print(f"  {name:<60} {cumulative / 1000:8.1f} ms")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"Import time regression: {median_ms:.1f} ms > {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark of the per-call overhead of @rule_call to prepare a rule (body + input parameters), before and after
+the compiled rule body cache. No iRODS connection is required.
+
+Usage:
+    python benchmarks/bench_rule_body.py
+"""
+import timeit
+
+from irodsrulewrapper.decorator import compile_rule_body, create_rule_input, rule_input_keys
+from irodsrulewrapper.utils import format_rule_argument
+
+# get_user_attribute_value(self, username, attribute, fatal)
+ARGS = (None, "jmelius", "eduPersonUniqueID", "true")
+NUMBER = 100_000
+
+
+def prepare_uncached():
+    # Previous behavior: the body is rebuilt, dedented and encoded, and the parameter names are formatted every call
+    body = compile_rule_body.__wrapped__("get_user_attribute_value", len(ARGS) - 1, True)
+    params = {}
+    for argument_index in range(2, len(ARGS) + 1):
+        params["*arg" + str(argument_index)] = format_rule_argument(ARGS[argument_index - 1])
+    return body, params
+
+
+def prepare_cached():
+    body = compile_rule_body("get_user_attribute_value", len(ARGS) - 1, True)
+    params = create_rule_input(*ARGS)
+    return body, params
+
+
+def main():
+    assert prepare_uncached() == prepare_cached()
+    rule_input_keys.cache_clear()
+    compile_rule_body.cache_clear()
+    for label, function in (("before (uncached)", prepare_uncached), ("after (cached)", prepare_cached)):
+        seconds = min(timeit.repeat(function, number=NUMBER, repeat=5))
+        print(f"{label:<20} {seconds / NUMBER * 1e6:8.3f} us/call")
+    print(compile_rule_body.cache_info())
+
+
+if __name__ == "__main__":
+    main()
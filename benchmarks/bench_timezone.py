@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of the conversion of UTC timestamps to the current timezone: the previous per-item path (pytz
+timezones and strptime on every call) against convert_many_to_current_timezone, on cold and warm caches.
+No iRODS connection is required; pytz is only needed by this benchmark.
+
+Usage:
+    python benchmarks/bench_timezone.py
+"""
+import datetime
+import random
+import timeit
+
+import pytz
+
+from irodsrulewrapper.utils import convert_date_to_current_timezone, convert_many_to_current_timezone
+
+ITEMS = 10_000
+REPEAT = 5
+
+
+def convert_per_item(date, date_format="%Y-%m-%d %H:%M:%S"):
+    # Previous implementation of convert_to_current_timezone
+    old_timezone = pytz.timezone("UTC")
+    new_timezone = pytz.timezone("Europe/Amsterdam")
+    if isinstance(date, str):
+        date = datetime.datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+    return old_timezone.localize(date).astimezone(new_timezone).strftime(date_format)
+
+
+def create_dates():
+    generator = random.Random(42)
+    start = datetime.datetime(2020, 1, 1)
+    return [
+        (start + datetime.timedelta(seconds=generator.randrange(3 * 365 * 24 * 3600))).strftime("%Y-%m-%d %H:%M:%S")
+        for _ in range(ITEMS)
+    ]
+
+
+def convert_batch_cold(dates):
+    convert_date_to_current_timezone.cache_clear()
+    return convert_many_to_current_timezone(dates)
+
+
+def main():
+    dates = create_dates()
+    epochs = [int(datetime.datetime.fromisoformat(f"{date}+00:00").timestamp()) for date in dates]
+    assert [convert_per_item(date) for date in dates] == convert_batch_cold(dates) == convert_batch_cold(epochs)
+
+    cases = (
+        ("per item (pytz)", lambda: [convert_per_item(date) for date in dates]),
+        ("batch, cold cache", lambda: convert_batch_cold(dates)),
+        ("batch epochs, cold", lambda: convert_batch_cold(epochs)),
+        ("batch, warm cache", lambda: convert_many_to_current_timezone(dates)),
+    )
+    for label, function in cases:
+        seconds = min(timeit.repeat(function, number=1, repeat=REPEAT))
+        print(f"{label:<20} {seconds / ITEMS * 1e6:8.3f} us/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,30 @@
 """
 This module contains CacheTTL class and initialize CacheTTL.CACHE_TIME_STOMP with CacheTTL.set_time_stomp().
+It also contains the tag functions of the rule results cache, see CacheTTL.set_rule_result.
 """
 
+import copy
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
+from irodsrulewrapper.utils import log_warning_message
+
+# Tag of the rule results depending on the ACL or AVUs of any project; e.g: the list of contributing projects
+ALL_PROJECTS_TAG = "projects"
+# Tag of all the rule results of a single project; invalidated by the mutating rules whose project is not known
+# upfront, e.g: start_ingest (by dropzone token)
+ANY_PROJECT_TAG = "project:*"
+
+# Freshness of a cached entry, see CacheTTL.get_freshness
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+# Number of threads refreshing the stale entries, see CacheTTL.refresh_in_background
+REFRESH_WORKERS = 2
 
 
 class CacheTTL:
@@ -15,11 +36,44 @@ class CacheTTL:
     CACHE_TIME_STOMP: float
         Timestomp of the cache information last update.
     CACHE_USERS_GROUPS: dict[str: User|Group]
-        Cached iRODS users and group information.
+        Cached iRODS users and group information; optionally backed by the on-disk persistent_cache.UsersGroupsStore.
+    CACHE_USERS_GROUPS_TIMES: dict[str: float]
+        Per uid, the epoch timestamp at which the CACHE_USERS_GROUPS entry was queried.
+    CACHE_UNKNOWN_UIDS: dict[str: float]
+        Per uid which is neither a user nor a group (e.g: rodsadmin, deleted user), the epoch timestamp at which
+        it expires; see set_unknown_uid.
+    CACHE_PROJECTS_OVERVIEW: dict[str: tuple[int, ProjectsOverview, int]]
+        Per username, the last ProjectsOverview snapshot, the epoch timestamp at which it was requested and the epoch
+        timestamp of its last full (non-incremental) build.
+    CACHE_USER_ACCOUNTS: dict[str: tuple[int, str]]
+        Per username, the iRODS user id and user type.
+    CACHE_TEMPORARY_PASSWORD_LIFETIME: int
+        The temporary password lifetime in seconds, from the iRODS server configuration.
+    CACHE_RULE_RESULTS: dict[tuple: tuple[float, Any, list[str], dict[str, int] | None]]
+        Per rule call (see decorator.rule_result_cache_key), the expiry timestamp, the result, the tags and the shared
+        tags generations (see get_rule_results_generation) of the cached rule result.
+    CACHE_RULE_RESULTS_TAGS: dict[str: set[tuple]]
+        Per tag, the keys of the cached rule results depending on it.
+    CACHE_RULE_RESULTS_GENERATION: int
+        Incremented on each invalidation; a rule result is only cached if no invalidation happened during its call.
+    REFRESHING: set[tuple]
+        The keys of the entries being refreshed in the background, see refresh_in_background.
     """
 
     CACHE_TIME_STOMP = None
     CACHE_USERS_GROUPS = {}
+    CACHE_USERS_GROUPS_TIMES = {}
+    CACHE_UNKNOWN_UIDS = {}
+    CACHE_PROJECTS_OVERVIEW = {}
+    CACHE_USER_ACCOUNTS = {}
+    CACHE_TEMPORARY_PASSWORD_LIFETIME = None
+    CACHE_RULE_RESULTS = {}
+    CACHE_RULE_RESULTS_TAGS = {}
+    CACHE_RULE_RESULTS_GENERATION = 0
+    CACHE_RULE_RESULTS_LOCK = threading.Lock()
+    REFRESH_EXECUTOR = None
+    REFRESHING = set()
+    REFRESH_LOCK = threading.Lock()
 
     @classmethod
     def set_time_stomp(cls):
@@ -35,9 +89,283 @@ class CacheTTL:
 
     @classmethod
     def check_if_cache_expired(cls):
-        if time.time() >= cls.CACHE_TIME_STOMP + int(os.environ["CACHE_TTL_VALUE"]):
-            cls.CACHE_USERS_GROUPS.clear()
+        if time.time() >= cls.CACHE_TIME_STOMP + cls.get_ttl():
+            # The users & groups and the ProjectsOverview snapshots are served stale and refreshed in the background,
+            # see get_freshness. Only drop the entries past the maximum staleness.
+            for uid, timestamp in list(cls.CACHE_USERS_GROUPS_TIMES.items()):
+                if cls.get_freshness(timestamp) == EXPIRED:
+                    cls.CACHE_USERS_GROUPS.pop(uid, None)
+                    cls.CACHE_USERS_GROUPS_TIMES.pop(uid, None)
+            for username, snapshot in list(cls.CACHE_PROJECTS_OVERVIEW.items()):
+                if cls.get_freshness(snapshot[2]) == EXPIRED:
+                    cls.CACHE_PROJECTS_OVERVIEW.pop(username, None)
+            for uid in list(cls.CACHE_UNKNOWN_UIDS):
+                if not cls.is_unknown_uid(uid):
+                    cls.CACHE_UNKNOWN_UIDS.pop(uid, None)
+            cls.CACHE_USER_ACCOUNTS.clear()
+            cls.CACHE_TEMPORARY_PASSWORD_LIFETIME = None
+            cls.clear_rule_results()
             CacheTTL.reset_time_stomp()
 
+    @classmethod
+    def get_ttl(cls):
+        return int(os.environ["CACHE_TTL_VALUE"])
+
+    @classmethod
+    def get_max_staleness(cls):
+        """
+        The number of seconds an entry is still served after its TTL elapsed, while it is refreshed in the background,
+        from the environment variable CACHE_MAX_STALENESS. Defaults to the TTL; 0 disables the stale entries.
+        """
+        return int(os.environ.get("CACHE_MAX_STALENESS", cls.get_ttl()))
+
+    @classmethod
+    def get_freshness(cls, timestamp):
+        """
+        Parameters
+        ----------
+        timestamp: float
+            The epoch timestamp at which the entry was queried; None if there is no entry
+
+        Returns
+        -------
+        str
+            FRESH, if the entry can be served as is. STALE, if it can be served but must be refreshed in the
+            background. EXPIRED, if it must be queried again before being served.
+        """
+        if timestamp is None:
+            return EXPIRED
+        age = time.time() - timestamp
+        ttl = cls.get_ttl()
+        if age < ttl:
+            return FRESH
+        if age < ttl + cls.get_max_staleness():
+            return STALE
+        return EXPIRED
+
+    @classmethod
+    def get_unknown_uids_ttl(cls):
+        """
+        The number of seconds an unknown uid is cached, from the environment variable UNKNOWN_UIDS_CACHE_TTL.
+        Defaults to 300; 0 disables the caching of the unknown uids.
+        """
+        return int(os.environ.get("UNKNOWN_UIDS_CACHE_TTL", "300"))
+
+    @classmethod
+    def is_unknown_uid(cls, uid):
+        expires_at = cls.CACHE_UNKNOWN_UIDS.get(uid)
+        return expires_at is not None and time.time() < expires_at
+
+    @classmethod
+    def set_unknown_uid(cls, uid):
+        """
+        Cache a uid which is neither a user nor a group, so it is queried at most once per UNKNOWN_UIDS_CACHE_TTL
+        instead of once per project and per request.
+        """
+        cls.CACHE_UNKNOWN_UIDS[uid] = time.time() + cls.get_unknown_uids_ttl()
+
+    @classmethod
+    def refresh_in_background(cls, key, function, *args):
+        """
+        Call the function in a background thread, unless a refresh of the same key is already queued or running.
+        A failed refresh is logged; the stale entry is refreshed again on its next access.
+
+        Parameters
+        ----------
+        key: tuple
+            The refreshed entry; e.g: ("users_groups", "10043")
+        function: Callable
+            The function querying and caching the entry again
+        args: Any
+            The function arguments
+
+        Returns
+        -------
+        bool
+            True, if the refresh has been scheduled
+        """
+        with cls.REFRESH_LOCK:
+            if key in cls.REFRESHING:
+                return False
+            if cls.REFRESH_EXECUTOR is None:
+                cls.REFRESH_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+                )
+            cls.REFRESHING.add(key)
+        cls.REFRESH_EXECUTOR.submit(cls._refresh, key, function, args)
+        return True
+
+    @classmethod
+    def _refresh(cls, key, function, args):
+        try:
+            function(*args)
+        except Exception as error:
+            log_warning_message(None, f"Background refresh of the cache entry {key} failed: {error!r}")
+        finally:
+            with cls.REFRESH_LOCK:
+                cls.REFRESHING.discard(key)
+
+    @classmethod
+    def get_projects_overview_snapshot(cls, username):
+        return cls.CACHE_PROJECTS_OVERVIEW.get(username)
+
+    @classmethod
+    def set_projects_overview_snapshot(cls, username, timestamp, projects_overview, built_at):
+        cls.CACHE_PROJECTS_OVERVIEW[username] = (timestamp, projects_overview, built_at)
+
+    @classmethod
+    def get_rule_results_ttl(cls):
+        """
+        The number of seconds a rule result is cached, from the environment variable RULE_RESULTS_CACHE_TTL.
+        Unset or 0 disables the rule results cache.
+
+        The rule results are cached per process. With USERS_GROUPS_CACHE_PATH set, the invalidations are shared by
+        the processes of the host (e.g: the gunicorn workers), see UsersGroupsStore. Without it, an invalidation only
+        evicts the results cached by its own process: only enable the cache with a single worker, or a short TTL.
+        """
+        return int(os.environ.get("RULE_RESULTS_CACHE_TTL", "0"))
+
+    @classmethod
+    def get_rule_results_generation(cls, tags=None):
+        """
+        Parameters
+        ----------
+        tags: list[str]
+            The tags of the rule result about to be queried
+
+        Returns
+        -------
+        tuple[int, dict[str, int] | None]
+            The local generation, and the shared generations of the tags (None without UsersGroupsStore); taken at the
+            start of a rule call, see set_rule_result
+        """
+        store = UsersGroupsStore.get_instance()
+        shared_generations = store.get_tag_generations(tags) if store else None
+        with cls.CACHE_RULE_RESULTS_LOCK:
+            return cls.CACHE_RULE_RESULTS_GENERATION, shared_generations
+
+    @classmethod
+    def get_rule_result(cls, key):
+        """
+        Returns
+        -------
+        tuple[bool, Any]
+            If the rule result is cached, not expired and not invalidated by another process, True and a copy of the
+            result (the callers can modify it). Otherwise, False and None.
+        """
+        with cls.CACHE_RULE_RESULTS_LOCK:
+            entry = cls.CACHE_RULE_RESULTS.get(key)
+            if entry is None:
+                return False, None
+            if time.time() >= entry[0]:
+                cls._evict_rule_result(key)
+                return False, None
+        store = UsersGroupsStore.get_instance()
+        if entry[3] is not None and store and store.get_tag_generations(entry[2]) != entry[3]:
+            with cls.CACHE_RULE_RESULTS_LOCK:
+                if cls.CACHE_RULE_RESULTS.get(key) is entry:
+                    cls._evict_rule_result(key)
+            return False, None
+        return True, copy.deepcopy(entry[1])
+
+    @classmethod
+    def set_rule_result(cls, key, result, tags, generation):
+        """
+        Cache a rule result, until it expires or until one of its tags is invalidated.
+
+        Parameters
+        ----------
+        key: tuple
+            The rule call key
+        result: Any
+            The rule result
+        tags: list[str]
+            The tags the result depends on; e.g: ["project:P000000010"]
+        generation: tuple[int, dict[str, int] | None]
+            The generation at the start of the rule call (see get_rule_results_generation); if an invalidation
+            happened since in this process, the result is dropped. If one happened in another process, the result is
+            dropped on its next read.
+        """
+        local_generation, shared_generations = generation
+        # A copy, the caller can modify the result it got
+        result = copy.deepcopy(result)
+        with cls.CACHE_RULE_RESULTS_LOCK:
+            if local_generation != cls.CACHE_RULE_RESULTS_GENERATION:
+                return
+            cls._evict_rule_result(key)
+            cls.CACHE_RULE_RESULTS[key] = (time.time() + cls.get_rule_results_ttl(), result, tags, shared_generations)
+            for tag in tags:
+                cls.CACHE_RULE_RESULTS_TAGS.setdefault(tag, set()).add(key)
+
+    @classmethod
+    def invalidate_tags(cls, tags):
+        """
+        Evict all the cached rule results depending on one of the tags; in the other processes too, with
+        UsersGroupsStore (see get_rule_results_ttl).
+
+        Parameters
+        ----------
+        tags: list[str]
+            The tags touched by a mutating rule; e.g: ["project:P000000010", "projects"]
+        """
+        with cls.CACHE_RULE_RESULTS_LOCK:
+            cls.CACHE_RULE_RESULTS_GENERATION += 1
+            for tag in tags:
+                for key in cls.CACHE_RULE_RESULTS_TAGS.pop(tag, set()):
+                    cls._evict_rule_result(key)
+        store = UsersGroupsStore.get_instance()
+        if store:
+            store.increment_tag_generations(tags)
+
+    @classmethod
+    def clear_rule_results(cls):
+        with cls.CACHE_RULE_RESULTS_LOCK:
+            cls.CACHE_RULE_RESULTS_GENERATION += 1
+            cls.CACHE_RULE_RESULTS.clear()
+            cls.CACHE_RULE_RESULTS_TAGS.clear()
+
+    @classmethod
+    def _evict_rule_result(cls, key):
+        # Must be called with CACHE_RULE_RESULTS_LOCK held
+        entry = cls.CACHE_RULE_RESULTS.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = cls.CACHE_RULE_RESULTS_TAGS.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del cls.CACHE_RULE_RESULTS_TAGS[tag]
+
+
+def project_tag(project_id):
+    return f"project:{project_id}"
+
+
+def user_tag(username):
+    return f"user:{username}"
+
+
+def path_tags(path):
+    """
+    The tags of an iRODS path: the path itself, and its project if the path is inside a project.
+
+    Parameters
+    ----------
+    path: str
+        The absolute path; e.g: /nlmumc/projects/P000000010/C000000001
+
+    Returns
+    -------
+    list[str]
+        e.g: ["path:/nlmumc/projects/P000000010/C000000001", "project:P000000010"]
+    """
+    path = path.rstrip("/")
+    tags = [f"path:{path}"]
+    parts = path.split("/")
+    if len(parts) > 3 and parts[2] == "projects" and parts[3]:
+        tags.append(project_tag(parts[3]))
+    return tags
+
 
 CacheTTL.set_time_stomp()
@@ -0,0 +1,244 @@
+"""
+This module contains the CollectionTreeWalker class to lazily browse a project collection, level by level, with
+the rule "get_collection_tree".
+"""
+import fnmatch
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Value of the entry "type" for a sub-collection in the get_collection_tree rule output
+COLLECTION_TYPE = "coll"
+
+DEFAULT_LEVEL_TTL = 60
+DEFAULT_PREFETCH_DEPTH = 1
+DEFAULT_PREFETCH_BUDGET = 32
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_LEVELS = 10000
+
+
+class CollectionTreeWalker:
+    """
+    This class browses a collection tree, one get_collection_tree rule call per level.
+
+    Each requested level is kept in memory for 'ttl' seconds, up to 'max_levels' levels. After a level is listed, its
+    sub-collections are prefetched concurrently in the background down to 'prefetch_depth' levels, with at most
+    'prefetch_budget' levels being requested at the same time. So by the time the caller opens a sub-collection, its
+    level is usually already available.
+
+    The rule is executed with the input rule manager, which must return the rule JSON output (RuleJSONManager).
+
+    Examples
+    --------
+        with CollectionTreeWalker(RuleJSONManager(admin_mode=True)) as walker:
+            for path, collections, data_objects in walker.walk("P000000010/C000000001"):
+                print(path, len(data_objects))
+            for path, entry in walker.glob("*.json", "P000000010/C000000001"):
+                print(path, entry["size"])
+    """
+
+    def __init__(
+        self,
+        rule_manager,
+        ttl=DEFAULT_LEVEL_TTL,
+        prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+        prefetch_budget=DEFAULT_PREFETCH_BUDGET,
+        max_workers=DEFAULT_MAX_WORKERS,
+        max_levels=DEFAULT_MAX_LEVELS,
+    ):
+        """
+        Parameters
+        ----------
+        rule_manager: RuleJSONManager
+            The rule manager used to execute get_collection_tree
+        ttl: int
+            The number of seconds a listed level is cached
+        prefetch_depth: int
+            The number of sub-levels prefetched below each listed level; 0 disables the prefetching
+        prefetch_budget: int
+            The maximum number of levels requested at the same time by the prefetching
+        max_workers: int
+            The number of threads executing the rule calls
+        max_levels: int
+            The maximum number of cached levels; the oldest ones are dropped first
+        """
+        if rule_manager.parse_to_dto:
+            raise ValueError("rule_manager: expected a RuleJSONManager")
+        self.rule_manager = rule_manager
+        self.ttl = ttl
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_budget = prefetch_budget
+        self.max_levels = max_levels
+        # Per relative path, the fetch time and the entries of the level; in fetch order, so the oldest come first
+        self._levels = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Cancel the queued prefetching and wait for the running rule calls to finish."""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def clear(self):
+        """Drop all the cached levels."""
+        with self._lock:
+            self._levels.clear()
+
+    def list(self, relative_path):
+        """
+        List the folders and files attributes of one level, then start prefetching its sub-collections.
+
+        Parameters
+        ----------
+        relative_path: str
+            Relative path to collection; e.g: P000000014/C000000001/.metadata_versions
+
+        Returns
+        -------
+        list[dict]
+            The get_collection_tree rule output
+        """
+        entries = self._request(relative_path).result()
+        self._prefetch(relative_path, entries, self.prefetch_depth)
+        return entries
+
+    def iterdir(self, relative_path):
+        """
+        Yield the entries of one level.
+
+        Parameters
+        ----------
+        relative_path: str
+            Relative path to collection
+
+        Yields
+        ------
+        tuple[str, dict]
+            The relative path of the entry and its attributes
+        """
+        for entry in self.list(relative_path):
+            yield join_path(relative_path, entry["name"]), entry
+
+    def walk(self, relative_path, max_depth=None):
+        """
+        Walk the collection tree top-down, similar to os.walk.
+        Like os.walk, the caller can prune the walk by removing items from the yielded collections list.
+
+        Parameters
+        ----------
+        relative_path: str
+            Relative path to the root collection of the walk
+        max_depth: int
+            Optional; the number of levels to walk below the root collection. None walks the whole tree.
+
+        Yields
+        ------
+        tuple[str, list[dict], list[dict]]
+            The level relative path, its sub-collections and its data objects
+        """
+        stack = [(relative_path, 0)]
+        while stack:
+            path, depth = stack.pop()
+            entries = self.list(path)
+            collections = [entry for entry in entries if entry["type"] == COLLECTION_TYPE]
+            data_objects = [entry for entry in entries if entry["type"] != COLLECTION_TYPE]
+            yield path, collections, data_objects
+            if max_depth is None or depth < max_depth:
+                for collection in reversed(collections):
+                    stack.append((join_path(path, collection["name"]), depth + 1))
+
+    def glob(self, pattern, relative_path, max_depth=None):
+        """
+        Yield all the entries below the root collection that match the pattern.
+        The pattern is matched with fnmatch against the path relative to the root collection, so '*' also matches '/'.
+
+        Parameters
+        ----------
+        pattern: str
+            The fnmatch pattern; e.g: '*.json', 'sub/*'
+        relative_path: str
+            Relative path to the root collection of the walk
+        max_depth: int
+            Optional; see walk
+
+        Yields
+        ------
+        tuple[str, dict]
+            The relative path of the entry (including the root collection) and its attributes
+        """
+        prefix_length = len(relative_path.rstrip("/")) + 1
+        for path, collections, data_objects in self.walk(relative_path, max_depth):
+            for entry in collections + data_objects:
+                entry_path = join_path(path, entry["name"])
+                if fnmatch.fnmatchcase(entry_path[prefix_length:], pattern):
+                    yield entry_path, entry
+
+    def _request(self, relative_path):
+        with self._lock:
+            level = self._levels.get(relative_path)
+            if level is not None and time.monotonic() - level[0] < self.ttl:
+                future = Future()
+                future.set_result(level[1])
+                return future
+            if level is not None:
+                del self._levels[relative_path]
+            if relative_path not in self._pending:
+                self._pending[relative_path] = self._executor.submit(self._fetch, relative_path)
+            return self._pending[relative_path]
+
+    def _fetch(self, relative_path):
+        try:
+            entries = self.rule_manager.get_collection_tree(relative_path)
+            with self._lock:
+                self._store_level(relative_path, entries)
+            return entries
+        finally:
+            with self._lock:
+                self._pending.pop(relative_path, None)
+
+    def _store_level(self, relative_path, entries):
+        # Must be called with the lock held. Drop the expired levels and the levels over max_levels, oldest first.
+        now = time.monotonic()
+        self._levels.pop(relative_path, None)
+        self._levels[relative_path] = (now, entries)
+        while len(self._levels) > 1:
+            oldest_path, (fetched_at, _) = next(iter(self._levels.items()))
+            if now - fetched_at < self.ttl and len(self._levels) <= self.max_levels:
+                break
+            del self._levels[oldest_path]
+
+    def _prefetch(self, relative_path, entries, depth):
+        if depth <= 0:
+            return
+        for entry in entries:
+            if entry["type"] != COLLECTION_TYPE:
+                continue
+            with self._lock:
+                if self._closed or len(self._pending) >= self.prefetch_budget:
+                    return
+            child_path = join_path(relative_path, entry["name"])
+            future = self._request(child_path)
+            future.add_done_callback(self._prefetch_callback(child_path, depth - 1))
+
+    def _prefetch_callback(self, relative_path, depth):
+        def callback(future):
+            # A failed prefetch is not cached, the error is raised again when the level is listed
+            if not future.cancelled() and future.exception() is None:
+                self._prefetch(relative_path, future.result(), depth)
+
+        return callback
+
+
+def join_path(relative_path, name):
+    if not relative_path:
+        return name
+    return relative_path.rstrip("/") + "/" + name
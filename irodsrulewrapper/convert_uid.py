@@ -1,12 +1,20 @@
 """
 This module contains the dataclass and functions to convert iRODS uid into a User or Group DTO.
 """
+import functools
+import sqlite3
+import time
 from dataclasses import dataclass
 
-from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.cache import FRESH, STALE, CacheTTL
 from irodsrulewrapper.dto.group import Group
 from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
 from irodsrulewrapper.rule_managers.users import UserRuleManager
+from irodsrulewrapper.utils import log_warning_message
+
+# Account types of the get_user_or_group_by_id rule results converted to a DTO, see cache_user_or_group
+USER_OR_GROUP_TYPES = ("rodsuser", "rodsgroup")
 
 
 @dataclass
@@ -59,7 +67,7 @@ def convert_uids_to_users_or_groups(result):
         elif isinstance(viewer, Group):
             output.viewer_groups.append(viewer)
 
-    rule_manager.session.cleanup()
+    rule_manager.close()
 
     return output
 
@@ -68,6 +76,9 @@ def get_user_or_group(uid: str, rule_manager):
     """
     Retrieve a user or group DTO based on the input uid.
     First check if the uid is present the cached dict. Otherwise, query the uid.
+    A stale cached DTO is returned as is, and refreshed in the background (see CacheTTL.get_freshness).
+    The uids which are neither a user nor a group (e.g: rodsadmin, deleted users) are cached as unknown, see
+    CacheTTL.set_unknown_uid.
 
     Parameters
     ----------
@@ -77,15 +88,132 @@ def get_user_or_group(uid: str, rule_manager):
 
     Returns
     -------
-    User|Group
-        The DTO of the input uid
+    User|Group|None
+        The DTO of the input uid; None if the uid is not a user or a group
+    """
+    warm_start_users_groups_cache()
+    if CacheTTL.is_unknown_uid(uid):
+        return None
+    user_or_group = CacheTTL.CACHE_USERS_GROUPS.get(uid)
+    if user_or_group is not None:
+        freshness = CacheTTL.get_freshness(CacheTTL.CACHE_USERS_GROUPS_TIMES.get(uid))
+        if freshness == FRESH:
+            return user_or_group
+        if freshness == STALE:
+            CacheTTL.refresh_in_background(("users_groups", uid), refresh_user_or_group, uid)
+            return user_or_group
+
+    store = UsersGroupsStore.get_instance()
+    entry = None
+    try:
+        entry = store.get(uid) if store else None
+    except sqlite3.Error as error:
+        log_warning_message(rule_manager.session.username, f"Users and groups store lookup failed: {error}")
+    if entry is None:
+        user_or_group = cache_user_or_group(uid, query_user_or_group(uid, rule_manager))
+    else:
+        # Keep the query timestamp of the stored row, so it expires when it would have in the process which stored it
+        user_or_group = cache_user_or_group(uid, *entry)
+    if user_or_group is None:
+        CacheTTL.set_unknown_uid(uid)
+    return user_or_group
+
+
+def query_user_or_group(uid: str, rule_manager):
+    """
+    Query the get_user_or_group_by_id rule. If it is a user or a group, save it in the persistent users and groups
+    store; the unknown uids are only cached in memory with their own TTL.
+
+    Parameters
+    ----------
+    uid: str
+        The user or group id
+    rule_manager: RuleManager
+
+    Returns
+    -------
+    dict|None
+        The get_user_or_group_by_id rule result
+    """
+    # rodsadmin and service-account UIDs are filtered in the rule
+    user_or_group = rule_manager.get_user_or_group_by_id(uid)
+    result = user_or_group.result if user_or_group else None
+    if not result or result.get("account_type") not in USER_OR_GROUP_TYPES:
+        return result
+    try:
+        store = UsersGroupsStore.get_instance()
+        if store:
+            store.set(uid, result)
+    except sqlite3.Error as error:
+        log_warning_message(rule_manager.session.username, f"Users and groups store update failed: {error}")
+    return result
+
+
+def refresh_user_or_group(uid: str):
+    """
+    Query a stale user or group again and replace its cached DTO. Executed in the background, see get_user_or_group.
+
+    Parameters
+    ----------
+    uid: str
+        The user or group id
+    """
+    with UserRuleManager("service-disqover") as rule_manager:
+        if cache_user_or_group(uid, query_user_or_group(uid, rule_manager)) is None:
+            # e.g: the user has been deleted since
+            CacheTTL.CACHE_USERS_GROUPS.pop(uid, None)
+            CacheTTL.CACHE_USERS_GROUPS_TIMES.pop(uid, None)
+            CacheTTL.set_unknown_uid(uid)
+
+
+def cache_user_or_group(uid: str, result: dict, queried_at: float = None):
+    """
+    Add the User or Group DTO of a get_user_or_group_by_id rule result to CacheTTL.CACHE_USERS_GROUPS.
+
+    Parameters
+    ----------
+    uid: str
+        The user or group id
+    result: dict|None
+        The get_user_or_group_by_id rule result
+    queried_at: float
+        Optional; the epoch timestamp at which the rule result was queried, by default now
+
+    Returns
+    -------
+    User|Group|None
+        The cached DTO; None if the result is neither a user nor a group
+    """
+    account_type = result.get("account_type") if result else None
+    if account_type == "rodsuser":
+        user_or_group = User.create_from_rule_result(result)
+    elif account_type == "rodsgroup":
+        user_or_group = Group.create_from_rule_result(result)
+    else:
+        return None
+    CacheTTL.CACHE_USERS_GROUPS[uid] = user_or_group
+    CacheTTL.CACHE_USERS_GROUPS_TIMES[uid] = time.time() if queried_at is None else queried_at
+    CacheTTL.CACHE_UNKNOWN_UIDS.pop(uid, None)
+    return user_or_group
+
+
+def load_users_groups_cache():
+    """
+    Warm-start CacheTTL.CACHE_USERS_GROUPS from the persistent users and groups store, if enabled.
+    Called on the first get_user_or_group call (see warm_start_users_groups_cache), so a (re)started process reuses
+    the users and groups queried by the other processes.
     """
-    if uid not in CacheTTL.CACHE_USERS_GROUPS:
-        # rodsadmin and service-account UIDs are filtered in the rule
-        item = rule_manager.get_user_or_group_by_id(uid)
-        if item.result["account_type"] == "rodsuser":
-            CacheTTL.CACHE_USERS_GROUPS[uid] = User.create_from_rule_result(item.result)
-        elif item.result["account_type"] == "rodsgroup":
-            CacheTTL.CACHE_USERS_GROUPS[uid] = Group.create_from_rule_result(item.result)
-
-    return CacheTTL.CACHE_USERS_GROUPS[uid]
+    try:
+        store = UsersGroupsStore.get_instance()
+        results = store.load_all() if store else {}
+    except sqlite3.Error as error:
+        log_warning_message(None, f"Users and groups store warm start failed: {error}")
+        return
+    for uid, (result, queried_at) in results.items():
+        cache_user_or_group(uid, result, queried_at)
+
+
+@functools.cache
+def warm_start_users_groups_cache():
+    # Once per process, on first use instead of at import: the store may hold thousands of rows
+    load_users_groups_cache()
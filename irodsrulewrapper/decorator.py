@@ -1,15 +1,39 @@
 """
 This module contains the decorator function to execute iRODS rule
 """
+import functools
 import io
 import json
+import os
 import textwrap
+import threading
+import time
 from typing import Callable
 
-from irods.exception import NetworkException
+from irods.exception import NetworkException, iRODSException
 from irods.rule import Rule
 
-from irodsrulewrapper.utils import format_rule_argument
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.recording import record_rule_call
+from irodsrulewrapper.utils import (
+    RuleOutputTooLargeError,
+    format_rule_argument,
+    iter_json_array,
+    log_warning_message,
+)
+
+RULE_ENGINE_INSTANCE = "irods_rule_engine_plugin-irods_rule_language-instance"
+
+# Per iRODS server (host, port, zone), the result of the named rule calls probe
+NAMED_RULE_CALLS_SUPPORT = {}
+NAMED_RULE_CALLS_PROBE = "named_rule_calls_probe"
+
+# Default maximum size in bytes of a rule output, overridden by the environment variable RULE_OUTPUT_MAX_SIZE
+DEFAULT_RULE_OUTPUT_MAX_SIZE = 64 * 1024 * 1024
+
+# Per rule name, the output size metrics, see get_rule_output_metrics
+RULE_OUTPUT_METRICS = {}
+RULE_OUTPUT_METRICS_LOCK = threading.Lock()
 
 
 def rule_call(func: Callable):
@@ -48,9 +72,12 @@ def rule_call(func: Callable):
                 ) from err
 
             rule_info = RuleInfo(name="get_groups", get_result=True, session=self.session, dto=Groups)
-            rule_body = create_rule_body(show_service_accounts, rule_info=rule_info)
-            input_params = create_rule_input(show_service_accounts, rule_info=rule_info)
-            result = execute_rule(rule_body, input_params, rule_info)
+            input_params = create_rule_input(self, show_service_accounts)
+            rule_file_contents = compile_rule_body(rule_info.name, 1, rule_info.get_result)
+            myrule = Rule(rule_info.session, rule_file=io.BytesIO(rule_file_contents), params=input_params, ...)
+            buf = execute_rule(myrule, rule_info)
+            check_rule_output_size(rule_info.name, len(buf))
+            result = parse_rule_output(buf.decode("utf8"), rule_info)
 
             return result
 
@@ -68,112 +95,411 @@ def rule_call(func: Callable):
         The rule result as the mentioned DTO or a JSON
     """
 
-    def create_rule_body(*args, **kwargs):
-        """
-        Create a rule body from a template with the list of arguments (*args)
-            and the list of keyword/named arguments (**kwargs)
-        Example:
-            create_rule_body("P000000010", "C000000001",
-                                rule_info.name="test_arg", rule_info.get_result=True)
-        will return
-            rule_body='''
-            execute_rule{
-                test_arg(*arg1, *arg2, *result);
-            }
-            '''
-        """
-        rule_info = kwargs["rule_info"]
-        arguments_string = ""
-        input_string = ""
-        for argument_index in range(2, len(args) + 1):
-            arguments_string += "*arg" + str(argument_index) + ","
-            input_string += "*arg" + str(argument_index) + '="",'
+    def execute_rule(myrule, rule_info):
+        result = myrule.execute(session_cleanup=False)
+        if rule_info.get_result:
+            return result.MsParam_PI[0].inOutStruct.stdoutBuf.buf.rstrip(b"\0")
 
-        input_string = input_string.rstrip(",")
-        if len(input_string) > 0:
-            input_string = "INPUT " + input_string
+        return None
 
-        if rule_info.get_result:
-            arguments_string = arguments_string + "*result"
+    def execute_recorded_rule(rule_info, args):
+        # One iRODS round trip, appended to the rule calls log in record mode, also if it fails (see RuleCallRecorder)
+        start = time.time()
+        start_counter = time.perf_counter()
+        buf = None
+        failed = True
+        try:
+            buf = execute_rule(create_rule(rule_info, args), rule_info)
+            failed = False
+            return buf
+        finally:
+            size = None if buf is None else len(buf)
+            record_rule_call(rule_info.name, args, size, start, start_counter, failed)
+
+    def create_rule(rule_info, args):
+        if rule_info.input_params is None:
+            input_params = create_rule_input(*args)
         else:
-            arguments_string = arguments_string[:-1]
+            input_params = rule_info.input_params
+
+        if rule_info.rule_body is None and named_rule_calls_supported(rule_info.session):
+            return Rule(
+                rule_info.session,
+                body=compile_named_rule_call(rule_info.name, len(args) - 1, rule_info.get_result),
+                instance_name=RULE_ENGINE_INSTANCE,
+                params=input_params,
+                output="ruleExecOut",
+            )
+
+        if rule_info.rule_body is None:
+            rule_file_contents = compile_rule_body(rule_info.name, len(args) - 1, rule_info.get_result)
+        else:
+            rule_file_contents = textwrap.dedent(rule_info.rule_body).encode("utf-8")
+        return Rule(
+            rule_info.session,
+            rule_file=io.BytesIO(rule_file_contents),
+            instance_name=RULE_ENGINE_INSTANCE,
+            params=input_params,
+            output="ruleExecOut",
+        )
+
+    def execute_chunked_rule(rule_info, args):
+        # The rule is called with an extra last argument, the continuation token of the next chunk to return
+        parts = []
+        size = 0
+        continuation = ""
+        while True:
+            buf = execute_recorded_rule(rule_info, args + (continuation,))
+            size += len(buf)
+            check_rule_output_size(rule_info.name, size, len(parts) + 1)
+            chunk = json.loads(buf.decode("utf8"))
+            parts.append(chunk["part"])
+            continuation = chunk["continuation"]
+            if not continuation:
+                record_rule_output_size(rule_info.name, size, len(parts))
+                return "".join(parts)
+
+    def parse_rule_output(output, rule_info):
+        if rule_info.stream_result:
+            # Decode the JSON array one element at a time, instead of materializing all of it upfront
+            items = iter_json_array(output)
+            if rule_info.parse_to_dto:
+                return rule_info.dto.iter_from_rule_result(items)
+            return items
+        buf_json = json.loads(output)
+        # Check if it will return the JSON rule's output or the DTO
+        if rule_info.parse_to_dto:
+            return rule_info.dto.create_from_rule_result(buf_json)
+
+        return buf_json
+
+    def wrapper_decorator(*args):
+        # args[0] is the rule manager, the rule is executed as a call in flight on its shared session
+        with args[0].checkout_session():
+            return execute_rule_call(args)
+
+    def execute_rule_call(args):
+        rule_info = func(*args)
+
+        cache_key = None
+        generation = None
+        if rule_info.cache_tags is not None and not rule_info.stream_result and CacheTTL.get_rule_results_ttl() > 0:
+            cache_key = rule_result_cache_key(rule_info, args)
+            is_cached, result = CacheTTL.get_rule_result(cache_key)
+            if is_cached:
+                return result
+            generation = CacheTTL.get_rule_results_generation(rule_info.cache_tags)
+
+        result = execute_uncached_rule_call(rule_info, args)
+
+        if rule_info.invalidates:
+            CacheTTL.invalidate_tags(rule_info.invalidates)
+        if cache_key is not None:
+            CacheTTL.set_rule_result(cache_key, result, rule_info.cache_tags, generation)
+
+        return result
+
+    def execute_uncached_rule_call(rule_info, args):
+        if rule_info.chunked:
+            if rule_info.rule_body is not None or rule_info.input_params is not None or not rule_info.get_result:
+                raise ValueError(f"{rule_info.name}: chunked rules only support the default rule call")
+            output = execute_chunked_rule(rule_info, args)
+        else:
+            buf = execute_recorded_rule(rule_info, args)
+            if buf is None:
+                return None
+            check_rule_output_size(rule_info.name, len(buf))
+            record_rule_output_size(rule_info.name, len(buf))
+            output = buf.decode("utf8")
+
+        return parse_rule_output(output, rule_info)
+
+    return wrapper_decorator
+
+
+def rule_result_cache_key(rule_info, args):
+    """
+    The key of a rule result in the rule results cache: the result depends on the rule, its input, the iRODS server,
+    the (proxied) user and if the result is parsed as a DTO.
+
+    Parameters
+    ----------
+    rule_info: RuleInfo
+        The rule call information
+    args: tuple
+        The arguments of the rule method, including self
+
+    Returns
+    -------
+    tuple
+        The hashable key
+    """
+    if rule_info.input_params is None:
+        input_params = create_rule_input(*args)
+    else:
+        input_params = rule_info.input_params
+    session = rule_info.session
+    return (
+        rule_info.name,
+        session.host,
+        session.zone,
+        session.username,
+        rule_info.parse_to_dto,
+        tuple(sorted(input_params.items())),
+    )
+
+
+def get_rule_output_max_size():
+    """
+    The maximum size in bytes of a rule output, from the environment variable RULE_OUTPUT_MAX_SIZE.
+    0 disables the limit.
+
+    Returns
+    -------
+    int
+        The maximum rule output size
+    """
+    return int(os.environ.get("RULE_OUTPUT_MAX_SIZE", DEFAULT_RULE_OUTPUT_MAX_SIZE))
+
+
+def check_rule_output_size(name, size, chunks=1):
+    """
+    Check the size of a rule output against the configured maximum size (see get_rule_output_max_size).
+
+    Parameters
+    ----------
+    name: str
+        The rule name
+    size: int
+        The size in bytes of the rule output, or of the chunks received so far for a chunked rule
+    chunks: int
+        The number of chunks received so far
+
+    Raises
+    ------
+    RuleOutputTooLargeError
+        If the output is larger than the maximum size
+    """
+    max_size = get_rule_output_max_size()
+    if 0 < max_size < size:
+        raise RuleOutputTooLargeError(name, size, max_size, chunks)
+
+
+def record_rule_output_size(name, size, chunks=1):
+    """
+    Add the size of a rule output to the rule output metrics, see get_rule_output_metrics.
+
+    Parameters
+    ----------
+    name: str
+        The rule name
+    size: int
+        The size in bytes of the rule output; for a chunked rule, the sum of its chunks sizes
+    chunks: int
+        The number of chunks of the rule output
+    """
+    with RULE_OUTPUT_METRICS_LOCK:
+        metrics = RULE_OUTPUT_METRICS.setdefault(name, {"calls": 0, "chunks": 0, "total_size": 0, "max_size": 0})
+        metrics["calls"] += 1
+        metrics["chunks"] += chunks
+        metrics["total_size"] += size
+        metrics["max_size"] = max(metrics["max_size"], size)
+
+
+def get_rule_output_metrics():
+    """
+    Get the rule output size metrics, since the start of the process.
+
+    Returns
+    -------
+    dict[str, dict[str, int]]
+        Per rule name, the number of calls and chunks, the total and the maximum output size in bytes;
+        e.g: {"get_groups": {"calls": 2, "chunks": 2, "total_size": 1024, "max_size": 768}}
+    """
+    with RULE_OUTPUT_METRICS_LOCK:
+        return {name: dict(metrics) for name, metrics in RULE_OUTPUT_METRICS.items()}
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_rule_body(name, arity, get_result):
+    """
+    Create the rule body of a rule call from its template, ready to be sent to iRODS.
+    The compiled body only depends on the rule name, its number of arguments and get_result, so it is cached and a
+    rule call only has to fill in its input parameters.
+
+    Example:
+        compile_rule_body("test_arg", 2, True)
+    will return the UTF-8 encoded
+        execute_rule{
+                *result="";
+                test_arg(*arg2,*arg3,*result);
+                writeLine('stdout', "*result");
+        }
+        INPUT *arg2="",*arg3=""
+        OUTPUT ruleExecOut
 
-        rule_body = f"""
+    Parameters
+    ----------
+    name: str
+        The rule name
+    arity: int
+        The number of rule arguments, excluding *result
+    get_result: bool
+        If true, the rule output is written to stdout
+
+    Returns
+    -------
+    bytes
+        The dedented and UTF-8 encoded rule body
+    """
+    arguments = rule_input_keys(arity)
+    arguments_string = ",".join(arguments)
+    input_string = ",".join(argument + '=""' for argument in arguments)
+    if len(input_string) > 0:
+        input_string = "INPUT " + input_string
+
+    if get_result:
+        arguments_string = ",".join(arguments + ("*result",))
+
+    rule_body = f"""
         execute_rule{{
                 *result="";
-                {rule_info.name}({arguments_string});
+                {name}({arguments_string});
                 writeLine('stdout', "*result");
         }}
         {input_string}
         OUTPUT ruleExecOut
         """
-        return rule_body
+    return textwrap.dedent(rule_body).encode("utf-8")
 
-    def create_rule_input(*args, **kwargs):
-        """
-        Create a list of input parameter from the list of arguments (*args)
-            and the list of keyword/named arguments (**kwargs)
-        Example:
-            create_rule_input("P000000010", "C000000001",
-                                rule_info.name="test_arg", rule_info.get_result=True)
-        will return
-            {
-                "*arg1": '"P000000010"',
-                "*arg2": '"C000000001"',
-                "*result": '""'
-            }
-            '''
-        """
-        input_params = {}
-        for argument_index in range(2, len(args) + 1):
-            key = "*arg" + str(argument_index)
-            argument = args[argument_index - 1]
-            input_params[key] = format_rule_argument(argument)
 
-        return input_params
+@functools.lru_cache(maxsize=None)
+def rule_input_keys(arity):
+    """
+    The rule input parameter names; the first argument (self) of a rule method is skipped, so they start at *arg2.
 
-    def execute_rule(rule_body, input_params, rule_info):
+    Parameters
+    ----------
+    arity: int
+        The number of rule arguments, excluding *result
 
-        rule_file_contents = textwrap.dedent(rule_body)
-        myrule = Rule(
-            rule_info.session,
-            rule_file=io.BytesIO(rule_file_contents.encode("utf-8")),
-            instance_name="irods_rule_engine_plugin-irods_rule_language-instance",
-            params=input_params,
-            output="ruleExecOut",
-        )
+    Returns
+    -------
+    tuple[str]
+        e.g: ("*arg2", "*arg3")
+    """
+    return tuple("*arg" + str(argument_index) for argument_index in range(2, arity + 2))
 
-        result = myrule.execute(session_cleanup=False)
-        if rule_info.get_result:
-            buf = result.MsParam_PI[0].inOutStruct.stdoutBuf.buf
-            output = buf.rstrip(b"\0").decode("utf8")
-            buf_json = json.loads(output)
-            # Check if it will return the JSON rule's output or the DTO
-            if rule_info.parse_to_dto:
-                return rule_info.dto.create_from_rule_result(buf_json)
 
-            return buf_json
+@functools.lru_cache(maxsize=1024)
+def compile_named_rule_call(name, arity, get_result):
+    """
+    Create the compact rule call of the named rule call mode: a single statement calling the rule by its name.
+    It has no main rule definition nor INPUT/OUTPUT sections, the input parameters are only sent as parameters.
+    python-irodsclient wraps it in '@external rule { ... }'.
 
-        return None
+    Example:
+        compile_named_rule_call("test_arg", 2, True)
+    will return
+        *result="";test_arg(*arg2,*arg3,*result);writeLine('stdout', "*result");
 
-    def wrapper_decorator(*args):
-        rule_info = func(*args)
+    Parameters
+    ----------
+    name: str
+        The rule name
+    arity: int
+        The number of rule arguments, excluding *result
+    get_result: bool
+        If true, the rule output is written to stdout
 
-        if rule_info.rule_body is None:
-            rule_body = create_rule_body(*args, rule_info=rule_info)
-        else:
-            rule_body = rule_info.rule_body
+    Returns
+    -------
+    str
+        The rule call
+    """
+    arguments = rule_input_keys(arity)
+    if get_result:
+        arguments_string = ",".join(arguments + ("*result",))
+        return f"""*result="";{name}({arguments_string});writeLine('stdout', "*result");"""
 
-        if rule_info.input_params is None:
-            input_params = create_rule_input(*args, rule_info=rule_info)
-        else:
-            input_params = rule_info.input_params
+    return f"{name}({','.join(arguments)});"
 
-        result = execute_rule(rule_body, input_params, rule_info)
 
-        return result
+def named_rule_calls_supported(session):
+    """
+    Check if the rules can be executed with the named rule call mode (see compile_named_rule_call).
+    The mode is opt-in, with the environment variable IRODS_NAMED_RULE_CALLS='true'. The first time for each iRODS
+    server, a probe rule is executed to check the support. Otherwise, the inline rule body is used as fallback.
 
-    return wrapper_decorator
+    Parameters
+    ----------
+    session: iRODSSession
+        The session used to execute the rule
+
+    Returns
+    -------
+    bool
+        True, if the named rule call mode is enabled and supported by the server
+    """
+    if os.environ.get("IRODS_NAMED_RULE_CALLS", "false").lower() != "true":
+        return False
+
+    server = (session.host, session.port, session.zone)
+    if server not in NAMED_RULE_CALLS_SUPPORT:
+        supported = probe_named_rule_calls(session)
+        if supported is None:
+            # Network error, the probe is retried on the next rule call
+            return False
+        NAMED_RULE_CALLS_SUPPORT[server] = supported
+
+    return NAMED_RULE_CALLS_SUPPORT[server]
+
+
+def probe_named_rule_calls(session):
+    """
+    Execute a rule call in the named rule call mode and check its output.
+
+    Parameters
+    ----------
+    session: iRODSSession
+        The session used to execute the rule
+
+    Returns
+    -------
+    bool | None
+        True, if the probe rule call returned the expected output. None, if the server could not be reached.
+    """
+    probe = Rule(
+        session,
+        body="writeLine('stdout', \"*result\");",
+        instance_name=RULE_ENGINE_INSTANCE,
+        params={"*result": f'"{NAMED_RULE_CALLS_PROBE}"'},
+        output="ruleExecOut",
+    )
+    try:
+        result = probe.execute(session_cleanup=False)
+        buf = result.MsParam_PI[0].inOutStruct.stdoutBuf.buf
+    except NetworkException:
+        return None
+    except (iRODSException, AttributeError, IndexError):
+        log_warning_message(session.username, "Named rule calls are not supported, fallback to inline rule bodies")
+        return False
+
+    return buf.rstrip(b"\0").decode("utf8").strip() == NAMED_RULE_CALLS_PROBE
+
+
+def create_rule_input(*args):
+    """
+    Create a list of input parameter from the list of arguments (*args) of a rule method, including self.
+    Example:
+        create_rule_input(self, "P000000010", "C000000001")
+    will return
+        {
+            "*arg2": '"P000000010"',
+            "*arg3": '"C000000001"',
+        }
+    """
+    return dict(zip(rule_input_keys(len(args) - 1), map(format_rule_argument, args[1:])))
 
 
 MAX_RETRY_API_CALL = 5
@@ -202,7 +528,9 @@ def retry_api_call(func: Callable):
     def retry(*args, **kwargs):
         for retry_index in range(MAX_RETRY_API_CALL):
             try:
-                return func(*args, **kwargs)
+                # args[0] is the rule manager, see BaseRuleManager.checkout_session
+                with args[0].checkout_session():
+                    return func(*args, **kwargs)
             except NetworkException as error:
                 if retry_index < MAX_RETRY_API_CALL - 1:
                     continue
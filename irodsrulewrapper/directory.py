@@ -0,0 +1,274 @@
+"""
+This module contains the Directory class, an in-memory index of the iRODS users, groups and group memberships.
+"""
+import threading
+import time
+
+from irodsrulewrapper.dto.group import Group
+from irodsrulewrapper.dto.groups import Groups
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.dto.user_group_expanded import UserGroupExpanded
+from irodsrulewrapper.dto.users import Users
+from irodsrulewrapper.dto.users_groups_expanded import UsersGroupsExpanded
+
+SERVICE_ACCOUNT_PREFIX = "service-"
+
+
+class Directory:
+    """
+    This class answers the users and groups lookups locally, instead of one rule call per lookup (get_users,
+    get_groups, get_users_in_group, get_user_group_memberships, get_expanded_user_group_information).
+
+    The directory is loaded with a few GenQueries, see RuleManager.get_user_accounts & get_group_memberships.
+    It keeps hash indexes on the id, name, email and display name of the accounts, and the membership adjacency maps
+    (user to groups & group to users). refresh() queries again all the accounts with their AVUs (a deleted AVU leaves
+    no modification time to query), and the memberships; only the changed accounts are re-indexed.
+
+    The rule manager must be an admin RuleManager. The directory can be shared by several threads.
+
+    Examples
+    --------
+        directory = Directory(RuleManager(admin_mode=True))
+        directory.refresh()
+        user = directory.get_user_by_name("jmelius")
+        groups = directory.get_user_group_memberships("jmelius")
+    """
+
+    def __init__(self, rule_manager):
+        """
+        Parameters
+        ----------
+        rule_manager: RuleManager
+            The admin rule manager used to query the accounts
+        """
+        self.rule_manager = rule_manager
+        # Epoch timestamp of the last refresh; None until the directory is loaded
+        self.refreshed_at = None
+        self._lock = threading.RLock()
+        self._accounts = {}
+        self._ids_by_name = {}
+        self._ids_by_email = {}
+        self._ids_by_display_name = {}
+        self._groups_by_user = {}
+        self._users_by_group = {}
+
+    def refresh(self):
+        """
+        Load the directory: all the accounts and their AVUs, and all the memberships. On the following calls, only the
+        accounts created, modified or deleted since the previous refresh are re-indexed.
+        """
+        refresh_time = int(time.time())
+        accounts = self.rule_manager.get_user_accounts()
+        memberships = self.rule_manager.get_group_memberships()
+
+        with self._lock:
+            for account_id in set(self._accounts).difference(accounts):
+                self._remove_account(account_id)
+            for account_id, account in accounts.items():
+                if self._accounts.get(account_id) != account:
+                    self._remove_account(account_id)
+                    self._add_account(account)
+            self._groups_by_user = {}
+            self._users_by_group = {}
+            for user_id, group_id in memberships:
+                self._groups_by_user.setdefault(user_id, set()).add(group_id)
+                self._users_by_group.setdefault(group_id, set()).add(user_id)
+            self.refreshed_at = refresh_time
+
+    def get_user(self, user_id):
+        """
+        Returns
+        -------
+        User | None
+            The user with the input id
+        """
+        account = self._get_account(user_id, "rodsuser")
+        return create_user(account) if account else None
+
+    def get_user_by_name(self, username):
+        return self.get_user(self._ids_by_name.get(username))
+
+    def get_user_by_email(self, email):
+        return self.get_user(self._ids_by_email.get(email.lower()))
+
+    def get_email(self, username):
+        account = self._get_account(self._ids_by_name.get(username), "rodsuser")
+        return account.get("email", "") if account else None
+
+    def find_users_by_display_name(self, display_name):
+        """
+        Parameters
+        ----------
+        display_name: str
+            The display name, case-insensitive; e.g: 'jonathan melius'
+
+        Returns
+        -------
+        list[User]
+            The users with this display name, it is not unique
+        """
+        with self._lock:
+            user_ids = sorted(self._ids_by_display_name.get(display_name.lower(), ()))
+            users = [self.get_user(user_id) for user_id in user_ids]
+        return [user for user in users if user]
+
+    def get_group(self, group_id):
+        """
+        Returns
+        -------
+        Group | None
+            The group with the input id
+        """
+        account = self._get_account(group_id, "rodsgroup")
+        return create_group(account) if account else None
+
+    def get_group_by_name(self, name):
+        return self.get_group(self._ids_by_name.get(name))
+
+    def get_users(self, show_service_accounts=False):
+        """
+        Local equivalent of UserRuleManager.get_users.
+
+        Parameters
+        ----------
+        show_service_accounts: bool
+            If true, include the service accounts
+
+        Returns
+        -------
+        Users
+            dto.Users object
+        """
+        with self._lock:
+            accounts = [account for account in self._accounts.values() if account["type"] == "rodsuser"]
+        if not show_service_accounts:
+            accounts = [account for account in accounts if not account["name"].startswith(SERVICE_ACCOUNT_PREFIX)]
+        return Users(users=[create_user(account) for account in sorted(accounts, key=lambda item: item["name"])])
+
+    def get_groups(self):
+        """
+        Local equivalent of GroupRuleManager.get_groups.
+
+        Returns
+        -------
+        Groups
+            dto.Groups object
+        """
+        with self._lock:
+            accounts = [account for account in self._accounts.values() if account["type"] == "rodsgroup"]
+        return Groups(groups=[create_group(account) for account in sorted(accounts, key=lambda item: item["name"])])
+
+    def get_users_in_group(self, group_id):
+        """
+        Local equivalent of GroupRuleManager.get_users_in_group.
+
+        Parameters
+        ----------
+        group_id: str
+            The group id
+
+        Returns
+        -------
+        Users
+            dto.Users object
+        """
+        with self._lock:
+            users = [self.get_user(user_id) for user_id in sorted(self._users_by_group.get(group_id, ()))]
+        return Users(users=[user for user in users if user])
+
+    def get_user_group_memberships(self, username):
+        """
+        Local equivalent of GroupRuleManager.get_user_group_memberships.
+
+        Parameters
+        ----------
+        username: str
+            The username
+
+        Returns
+        -------
+        Groups
+            dto.Groups object
+        """
+        with self._lock:
+            group_ids = sorted(self._groups_by_user.get(self._ids_by_name.get(username), ()))
+            groups = [self.get_group(group_id) for group_id in group_ids]
+        return Groups(groups=[group for group in groups if group])
+
+    def get_expanded_user_group_information(self, names):
+        """
+        Local equivalent of UserRuleManager.get_expanded_user_group_information: the groups are expanded to their
+        members. The unknown names are skipped.
+
+        Parameters
+        ----------
+        names: Iterable[str]
+            The user and group names; e.g: ['dlinssen', 'datahub']
+
+        Returns
+        -------
+        UsersGroupsExpanded
+            Per user and group name, its display name and email (users only)
+        """
+        output = {}
+        with self._lock:
+            for name in names:
+                account = self._accounts.get(self._ids_by_name.get(name))
+                if account is None:
+                    continue
+                output[name] = create_user_group_expanded(account)
+                if account["type"] == "rodsgroup":
+                    for user_id in self._users_by_group.get(account["id"], ()):
+                        member = self._accounts.get(user_id)
+                        if member is not None:
+                            output[member["name"]] = create_user_group_expanded(member)
+        return UsersGroupsExpanded(user_groups=output)
+
+    def _get_account(self, account_id, account_type):
+        account = self._accounts.get(account_id)
+        if account is None or account["type"] != account_type:
+            return None
+        return account
+
+    def _add_account(self, account):
+        # Must be called with the lock held
+        account_id = account["id"]
+        self._accounts[account_id] = account
+        self._ids_by_name[account["name"]] = account_id
+        if account.get("email"):
+            self._ids_by_email[account["email"].lower()] = account_id
+        if account.get("displayName"):
+            self._ids_by_display_name.setdefault(account["displayName"].lower(), set()).add(account_id)
+
+    def _remove_account(self, account_id):
+        # Must be called with the lock held
+        account = self._accounts.pop(account_id, None)
+        if account is None:
+            return
+        if self._ids_by_name.get(account["name"]) == account_id:
+            del self._ids_by_name[account["name"]]
+        if account.get("email") and self._ids_by_email.get(account["email"].lower()) == account_id:
+            del self._ids_by_email[account["email"].lower()]
+        if account.get("displayName"):
+            display_name = account["displayName"].lower()
+            account_ids = self._ids_by_display_name.get(display_name, set())
+            account_ids.discard(account_id)
+            if not account_ids:
+                self._ids_by_display_name.pop(display_name, None)
+
+
+def create_user(account):
+    return User(user_name=account["name"], user_id=account["id"], display_name=account.get("displayName", ""))
+
+
+def create_group(account):
+    return Group(
+        name=account["name"],
+        id=account["id"],
+        display_name=account.get("displayName", ""),
+        description=account.get("description", ""),
+    )
+
+
+def create_user_group_expanded(account):
+    return UserGroupExpanded(display_name=account.get("displayName", ""), email=account.get("email", ""))
@@ -27,9 +27,6 @@ class DropZone(BaseModel):
 
     @classmethod
     def create_from_rule_result(cls, result: dict) -> "DropZone":
-        if "resourceStatus" not in result:
-            result["resourceStatus"] = ""
-
         user = cls(
             date=result["date"],
             project=result["project"],
@@ -39,7 +36,7 @@ class DropZone(BaseModel):
             token=result["token"],
             validate_msg=result["validateMsg"],
             validate_state=result["validateState"],
-            resource_status=result["resourceStatus"],
+            resource_status=result.get("resourceStatus", ""),
             total_size=result["totalSize"],
             destination=result["destination"],
             type=result["type"],
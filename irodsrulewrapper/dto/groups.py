@@ -1,9 +1,8 @@
 """This module contains the Users DTO class, its factory constructors and mock_json."""
-import json
-
 from irodsrulewrapper.dto.group import Group
+from irodsrulewrapper.fixtures import parse_mock_json
 from pydantic import BaseModel
-from typing import List
+from typing import Iterable, Iterator, List
 
 
 class Groups(BaseModel):
@@ -20,11 +19,16 @@ class Groups(BaseModel):
         groups = cls(groups=output)
         return groups
 
+    @classmethod
+    def iter_from_rule_result(cls, result: Iterable[dict]) -> Iterator[Group]:
+        for item in result:
+            yield Group.create_from_rule_result(item)
+
     @classmethod
     def create_from_mock_result(cls, mock_json=None) -> "Groups":
         if mock_json is None:
             mock_json = MOCK_JSON
-        return cls.create_from_rule_result(json.loads(mock_json))
+        return cls.create_from_rule_result(parse_mock_json(mock_json))
 
 
 MOCK_JSON = """
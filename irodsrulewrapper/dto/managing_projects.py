@@ -1,5 +1,5 @@
 """This module contains the ManagingProjects DTO class, its factory constructors and mock_json."""
-import json
+from irodsrulewrapper.fixtures import parse_mock_json
 
 
 class ManagingProjects:
@@ -27,7 +27,8 @@ class ManagingProjects:
         if len(result) == 0:
             return None
 
-        managers = result["managers"]["users"]
+        # Copy, the mock results are shared (see parse_mock_json)
+        managers = list(result["managers"]["users"])
         contributors = result["contributors"]["users"] + result["contributors"]["groups"]
         viewers = result["viewers"]["users"] + result["viewers"]["groups"]
         projects = cls(managers, contributors, viewers, result["principal_investigator"], result["data_steward"])
@@ -38,7 +39,7 @@ class ManagingProjects:
     def create_from_mock_result(cls, mock_json=None) -> "ManagingProjects":
         if mock_json is None:
             mock_json = cls.MOCK_JSON
-        return cls.create_from_rule_result(json.loads(mock_json))
+        return cls.create_from_rule_result(parse_mock_json(mock_json))
 
     MOCK_JSON = """
     {
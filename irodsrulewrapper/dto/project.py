@@ -1,11 +1,12 @@
 """This module contains the Project DTO class, its factory constructors and mock_json."""
-import json
+import copy
 
 from dhpythonirodsutils import formatters
 from dhpythonirodsutils.enums import ProjectAVUs
 
 from irodsrulewrapper.dto.groups import Groups
 from irodsrulewrapper.dto.users import Users
+from irodsrulewrapper.fixtures import parse_mock_json
 
 
 class Project:
@@ -57,10 +58,6 @@ class Project:
 
     @classmethod
     def create_from_rule_result(cls, result: dict) -> "Project":
-        if "principalInvestigatorDisplayName" not in result:
-            result["principalInvestigatorDisplayName"] = ""
-        if "dataStewardDisplayName" not in result:
-            result["dataStewardDisplayName"] = ""
         project_details = cls(
             result["project"],
             result[ProjectAVUs.TITLE.value],
@@ -68,12 +65,12 @@ class Project:
             formatters.format_string_to_boolean(result[ProjectAVUs.ENABLE_ARCHIVE.value]),
             formatters.format_string_to_boolean(result[ProjectAVUs.ENABLE_UNARCHIVE.value]),
             formatters.format_string_to_boolean(result[ProjectAVUs.ENABLE_CONTRIBUTOR_EDIT_METADATA.value]),
-            result["principalInvestigatorDisplayName"],
-            result["dataStewardDisplayName"],
+            result.get("principalInvestigatorDisplayName", ""),
+            result.get("dataStewardDisplayName", ""),
             result["respCostCenter"],
             result["storageQuotaGiB"],
             result["dataSizeGiB"],
-            result[ProjectAVUs.COLLECTION_METADATA_SCHEMAS.value],
+            copy.copy(result[ProjectAVUs.COLLECTION_METADATA_SCHEMAS.value]),
             formatters.format_string_to_boolean(result[ProjectAVUs.ENABLE_DROPZONE_SHARING.value]),
             Users.create_from_rule_result(result["managers"]["userObjects"]),
             Groups.create_from_rule_result(result["managers"]["groupObjects"]),
@@ -89,7 +86,7 @@ class Project:
     def create_from_mock_result(cls, project_json=None) -> "Project":
         if project_json is None:
             project_json = cls.PROJECT_JSON
-        return Project.create_from_rule_result(json.loads(project_json))
+        return Project.create_from_rule_result(parse_mock_json(project_json))
 
     PROJECT_JSON = """
     {
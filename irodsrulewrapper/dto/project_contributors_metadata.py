@@ -1,9 +1,8 @@
 """This module contains the ProjectContributorsMetadata DTO class and its factory constructor."""
-import json
-
 from dhpythonirodsutils.enums import ProjectAVUs
 
 from irodsrulewrapper.dto.user_extended import UserExtended
+from irodsrulewrapper.fixtures import parse_mock_json
 
 
 class ProjectContributorsMetadata:
@@ -32,7 +31,7 @@ class ProjectContributorsMetadata:
     def create_from_mock_result(cls, project_json=None) -> "ProjectContributorsMetadata":
         if project_json is None:
             project_json = cls.CONTRIBUTORS_METADATA
-        return ProjectContributorsMetadata.create_from_rule_result(json.loads(project_json))
+        return ProjectContributorsMetadata.create_from_rule_result(parse_mock_json(project_json))
 
     CONTRIBUTORS_METADATA = """
     {
@@ -37,13 +37,10 @@ class ProjectOverview:
     def create_from_rule_result(cls, result: dict) -> "ProjectOverview":
         user_groups = convert_uids_to_users_or_groups(result)
 
-        if ProjectAVUs.DESCRIPTION.value not in result:
-            result[ProjectAVUs.DESCRIPTION.value] = ""
-
         project_details = cls(
             result["path"],
             result[ProjectAVUs.TITLE.value],
-            result[ProjectAVUs.DESCRIPTION.value],
+            result.get(ProjectAVUs.DESCRIPTION.value, ""),
             result[ProjectAVUs.PRINCIPAL_INVESTIGATOR.value],
             result[ProjectAVUs.DATA_STEWARD.value],
             result["dataSizeGiB"],
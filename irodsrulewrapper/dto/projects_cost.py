@@ -1,7 +1,9 @@
 """This module contains the ProjectsCost DTO class, its factory constructors and mock_json."""
-import json
+from typing import Iterable, Iterator
 
 from irodsrulewrapper.dto.project_cost import ProjectCost
+from irodsrulewrapper.fixtures import parse_mock_json
+from irodsrulewrapper.parallel import parse_items
 
 
 class ProjectsCost:
@@ -16,18 +18,20 @@ class ProjectsCost:
         if len(result) == 0:
             return None
 
-        output = []
-        for item in result:
-            project = ProjectCost.create_from_rule_result(item)
-            output.append(project)
+        output = parse_items(ProjectCost.create_from_rule_result, result)
         projects = cls(output)
         return projects
 
+    @classmethod
+    def iter_from_rule_result(cls, result: Iterable[dict]) -> Iterator["ProjectCost"]:
+        for item in result:
+            yield ProjectCost.create_from_rule_result(item)
+
     @classmethod
     def create_from_mock_result(cls, projects_cost_json=None) -> "ProjectsCost":
         if projects_cost_json is None:
             projects_cost_json = cls.PROJECTS_COST_JSON
-        return ProjectsCost.create_from_rule_result(json.loads(projects_cost_json))
+        return ProjectsCost.create_from_rule_result(parse_mock_json(projects_cost_json))
 
     PROJECTS_COST_JSON = """
     [
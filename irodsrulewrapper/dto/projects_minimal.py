@@ -1,10 +1,9 @@
 """This module contains the ProjectsMinimal DTO class, its factory constructors and mock_json."""
-import json
-
 from pydantic import BaseModel
 from typing import List
 
 from irodsrulewrapper.dto.project_minimal import ProjectMinimal
+from irodsrulewrapper.fixtures import parse_mock_json
 
 
 class ProjectsMinimal(BaseModel):
@@ -37,7 +36,7 @@ class ProjectsMinimal(BaseModel):
     def create_from_mock_result(cls, projects_json=None) -> "ProjectsMinimal":
         if projects_json is None:
             projects_json = PROJECTS_MINIMAL_JSON
-        return ProjectsMinimal.create_from_rule_result(json.loads(projects_json))
+        return ProjectsMinimal.create_from_rule_result(parse_mock_json(projects_json))
 
 
 PROJECTS_MINIMAL_JSON: str = """
@@ -22,3 +22,30 @@ class ProjectsOverview:
             output.append(project)
         projects = cls(output)
         return projects
+
+    def merge(self, changes: "ProjectsOverview", project_ids: set) -> "ProjectsOverview":
+        """
+        Merge the modified projects into a copy of this overview.
+
+        Parameters
+        ----------
+        changes: ProjectsOverview
+            The projects modified since this overview was created; they replace the existing entries or are added.
+        project_ids: set
+            The ids of all the projects still visible to the user; the other entries are dropped.
+
+        Returns
+        -------
+        ProjectsOverview
+            The merged overview
+        """
+        changed = {project.id: project for project in changes.projects}
+        output = []
+        for project in self.projects:
+            if project.id not in project_ids:
+                continue
+            output.append(changed.pop(project.id, project))
+        for project in changed.values():
+            if project.id in project_ids:
+                output.append(project)
+        return ProjectsOverview(output)
@@ -11,7 +11,5 @@ class Resource:
 
     @classmethod
     def create_from_rule_result(cls, result: dict) -> "Resource":
-        if "available" not in result:
-            result["available"] = False
-        resource = cls(result["name"], result["comment"], result["available"])
+        resource = cls(result["name"], result["comment"], result.get("available", False))
         return resource
@@ -1,5 +1,5 @@
 """This module contains the UserExtended DTO class, its factory constructors and mock_json."""
-import json
+from irodsrulewrapper.fixtures import parse_mock_json
 
 
 class UserExtended:
@@ -25,7 +25,7 @@ class UserExtended:
         if user_json is None:
             user_json = cls.USER_METADATA
 
-        return UserExtended.create_from_rule_result(json.loads(user_json))
+        return UserExtended.create_from_rule_result(parse_mock_json(user_json))
 
     USER_METADATA = """
     {
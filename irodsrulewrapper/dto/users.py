@@ -1,10 +1,9 @@
 """This module contains the Users DTO class, its factory constructors and mock_json."""
-import json
-
 from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.fixtures import parse_mock_json
 
 from pydantic import BaseModel
-from typing import List
+from typing import Iterable, Iterator, List
 
 
 class Users(BaseModel):
@@ -21,11 +20,16 @@ class Users(BaseModel):
         users = cls(users=output)
         return users
 
+    @classmethod
+    def iter_from_rule_result(cls, result: Iterable[dict]) -> Iterator[User]:
+        for item in result:
+            yield User.create_from_rule_result(item)
+
     @classmethod
     def create_from_mock_result(cls, mock_json=None) -> "Users":
         if mock_json is None:
             mock_json = MOCK_JSON
-        return cls.create_from_rule_result(json.loads(mock_json))
+        return cls.create_from_rule_result(parse_mock_json(mock_json))
 
 
 MOCK_JSON = """
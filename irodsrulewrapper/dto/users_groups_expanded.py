@@ -1,10 +1,10 @@
 """This module contains the UsersGroupsExpanded DTO class, its factory constructors and mock_json."""
-import json
-
 from pydantic import BaseModel
 from typing import Dict
 
 from irodsrulewrapper.dto.user_group_expanded import UserGroupExpanded
+from irodsrulewrapper.fixtures import parse_mock_json
+from irodsrulewrapper.parallel import parse_items
 
 
 class UsersGroupsExpanded(BaseModel):
@@ -29,10 +29,8 @@ class UsersGroupsExpanded(BaseModel):
 
     @classmethod
     def create_from_rule_result(cls, result: dict) -> "UsersGroupsExpanded":
-        expanded_users_groups_list = {}
-        for name, attribute in result.items():
-            user_group = UserGroupExpanded.create_from_rule_result(attribute)
-            expanded_users_groups_list[name] = user_group
+        user_groups = parse_items(UserGroupExpanded.create_from_rule_result, list(result.values()))
+        expanded_users_groups_list = dict(zip(result.keys(), user_groups))
         output = cls(user_groups=expanded_users_groups_list)
         return output
 
@@ -40,7 +38,7 @@ class UsersGroupsExpanded(BaseModel):
     def create_from_mock_result(cls, projects_json=None) -> "UsersGroupsExpanded":
         if projects_json is None:
             projects_json = USERS_GROUPS_JSON
-        return UsersGroupsExpanded.create_from_rule_result(json.loads(projects_json))
+        return UsersGroupsExpanded.create_from_rule_result(parse_mock_json(projects_json))
 
 
 USERS_GROUPS_JSON: str = """
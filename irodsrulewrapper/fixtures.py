@@ -0,0 +1,401 @@
+"""
+This module contains the DTO fixtures shared by the tests, the offline demo, the benchmarks and the load tests:
+    * parse_mock_json, the parsed mock rule results (see the create_from_mock_result factories), parsed once
+    * RuleResultGenerator, a seeded generator of synthetic rule results of any size, for every DTO
+
+It must not import the DTO modules, they import parse_mock_json.
+"""
+import functools
+import itertools
+import json
+import random
+import re
+
+from dhpythonirodsutils.enums import ProcessState, ProcessType, ProjectAVUs
+
+FIRST_NAMES = ("Jonathan", "Olav", "Pascal", "Dean", "Daniel", "Paul", "Maria", "Sofie", "Lotte", "Noah", "Emma")
+FAMILY_NAMES = ("Melius", "Palmen", "Suppers", "Linssen", "Theunissen", "van Schayck", "Janssen", "de Vries", "Smit")
+WORDS = (
+    "data ions imaging cohort brain protein signal pilot study archive scanner nanoscopy placeholder project "
+    "metabolic sample clinical trial sequencing model"
+).split()
+RESOURCES = ("replRescUM01", "replRescAZM01", "arcRescSURF01")
+DROP_ZONE_STATES = ("open", "in_queue_for_validation", "validating", "ingesting", "ingested", "error-post-ingestion")
+PROCESS_TYPES = ("archive", "unarchive", "export")
+
+
+@functools.lru_cache(maxsize=None)
+def parse_mock_json(mock_json: str):
+    """
+    Parse a mock rule result. The mock is parsed once; the next calls with the same string return the same object.
+
+    The output is shared between the callers: it must not be modified. The DTO factories only read their input, and
+    copy the lists and dicts they keep as attributes.
+
+    Parameters
+    ----------
+    mock_json: str
+        The mock rule result; e.g: Users.MOCK_JSON
+
+    Returns
+    -------
+    dict | list
+        The parsed rule result
+    """
+    return json.loads(mock_json)
+
+
+class RuleResultGenerator:
+    """
+    This class generates synthetic rule results: the output of json.loads on the rule output, for every DTO type.
+    The same seed generates the same results.
+
+    The DTO name in snake_case is the name of its generator method (e.g: Users -> users, ExternalPID ->
+    external_pid). The list DTOs generators have a 'count' parameter, the number of items.
+
+    The users and groups generated are also recorded in 'accounts', in the format of the rule
+    get_user_or_group_by_id, to pre-fill the users and groups cache before parsing a generated ProjectsOverview.
+
+    Examples
+    --------
+        generator = RuleResultGenerator(seed=42)
+        users = Users.create_from_rule_result(generator.users(count=10000))
+        rule_output = json.dumps(generator.generate(ProjectsCost, count=500))
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.accounts = {}
+        self._ids = itertools.count(10000)
+        self._project_ids = itertools.count(1)
+
+    def generate(self, dto_class, **kwargs):
+        """
+        Parameters
+        ----------
+        dto_class: type
+            The DTO class; e.g: Users
+        kwargs
+            The generator method parameters; e.g: count=1000
+
+        Returns
+        -------
+        dict | list | str | bool
+            A rule result, that dto_class.create_from_rule_result parses
+        """
+        method_name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", dto_class.__name__).lower()
+        return getattr(self, method_name)(**kwargs)
+
+    # Users and groups
+
+    def user(self):
+        uid = str(next(self._ids))
+        given_name = self.random.choice(FIRST_NAMES)
+        family_name = self.random.choice(FAMILY_NAMES)
+        result = {
+            "userName": f"{given_name[0]}{family_name.replace(' ', '')}{uid}".lower(),
+            "userId": uid,
+            "displayName": f"{given_name} {family_name}",
+        }
+        self.accounts[uid] = {"account_type": "rodsuser", **result}
+        return result
+
+    def users(self, count=10):
+        return [self.user() for _ in range(count)]
+
+    def group(self):
+        gid = str(next(self._ids))
+        name = f"{self.random.choice(WORDS)}-{gid}"
+        display_name = self._title(2)
+        description = self._title(6)
+        self.accounts[gid] = {
+            "account_type": "rodsgroup",
+            "userName": name,
+            "userId": gid,
+            "displayName": display_name,
+            "description": description,
+        }
+        return {"name": name, "groupId": gid, "displayName": display_name, "description": description}
+
+    def groups(self, count=10):
+        return [self.group() for _ in range(count)]
+
+    def user_or_group(self):
+        # Same output as get_user_or_group_by_id
+        if self.random.random() < 0.8:
+            return self.accounts[self.user()["userId"]]
+        return self.accounts[self.group()["groupId"]]
+
+    def user_extended(self):
+        user = self.user()
+        given_name, family_name = user["displayName"].split(" ", 1)
+        return {
+            "username": user["userName"],
+            "displayName": user["displayName"],
+            "givenName": given_name,
+            "familyName": family_name,
+            "email": f"{user['userName']}@example.org",
+        }
+
+    def user_group_expanded(self):
+        return self._expanded(self.user_or_group())
+
+    def users_groups_expanded(self, count=10):
+        accounts = [self.user_or_group() for _ in range(count)]
+        return {account["userName"]: self._expanded(account) for account in accounts}
+
+    def data_steward(self):
+        return self.user()
+
+    def data_stewards(self, count=10):
+        return [self.data_steward() for _ in range(count)]
+
+    # Projects
+
+    def project(self, count=3):
+        """count: the number of users and groups per role"""
+        return {
+            "project": self._project_id(),
+            ProjectAVUs.TITLE.value: self._title(),
+            ProjectAVUs.DESCRIPTION.value: self._title(20),
+            ProjectAVUs.ENABLE_ARCHIVE.value: self._boolean(),
+            ProjectAVUs.ENABLE_UNARCHIVE.value: self._boolean(),
+            ProjectAVUs.ENABLE_CONTRIBUTOR_EDIT_METADATA.value: self._boolean(),
+            "principalInvestigatorDisplayName": self.user()["displayName"],
+            "dataStewardDisplayName": self.user()["displayName"],
+            "respCostCenter": f"UM-{self.random.randrange(10**10):010d}",
+            "storageQuotaGiB": self.random.randrange(1000),
+            "dataSizeGiB": round(self.random.uniform(0, 1000), 4),
+            ProjectAVUs.COLLECTION_METADATA_SCHEMAS.value: "DataHub_general_schema",
+            ProjectAVUs.ENABLE_DROPZONE_SHARING.value: self._boolean(),
+            "managers": self._acl(count),
+            "contributors": self._acl(count),
+            "viewers": self._acl(count),
+            "has_financial_view_access": self.random.random() < 0.5,
+        }
+
+    def project_minimal(self):
+        return {"id": self._project_id(), "title": self._title()}
+
+    def projects_minimal(self, count=10):
+        return [self.project_minimal() for _ in range(count)]
+
+    def project_overview(self, count=3):
+        """count: the number of users and groups per role"""
+        return {
+            "path": f"/nlmumc/projects/{self._project_id()}",
+            ProjectAVUs.TITLE.value: self._title(),
+            ProjectAVUs.DESCRIPTION.value: self._title(20),
+            ProjectAVUs.PRINCIPAL_INVESTIGATOR.value: self.user()["userName"],
+            ProjectAVUs.DATA_STEWARD.value: self.user()["userName"],
+            "dataSizeGiB": round(self.random.uniform(0, 1000), 4),
+            "managers": [self.user()["userId"] for _ in range(count)],
+            "contributors": [self.user_or_group()["userId"] for _ in range(count)],
+            "viewers": [self.user_or_group()["userId"] for _ in range(count)],
+        }
+
+    def projects_overview(self, count=10, members=3):
+        return [self.project_overview(members) for _ in range(count)]
+
+    def project_cost(self):
+        size_gb = round(self.random.uniform(0, 5000), 6)
+        cost_yearly = round(size_gb * 0.13, 6)
+        return {
+            "project_id": self._project_id(),
+            "project_cost_yearly": cost_yearly,
+            "project_cost_monthly": cost_yearly / 12,
+            "project_size_gb": size_gb,
+            "project_size_gib": size_gb / 1.073741824,
+            "budget_number": f"UM-{self.random.randrange(10**8):08d}",
+            "title": self._title(),
+        }
+
+    def projects_cost(self, count=10):
+        return [self.project_cost() for _ in range(count)]
+
+    def project_contributors(self, count=3):
+        return {
+            "users": [self.user()["userName"] for _ in range(count)],
+            "groups": [self.group()["name"] for _ in range(count)],
+        }
+
+    def project_contributors_metadata(self):
+        return {"principalInvestigator": self.user_extended(), ProjectAVUs.DATA_STEWARD.value: self.user_extended()}
+
+    def contributing_project(self, count=3):
+        """count: the number of users and groups per role"""
+        return {
+            "id": self._project_id(),
+            ProjectAVUs.TITLE.value: self._title(),
+            ProjectAVUs.RESOURCE.value: self.random.choice(RESOURCES),
+            ProjectAVUs.COLLECTION_METADATA_SCHEMAS.value: "DataHub_general_schema",
+            "managers": self._acl(count),
+            "contributors": self._acl(count),
+            "viewers": self._acl(count),
+        }
+
+    def contributing_projects(self, count=10, members=3):
+        return [self.contributing_project(members) for _ in range(count)]
+
+    def managing_projects(self, count=3):
+        """count: the number of users and groups per role"""
+        return {
+            "principal_investigator": self.user()["userName"],
+            "data_steward": self.user()["userName"],
+            "managers": self._acl(count),
+            "contributors": self._acl(count),
+            "viewers": self._acl(count),
+        }
+
+    def create_project(self):
+        project_id = self._project_id()
+        return {"project_path": f"/nlmumc/projects/{project_id}", "project_id": project_id}
+
+    def project_activity(self):
+        return {"has_process_activity": self.random.random() < 0.5, "has_active_collection": self.random.random() < 0.5}
+
+    # Collections
+
+    def collection(self):
+        num_files = self.random.randrange(1, 100000)
+        return {
+            "id": f"C{self.random.randrange(1, 1000):09d}",
+            "creator": f"{self.user()['userName']}@example.org",
+            "size": float(self.random.randrange(10**12)),
+            "title": self._title(),
+            "PID": f"21.T12996/{self._project_id()}C000000001",
+            "numFiles": str(num_files),
+            "numUserFiles": num_files - 1,
+            ProjectAVUs.ENABLE_ARCHIVE.value: self._boolean(),
+            ProjectAVUs.ENABLE_UNARCHIVE.value: self._boolean(),
+        }
+
+    def collections(self, count=10):
+        return [self.collection() for _ in range(count)]
+
+    def collection_details(self, count=2):
+        """count: the number of external PIDs"""
+        result = self.collection()
+        result["collection"] = result.pop("id")
+        result["byteSize"] = int(result.pop("size"))
+        result["externals"] = [self.external_pid() for _ in range(count)] if count else "no-externalPID-set"
+        return result
+
+    def collection_size(self):
+        return {
+            "resourceName": self.random.choice(RESOURCES),
+            "size": str(self.random.randrange(10**12)),
+            "relativeSize": round(self.random.uniform(0, 100), 1),
+        }
+
+    def collection_sizes(self, count=10):
+        return {
+            f"C{index:09d}": [self.collection_size() for _ in range(self.random.randint(1, len(RESOURCES)))]
+            for index in range(1, count + 1)
+        }
+
+    def collection_stats(self):
+        return {"total_file_count": self.random.randrange(100000), "total_file_size": self.random.randrange(10**12)}
+
+    def metadata_pid(self):
+        pid = f"21.T12996/{self._project_id()}C000000001"
+        return {"instance": f"{pid}instance.1", "collection": pid, "schema": f"{pid}schema.1"}
+
+    def external_pid(self):
+        return {
+            "value": f"doi:10.{self.random.randrange(1000, 99999)}/{self.random.randrange(10**6)}",
+            "unit": "Zenodo",
+        }
+
+    def attribute_value(self):
+        return {"value": self._title()}
+
+    def boolean(self):
+        return self.random.random() < 0.5
+
+    # Drop-zones and processes
+
+    def token(self):
+        return f"{self.random.choice(WORDS)}-{self.random.choice(WORDS)}-{next(self._ids)}"
+
+    def drop_zone(self, state=None):
+        return {
+            "date": f"0{self.random.randrange(1600000000, 1800000000)}",
+            "project": self._project_id(),
+            "projectTitle": self._title(),
+            "state": state or self.random.choice(DROP_ZONE_STATES),
+            "title": self._title(),
+            "token": self.token(),
+            "validateMsg": "N/A",
+            "validateState": "N/A",
+            "totalSize": str(self.random.randrange(10**12)),
+            "destination": f"C{self.random.randrange(1, 1000):09d}",
+            "type": self.random.choice(("mounted", "direct")),
+            "creator": self.user()["userName"],
+            "process_type": ProcessType.DROP_ZONE.value,
+            "percentage_ingested": round(self.random.uniform(0, 100), 1),
+            "sharedWithMe": self._boolean(),
+            ProjectAVUs.ENABLE_DROPZONE_SHARING.value: self._boolean(),
+        }
+
+    def drop_zones(self, count=10):
+        return [self.drop_zone() for _ in range(count)]
+
+    def active_process(self):
+        process_type = self.random.choice(PROCESS_TYPES)
+        project_id = self._project_id()
+        return {
+            "repository": "Dataverse" if process_type == "export" else "SURFSara Tape",
+            "state": f"{process_type}-in-progress",
+            "collection_id": f"C{self.random.randrange(1, 1000):09d}",
+            "collection_title": self._title(),
+            "project_id": project_id,
+            "project_title": self._title(),
+            "process_id": f"{project_id}-{next(self._ids)}",
+            "process_type": process_type,
+        }
+
+    def active_processes(self, count=10):
+        """count: the number of processes per state"""
+        output = {ProcessState.OPEN.value: [self.drop_zone("open") for _ in range(count)]}
+        for state in (ProcessState.COMPLETED, ProcessState.ERROR, ProcessState.IN_PROGRESS):
+            output[state.value] = [
+                self.drop_zone() if self.random.random() < 0.5 else self.active_process() for _ in range(count)
+            ]
+        return output
+
+    # Resources
+
+    def resource(self):
+        return {"name": self.random.choice(RESOURCES), "comment": self._title(4), "available": self.boolean()}
+
+    def resources(self, count=10):
+        return [self.resource() for _ in range(count)]
+
+    def _acl(self, count):
+        # Format of the project ACL rule outputs: the users and groups, by name and as objects
+        users = self.users(count)
+        groups = [{"groupName": group["name"], **group} for group in self.groups(count)]
+        return {
+            "users": [user["userName"] for user in users],
+            "groups": [group["name"] for group in groups],
+            "userObjects": users,
+            "groupObjects": groups,
+        }
+
+    @staticmethod
+    def _expanded(account):
+        # Format of get_expanded_user_group_information: the groups have no email
+        if account["account_type"] == "rodsgroup":
+            return {"displayName": account["displayName"]}
+        return {"displayName": account["displayName"], "email": f"{account['userName']}@example.org"}
+
+    def _project_id(self):
+        return f"P{next(self._project_ids):09d}"
+
+    def _title(self, words=5):
+        return " ".join(self.random.choice(WORDS) for _ in range(words)).capitalize()
+
+    def _boolean(self):
+        # The AVU booleans are strings
+        return "true" if self.random.random() < 0.5 else "false"
@@ -0,0 +1,52 @@
+"""
+This module contains the PageIterator class to iterate over the pages of a paginated rule.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class PageIterator:
+    """
+    Iterate over the pages of a paginated rule, while the next page is already requested in a background thread.
+
+    The pages are DTOs with a 'projects' list attribute (e.g. ProjectsOverview, ProjectsMinimal,
+    ContributingProjects). The iteration stops on an empty page (None or no projects) or on a page shorter than
+    the requested limit.
+
+    Examples
+    --------
+        for page in rule_manager.iterate_projects_minimal(page_size=50, title="placeholder"):
+            for project in page.projects:
+                print(project.id)
+    """
+
+    def __init__(self, fetch_page: Callable, page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        Parameters
+        ----------
+        fetch_page: Callable
+            Function with the signature fetch_page(offset: int, limit: int) that returns a page DTO
+        page_size: int
+            The number of projects requested per page
+        """
+        if not isinstance(page_size, int) or page_size <= 0:
+            raise ValueError("page_size: expected a positive integer")
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+
+    def __iter__(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            future = executor.submit(self.fetch_page, offset, self.page_size)
+            while True:
+                page = future.result()
+                if page is None or len(page.projects) == 0:
+                    return
+                if len(page.projects) < self.page_size:
+                    yield page
+                    return
+                offset += self.page_size
+                future = executor.submit(self.fetch_page, offset, self.page_size)
+                yield page
@@ -0,0 +1,131 @@
+"""
+This module contains the parse_items function, to parse the items of a large rule result into DTOs in parallel.
+"""
+import atexit
+import math
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Callable
+
+# Each worker receives at least this number of items at once, to amortize the inter-process communication
+MIN_SHARD_SIZE = 1000
+# Number of shards per worker, to balance the load between the workers
+SHARDS_PER_WORKER = 4
+
+
+class ParsingPool:
+    """
+    This class holds the pool shared by all the parallel DTO parsing (see parse_items).
+
+    The pool is started on first use and is shut down at exit. On a free-threaded Python build (GIL disabled), it is
+    a thread pool. Otherwise, it is a process pool started with 'spawn', to not fork a process running other threads.
+
+    Attributes
+    ----------
+    EXECUTOR: ProcessPoolExecutor | ThreadPoolExecutor
+        The started pool, None until the first parallel parsing
+    """
+
+    EXECUTOR = None
+    LOCK = threading.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        # Imported on first use: multiprocessing & the process pool are not needed by most processes
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with cls.LOCK:
+            if cls.EXECUTOR is None:
+                max_workers = get_parallel_parsing_workers()
+                if is_free_threaded():
+                    cls.EXECUTOR = ThreadPoolExecutor(max_workers=max_workers)
+                else:
+                    cls.EXECUTOR = ProcessPoolExecutor(
+                        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                atexit.register(cls.shutdown)
+            return cls.EXECUTOR
+
+    @classmethod
+    def shutdown(cls):
+        with cls.LOCK:
+            if cls.EXECUTOR is not None:
+                cls.EXECUTOR.shutdown(wait=True, cancel_futures=True)
+                cls.EXECUTOR = None
+
+
+def get_parallel_parsing_threshold():
+    """
+    The minimum number of items of a rule result to parse it in parallel, from the environment variable
+    DTO_PARALLEL_PARSING_THRESHOLD. Unset or 0 disables the parallel parsing.
+
+    Returns
+    -------
+    int
+        The number of items
+    """
+    return int(os.environ.get("DTO_PARALLEL_PARSING_THRESHOLD", "0"))
+
+
+def get_parallel_parsing_workers():
+    """
+    The number of workers of the parsing pool, from the environment variable DTO_PARALLEL_PARSING_WORKERS.
+    Defaults to the number of CPUs.
+
+    Returns
+    -------
+    int
+        The number of workers
+    """
+    return int(os.environ.get("DTO_PARALLEL_PARSING_WORKERS", os.cpu_count() or 1))
+
+
+def is_free_threaded():
+    """
+    Returns
+    -------
+    bool
+        True, if the Python interpreter runs without the GIL
+    """
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def parse_items(create: Callable, items: list) -> list:
+    """
+    Create the DTO of each item of a rule result. Above the parallel parsing threshold, the items are split into
+    shards which are parsed by the parsing pool; otherwise they are parsed in the calling thread.
+
+    With a process pool, the DTOs are sent back pickled: the caller still spends some time to unpickle them, but
+    less than to validate and create them.
+
+    Parameters
+    ----------
+    create: Callable
+        Module-level function or DTO classmethod creating the DTO of one item; e.g: User.create_from_rule_result
+    items: list
+        The rule result items
+
+    Returns
+    -------
+    list
+        The DTOs, in the same order as the items
+    """
+    threshold = get_parallel_parsing_threshold()
+    if threshold <= 0 or len(items) < threshold:
+        return [create(item) for item in items]
+
+    executor = ParsingPool.get_executor()
+    shard_size = max(MIN_SHARD_SIZE, math.ceil(len(items) / (get_parallel_parsing_workers() * SHARDS_PER_WORKER)))
+    shards = [items[index : index + shard_size] for index in range(0, len(items), shard_size)]
+    output = []
+    for parsed_shard in executor.map(parse_shard, repeat(create), shards):
+        output.extend(parsed_shard)
+    return output
+
+
+def parse_shard(create: Callable, shard: list) -> list:
+    return [create(item) for item in shard]
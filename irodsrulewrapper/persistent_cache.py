@@ -0,0 +1,189 @@
+"""
+This module contains the UsersGroupsStore class, the optional on-disk backend of CacheTTL.CACHE_USERS_GROUPS. It also
+shares the invalidations of the rule results cache between the processes, see CacheTTL.invalidate_tags.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Seconds a connection waits for a lock held by another process, before raising "database is locked"
+SQLITE_BUSY_TIMEOUT = 5
+
+
+class UsersGroupsStore:
+    """
+    This class stores the get_user_or_group_by_id rule results in a SQLite database, shared by all the processes
+    of a host (e.g. the gunicorn workers). So a (re)started process loads the users and groups already queried by
+    the other ones, instead of querying them again.
+
+    The database is in WAL mode: readers never block and never are blocked by the (single) writer. Each row has its
+    own expiry timestamp. Each thread of each process uses its own connection.
+
+    The store is enabled by the environment variable USERS_GROUPS_CACHE_PATH, the database file path.
+    The rows TTL is USERS_GROUPS_CACHE_TTL, or CACHE_TTL_VALUE by default.
+
+    The cache_tags table has a generation counter per rule results cache tag, incremented by each invalidation of the
+    tag in any process. A process checks the generations of the tags of a cached rule result before serving it.
+
+    Attributes
+    ----------
+    INSTANCE: UsersGroupsStore
+        The store of USERS_GROUPS_CACHE_PATH, see get_instance
+    """
+
+    INSTANCE = None
+    LOCK = threading.Lock()
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path: str
+            The SQLite database file path; it is created if it does not exist
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS users_groups ("
+                "uid TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Returns
+        -------
+        UsersGroupsStore | None
+            The store, or None if USERS_GROUPS_CACHE_PATH is not set
+        """
+        path = os.environ.get("USERS_GROUPS_CACHE_PATH")
+        if not path:
+            return None
+        with cls.LOCK:
+            if cls.INSTANCE is None or cls.INSTANCE.path != path:
+                cls.INSTANCE = cls(path)
+            return cls.INSTANCE
+
+    @staticmethod
+    def get_ttl():
+        return int(os.environ.get("USERS_GROUPS_CACHE_TTL", os.environ.get("CACHE_TTL_VALUE", "3600")))
+
+    def get(self, uid):
+        """
+        Parameters
+        ----------
+        uid: str
+            The user or group id
+
+        Returns
+        -------
+        tuple[dict, float] | None
+            The cached get_user_or_group_by_id rule result and the epoch timestamp at which it was queried, None if it
+            is missing or expired
+        """
+        row = (
+            self._connect()
+            .execute("SELECT result, expires_at FROM users_groups WHERE uid = ? AND expires_at > ?", (uid, time.time()))
+            .fetchone()
+        )
+        return (json.loads(row[0]), self.get_queried_at(row[1])) if row else None
+
+    def set(self, uid, result):
+        """
+        Parameters
+        ----------
+        uid: str
+            The user or group id
+        result: dict
+            The get_user_or_group_by_id rule result
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO users_groups (uid, result, expires_at) VALUES (?, ?, ?)",
+                (uid, json.dumps(result), time.time() + self.get_ttl()),
+            )
+
+    def set_many(self, results):
+        """
+        Store many rule results in a single transaction.
+
+        Parameters
+        ----------
+        results: dict[str, dict]
+            Per uid, the get_user_or_group_by_id rule result
+        """
+        expires_at = time.time() + self.get_ttl()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO users_groups (uid, result, expires_at) VALUES (?, ?, ?)",
+                [(uid, json.dumps(result), expires_at) for uid, result in results.items()],
+            )
+
+    def load_all(self):
+        """
+        Returns
+        -------
+        dict[str, tuple[dict, float]]
+            Per uid, all the cached rule results not expired yet, and the epoch timestamps at which they were queried
+        """
+        query = "SELECT uid, result, expires_at FROM users_groups WHERE expires_at > ?"
+        rows = self._connect().execute(query, (time.time(),))
+        return {uid: (json.loads(result), self.get_queried_at(expires_at)) for uid, result, expires_at in rows}
+
+    def get_queried_at(self, expires_at):
+        # The rows only store their expiry timestamp, written as the query timestamp + the TTL
+        return expires_at - self.get_ttl()
+
+    def get_tag_generations(self, tags):
+        """
+        Parameters
+        ----------
+        tags: list[str]
+            The rule results cache tags; e.g: ["project:P000000010"]
+
+        Returns
+        -------
+        dict[str, int]
+            Per tag invalidated at least once, its number of invalidations
+        """
+        if not tags:
+            return {}
+        placeholders = ",".join("?" * len(tags))
+        rows = self._connect().execute(
+            f"SELECT tag, generation FROM cache_tags WHERE tag IN ({placeholders})", list(tags)
+        )
+        return dict(rows)
+
+    def increment_tag_generations(self, tags):
+        """
+        Parameters
+        ----------
+        tags: list[str]
+            The invalidated rule results cache tags
+        """
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT INTO cache_tags (tag, generation) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+                [(tag,) for tag in set(tags)],
+            )
+
+    def purge_expired(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM users_groups WHERE expires_at <= ?", (time.time(),))
+
+    def _connect(self):
+        # A connection opened before a fork must not be used by the child process: connections are per process id
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
@@ -0,0 +1,183 @@
+"""
+This module contains the RuleCallRecorder class, the record mode of the @rule_call decorator, and the functions to
+read a recorded rule calls log back (see irodsrulewrapper.replay).
+"""
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import threading
+import time
+
+# The rule arguments kept as is in the log: booleans, numbers, project & collection ids and paths. The other ones
+# (usernames, emails, tokens, titles, ...) are redacted, see redact_rule_argument.
+SAFE_RULE_ARGUMENT = re.compile(r"(|true|false|\d+|P\d{9}|C\d{9}|/nlmumc/projects/P\d{9}(/C\d{9})?)")
+REDACTED_PREFIX = "~"
+
+
+class RuleCallRecorder:
+    """
+    This class appends each rule call executed by @rule_call to a compact log, to replay the production traffic
+    (see irodsrulewrapper.replay). The cached rule results are not recorded, they do not reach the iRODS server.
+    A chunked rule is recorded once per chunk, with its continuation token argument.
+
+    Each line of the log is a JSON array: [timestamp, rule name, redacted arguments, result size, latency, error]
+        * timestamp: the epoch timestamp of the rule call start, in seconds
+        * redacted arguments: the rule arguments, see redact_rule_argument
+        * result size: the size in bytes of the rule output; null if the rule has no result or failed
+        * latency: the duration in seconds of the rule call, up to the rule output reception or the error
+        * error: 1 if the rule call raised an error (e.g: a timeout), otherwise 0
+    e.g: [1700000000.123, "get_project_details", ["/nlmumc/projects/P000000010", "~3f2a9c41d0be"], 1234, 0.084512, 0]
+
+    The record mode is enabled by the environment variable RULE_CALL_RECORD_PATH, the log file path.
+    The redacted arguments are keyed hashes: the same value has the same hash in a log (with the key
+    RULE_CALL_RECORD_KEY, also across the logs and processes), so the replay keeps the distribution of the arguments.
+
+    Attributes
+    ----------
+    INSTANCE: RuleCallRecorder
+        The recorder of RULE_CALL_RECORD_PATH, see get_instance
+    """
+
+    INSTANCE = None
+    LOCK = threading.Lock()
+
+    def __init__(self, path, key=None):
+        """
+        Parameters
+        ----------
+        path: str
+            The log file path; the records are appended to it
+        key: bytes
+            Optional; the key of the redacted arguments hashes. By default, a random key.
+        """
+        self.path = path
+        self.key = key or secrets.token_bytes(16)
+        self._lock = threading.Lock()
+        # Line buffered: a record is written at once, the processes of a host can share the same log
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Returns
+        -------
+        RuleCallRecorder | None
+            The recorder, or None if RULE_CALL_RECORD_PATH is not set
+        """
+        path = os.environ.get("RULE_CALL_RECORD_PATH")
+        if not path:
+            return None
+        with cls.LOCK:
+            if cls.INSTANCE is None or cls.INSTANCE.path != path:
+                if cls.INSTANCE is not None:
+                    cls.INSTANCE.close()
+                key = os.environ.get("RULE_CALL_RECORD_KEY")
+                cls.INSTANCE = cls(path, key.encode("utf-8") if key else None)
+            return cls.INSTANCE
+
+    def record(self, timestamp, name, args, size, latency, error=False):
+        """
+        Append a rule call to the log.
+
+        Parameters
+        ----------
+        timestamp: float
+            The epoch timestamp of the rule call start
+        name: str
+            The rule name
+        args: Iterable
+            The rule arguments, excluding self
+        size: int | None
+            The size in bytes of the rule output; None if the rule has no result
+        latency: float
+            The duration in seconds of the rule call
+        error: bool
+            True, if the rule call raised an error
+        """
+        record = [
+            round(timestamp, 3),
+            name,
+            [redact_rule_argument(argument, self.key) for argument in args],
+            size,
+            round(latency, 6),
+            int(error),
+        ]
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def redact_rule_argument(argument, key):
+    """
+    Redact a rule argument, unless it matches SAFE_RULE_ARGUMENT: it is replaced by a prefixed keyed hash.
+
+    Parameters
+    ----------
+    argument: Any
+        The rule argument
+    key: bytes
+        The hash key
+
+    Returns
+    -------
+    str
+        The argument or its redacted hash; e.g: "P000000010" or "~3f2a9c41d0be"
+    """
+    if isinstance(argument, str) and SAFE_RULE_ARGUMENT.fullmatch(argument):
+        return argument
+    digest = hmac.new(key, str(argument).encode("utf-8"), hashlib.sha256).hexdigest()
+    return REDACTED_PREFIX + digest[:12]
+
+
+def record_rule_call(name, args, size, start, start_counter, error=False):
+    """
+    Record a rule call, if the record mode is enabled (see RuleCallRecorder).
+
+    Parameters
+    ----------
+    name: str
+        The rule name
+    args: tuple
+        The arguments of the rule method, including self
+    size: int | None
+        The size in bytes of the rule output; None if the rule has no result
+    start: float
+        The epoch timestamp of the rule call start, time.time()
+    start_counter: float
+        time.perf_counter() at the rule call start
+    error: bool
+        True, if the rule call raised an error
+    """
+    recorder = RuleCallRecorder.get_instance()
+    if recorder:
+        recorder.record(start, name, args[1:], size, time.perf_counter() - start_counter, error)
+
+
+def read_rule_calls(path):
+    """
+    Read a log written by RuleCallRecorder.
+
+    Parameters
+    ----------
+    path: str
+        The log file path
+
+    Returns
+    -------
+    list[tuple[float, str, list[str], int | None, float, int]]
+        The rule calls, sorted by timestamp: (timestamp, rule name, redacted arguments, result size, latency, error)
+    """
+    records = []
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if line.strip():
+                records.append(tuple(json.loads(line)))
+    records.sort(key=lambda record: record[0])
+    return records
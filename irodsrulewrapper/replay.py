@@ -0,0 +1,334 @@
+"""
+This module contains the replay function, to re-issue the rule calls recorded by RuleCallRecorder at N times their
+recorded speed, and its CLI. It reports the throughput and the latency percentiles per rule, to size a deployment
+from the production traffic.
+
+Two transports:
+    * FakeTransport: no iRODS server; each rule call waits its recorded latency. It checks the client side: how many
+      concurrent calls are needed to sustain the traffic at N times speed.
+    * IRODSTransport: the rule calls are executed on an iRODS server (e.g: staging), through @rule_call. By default,
+      only the read rules (READ_RULES) are replayed: the project & collection ids and paths are recorded as is, a
+      replayed mutating rule would change the server data. The redacted arguments are sent as is; the calls with
+      redacted arguments which fail are reported apart ('redacted_errors'), and left out of the latency percentiles.
+
+Usage:
+    python -m irodsrulewrapper.replay rule_calls.log [--speed 10] [--concurrency 16] [--target fake|irods]
+        [--user jmelius | --admin] [--latency-scale 1.0] [--rule get_groups ...] [--all-rules]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from irods.exception import PycommandsException, iRODSException
+
+from irodsrulewrapper.decorator import compile_rule_body, create_rule_input, rule_call
+from irodsrulewrapper.recording import REDACTED_PREFIX, read_rule_calls
+from irodsrulewrapper.utils import BaseRuleManager, RuleInfo, RuleOutputTooLargeError
+
+DEFAULT_CONCURRENCY = 8
+# The reported latency percentiles
+PERCENTILES = (50, 90, 99)
+# The rules which do not change the iRODS data, replayed by default on an iRODS server
+READ_RULES = frozenset(
+    (
+        "calculate_direct_dropzone_size_files",
+        "check_edit_metadata_permission",
+        "detailsProjectCollection",
+        "getDataStewards",
+        "getDestinationResources",
+        "getIngestResources",
+        "getUsers",
+        "getUsersInGroup",
+        "get_active_drop_zone",
+        "get_collection_attribute_value",
+        "get_collection_size_per_resource",
+        "get_collection_tree",
+        "get_contributing_project",
+        "get_dropzone_files",
+        "get_dropzone_folders",
+        "get_expanded_user_group_information",
+        "get_groups",
+        "get_project_acl_for_manager",
+        "get_project_collection_process_activity",
+        "get_project_contributors_metadata",
+        "get_project_details",
+        "get_project_process_activity",
+        "get_project_resource_availability",
+        "get_projects_finance",
+        "get_temporary_password_lifetime",
+        "get_user_active_processes",
+        "get_user_attribute_value",
+        "get_user_group_memberships",
+        "get_user_internal_affiliation_status",
+        "get_user_or_group_by_id",
+        "list_collections",
+        "list_contributing_projects",
+        "list_contributing_projects_by_attribute",
+        "list_contributing_projects_page",
+        "list_project_contributors",
+        "list_projects_minimal",
+        "list_projects_minimal_page",
+        "optimized_list_projects",
+        "optimized_list_projects_modified_since",
+        "optimized_list_projects_page",
+    )
+)
+
+# Outcome of a replayed rule call, see execute_rule_call
+SUCCESS = "success"
+ERROR = "error"
+REDACTED_ERROR = "redacted_error"
+
+
+class RecordedRuleError(Exception):
+    """Raised by FakeTransport for a rule call which failed when it was recorded."""
+
+
+# The errors counted as failed rule calls, they do not stop the replay
+REPLAY_ERRORS = (PycommandsException, iRODSException, RuleOutputTooLargeError, ValueError, RecordedRuleError)
+
+
+class FakeTransport:
+    """
+    This class replays a rule call without iRODS server: it waits the recorded latency of the call. A call which failed
+    when it was recorded fails again.
+    """
+
+    def __init__(self, latency_scale=1.0):
+        """
+        Parameters
+        ----------
+        latency_scale: float
+            The factor applied to the recorded latencies; e.g: 0.5 for a server twice as fast
+        """
+        self.latency_scale = latency_scale
+
+    def execute(self, record):
+        time.sleep(record[4] * self.latency_scale)
+        if record[5]:
+            raise RecordedRuleError(record[1])
+
+    def close(self):
+        pass
+
+
+class ReplayRuleManager(BaseRuleManager):
+    """This class executes any rule by its name, with the default rule body (see compile_rule_body)."""
+
+    @rule_call
+    def replay_rule_call(self, name, get_result, *args):
+        return RuleInfo(
+            name=name,
+            get_result=get_result,
+            session=self.session,
+            dto=None,
+            input_params=create_rule_input(self, *args),
+            rule_body=compile_rule_body(name, len(args), get_result).decode("utf-8"),
+            parse_to_dto=False,
+        )
+
+
+class IRODSTransport:
+    """This class replays a rule call on an iRODS server, see ReplayRuleManager."""
+
+    def __init__(self, client_user=None, config=None, admin_mode=False):
+        """
+        Parameters
+        ----------
+        client_user: str
+            The user the rules are executed as
+        config: dict
+            Optional; the iRODS connection configuration, see BaseRuleManager
+        admin_mode: bool
+            If true, the rules are executed as the admin user
+        """
+        self.rule_manager = ReplayRuleManager(client_user, config, admin_mode)
+
+    def execute(self, record):
+        _, name, args, size, _, error = record
+        # A failed rule call has no recorded size: it is replayed as a rule with a result, the most frequent case
+        self.rule_manager.replay_rule_call(name, size is not None or bool(error), *args)
+
+    def close(self):
+        self.rule_manager.close()
+
+
+def replay(records, transport, speed=1.0, concurrency=DEFAULT_CONCURRENCY, rules=None):
+    """
+    Re-issue the recorded rule calls, at their recorded start times divided by speed.
+
+    A call starts late if all the workers are busy: the maximum delay is reported as 'max_lag'. A lag close to 0
+    means the concurrency sustains the traffic at this speed.
+
+    Parameters
+    ----------
+    records: list[tuple]
+        The rule calls, sorted by timestamp; see read_rule_calls
+    transport: FakeTransport | IRODSTransport
+        Executes a rule call
+    speed: float
+        The replay speed; e.g: 10 replays one hour of traffic in 6 minutes
+    concurrency: int
+        The maximum number of rule calls executed at the same time
+    rules: Iterable[str] | None
+        The names of the rules to replay, the other ones are skipped; e.g: READ_RULES. None replays all the rules.
+
+    Returns
+    -------
+    dict
+        The replay duration, the overall number of calls, skipped calls, errors, redacted errors (failed calls with
+        redacted arguments), throughput (calls per second) and max lag, and per rule name, its calls, errors,
+        redacted errors, throughput and latency percentiles in seconds (without the redacted errors; None if no
+        latency is left)
+    """
+    skipped = 0
+    if rules is not None:
+        rules = set(rules)
+        skipped = len(records)
+        records = [record for record in records if record[1] in rules]
+        skipped -= len(records)
+    if not records:
+        return {
+            "duration": 0.0,
+            "calls": 0,
+            "skipped": skipped,
+            "errors": 0,
+            "redacted_errors": 0,
+            "throughput": 0.0,
+            "max_lag": 0.0,
+            "rules": {},
+        }
+
+    first_timestamp = records[0][0]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+        futures = []
+        for record in records:
+            scheduled = start + (record[0] - first_timestamp) / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(execute_rule_call, transport, record, scheduled))
+        results = [future.result() for future in futures]
+    duration = time.perf_counter() - start
+
+    outcomes = {}
+    latencies = {}
+    for record, (latency, _, outcome) in zip(records, results):
+        counts = outcomes.setdefault(record[1], {SUCCESS: 0, ERROR: 0, REDACTED_ERROR: 0})
+        counts[outcome] += 1
+        values = latencies.setdefault(record[1], [])
+        # A call failing on a redacted argument fails early, its latency does not say anything
+        if outcome != REDACTED_ERROR:
+            values.append(latency)
+
+    report = {
+        "duration": duration,
+        "calls": len(records),
+        "skipped": skipped,
+        "errors": sum(counts[ERROR] for counts in outcomes.values()),
+        "redacted_errors": sum(counts[REDACTED_ERROR] for counts in outcomes.values()),
+        "throughput": len(records) / duration,
+        "max_lag": max(lag for _, lag, _ in results),
+        "rules": {},
+    }
+    for name, counts in sorted(outcomes.items()):
+        values = sorted(latencies[name])
+        rule_report = {
+            "calls": sum(counts.values()),
+            "errors": counts[ERROR],
+            "redacted_errors": counts[REDACTED_ERROR],
+            "throughput": sum(counts.values()) / duration,
+        }
+        for percentile in PERCENTILES:
+            rule_report[f"p{percentile}"] = get_percentile(values, percentile) if values else None
+        rule_report["max"] = values[-1] if values else None
+        report["rules"][name] = rule_report
+    return report
+
+
+def execute_rule_call(transport, record, scheduled):
+    """
+    Returns
+    -------
+    tuple[float, float, str]
+        The latency and the lag (start delay) in seconds, and the outcome: SUCCESS, ERROR or REDACTED_ERROR (the
+        call failed and has redacted arguments)
+    """
+    call_start = time.perf_counter()
+    outcome = SUCCESS
+    try:
+        transport.execute(record)
+    except REPLAY_ERRORS:
+        redacted = any(argument.startswith(REDACTED_PREFIX) for argument in record[2])
+        outcome = REDACTED_ERROR if redacted else ERROR
+    return time.perf_counter() - call_start, max(call_start - scheduled, 0.0), outcome
+
+
+def get_percentile(sorted_values, percentile):
+    """The nearest-rank percentile of the sorted values"""
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded rule calls log (see RULE_CALL_RECORD_PATH).")
+    parser.add_argument("log", help="The rule calls log path")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor; e.g: 10 for 10 times faster")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum number of concurrent rule calls"
+    )
+    parser.add_argument("--target", choices=("fake", "irods"), default="fake", help="Fake transport or iRODS server")
+    parser.add_argument("--user", default=None, help="With --target irods: the user the rules are executed as")
+    parser.add_argument("--admin", action="store_true", help="With --target irods: execute the rules as admin")
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="With --target fake: factor of the recorded latencies"
+    )
+    parser.add_argument(
+        "--rule", action="append", default=[], help="With --target irods: also replay this rule, besides READ_RULES"
+    )
+    parser.add_argument(
+        "--all-rules",
+        action="store_true",
+        help="With --target irods: replay all the rules, including the mutating ones",
+    )
+    args = parser.parse_args(argv)
+
+    records = read_rule_calls(args.log)
+    rules = None
+    if args.target == "irods":
+        transport = IRODSTransport(args.user, admin_mode=args.admin)
+        if not args.all_rules:
+            rules = READ_RULES.union(args.rule)
+    else:
+        transport = FakeTransport(args.latency_scale)
+    try:
+        report = replay(records, transport, args.speed, args.concurrency, rules)
+    finally:
+        transport.close()
+
+    print(
+        f"{report['calls']} calls in {report['duration']:.1f} s: {report['throughput']:.1f} calls/s, "
+        f"{report['errors']} errors, {report['redacted_errors']} redacted argument errors, "
+        f"{report['skipped']} skipped, max lag {report['max_lag'] * 1000:.1f} ms"
+    )
+    percentile_headers = "".join(f"{f'p{percentile} ms':>10}" for percentile in PERCENTILES)
+    print(f"{'rule':<45}{'calls':>8}{'errors':>8}{'redacted':>10}{'calls/s':>10}{percentile_headers}{'max ms':>10}")
+    for name, rule_report in report["rules"].items():
+        latencies = "".join(
+            format_milliseconds(rule_report[key]) for key in [f"p{percentile}" for percentile in PERCENTILES] + ["max"]
+        )
+        print(
+            f"{name:<45}{rule_report['calls']:>8}{rule_report['errors']:>8}{rule_report['redacted_errors']:>10}"
+            f"{rule_report['throughput']:10.2f}{latencies}"
+        )
+    return report
+
+
+def format_milliseconds(seconds):
+    return f"{'-':>10}" if seconds is None else f"{seconds * 1000:10.1f}"
+
+
+if __name__ == "__main__":
+    main()
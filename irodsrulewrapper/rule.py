@@ -1,13 +1,22 @@
 """This module contains the user-client Rule managers classes: RuleManager & RuleJSONManager."""
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from typing import TypedDict
 
 from dhpythonirodsutils import validators, exceptions, formatters
+from irods.column import Criterion, In, Like
 from irods.data_object import iRODSDataObject
 from irods.exception import CAT_INVALID_CLIENT_USER, CAT_NO_ROWS_FOUND, QueryException
-from irods.exception import DataObjectDoesNotExist, CollectionDoesNotExist
+from irods.exception import DataObjectDoesNotExist, CollectionDoesNotExist, NoResultFound, UserDoesNotExist
+from irods.exception import NetworkException, PycommandsException, iRODSException
+from irods.models import Collection, DataObject, User, UserGroup, UserMeta
 from irods.query import SpecificQuery
 
+from irodsrulewrapper.cache import CacheTTL
 from irodsrulewrapper.decorator import retry_api_call, MAX_RETRY_API_CALL
+from irodsrulewrapper.dto.collection_sizes import CollectionSizes
+from irodsrulewrapper.dto.collection_stats import CollectionStats
 from irodsrulewrapper.rule_managers.collections import CollectionRuleManager
 from irodsrulewrapper.rule_managers.groups import GroupRuleManager
 from irodsrulewrapper.rule_managers.ingest import IngestRuleManager
@@ -16,6 +25,24 @@ from irodsrulewrapper.rule_managers.resources import ResourceRuleManager
 from irodsrulewrapper.rule_managers.users import UserRuleManager
 from irodsrulewrapper.utils import BaseRuleManager, RuleInputValidationError, log_error_message
 
+# Number of rows requested per GenQuery page by the client-side collection statistics
+GENQUERY_BATCH_SIZE = 500
+# Maximum length of the value list of a GenQuery 'IN' condition, see exists_many
+GENQUERY_IN_MAX_LENGTH = 1000
+# Default number of paths processed concurrently by the bulk move & remove operations
+BULK_OPERATION_WORKERS = 8
+# Account types and AVUs loaded by get_user_accounts
+USER_ACCOUNT_TYPES = ["rodsuser", "rodsgroup"]
+USER_ACCOUNT_AVUS = ["displayName", "email", "description"]
+
+
+class PathKind(str, Enum):
+    """The kind of iRODS object found at a path, see RuleManager.exists_many."""
+
+    COLLECTION = "collection"
+    DATA_OBJECT = "data_object"
+    MISSING = "missing"
+
 
 class TemporaryPasswordTTL(TypedDict):
     """
@@ -31,6 +58,23 @@ class TemporaryPasswordTTL(TypedDict):
     valid_until: int
 
 
+class BulkOperationResult(TypedDict):
+    """
+    Attributes:
+    ---------
+        status : str
+            'ok', 'retried' (ok after retrying on network errors) or 'error'
+        retries : int
+            The number of retries on network errors
+        error : str | None
+            The error message, if the status is 'error'
+    """
+
+    status: str
+    retries: int
+    error: str | None
+
+
 class RuleManager(
     CollectionRuleManager, ProjectRuleManager, UserRuleManager, GroupRuleManager, ResourceRuleManager, IngestRuleManager
 ):
@@ -50,10 +94,6 @@ class RuleManager(
         else:
             raise ValueError
 
-    def cleanup(self):
-        if self.session:
-            self.session.cleanup()
-
     def check_irods_connection(self):
         """
         Check if an iRODS connection can be established
@@ -88,7 +128,7 @@ class RuleManager(
         """
         pwd = self.session.users.temp_password_for_user(username)
         if sessions_cleanup:
-            self.session.cleanup()
+            self.cleanup()
         return pwd
 
     def generate_temporary_password(self, irods_user_name: str, irods_id: int) -> TemporaryPasswordTTL:
@@ -119,18 +159,24 @@ class RuleManager(
         if not isinstance(irods_id, int):
             raise RuleInputValidationError("invalid type for *irods_id: expected a integer")
 
-        if self.session.users.get(irods_user_name).type != "rodsuser":
+        CacheTTL.check_if_cache_expired()
+        user_id, user_type = self.get_irods_user_id_and_type(irods_user_name)
+        if user_id != irods_id:
+            # The cached account may be outdated, if the user has been deleted and created again
+            CacheTTL.CACHE_USER_ACCOUNTS.pop(irods_user_name, None)
+            user_id, user_type = self.get_irods_user_id_and_type(irods_user_name)
+
+        if user_type != "rodsuser":
             raise RuleInputValidationError("invalid irods user type for *irods_user_name: expected a rodsuser")
 
-        if self.get_irods_user_id_by_username(irods_user_name) != irods_id:
+        if user_id != irods_id:
             raise RuleInputValidationError("invalid match between *irods_user_name and *irods_id: expected a match")
 
-        number_of_temp_passwords = self.count_user_temporary_passwords(irods_id)
-        if int(number_of_temp_passwords) > 0:
-            self.remove_user_temporary_passwords(irods_id)
+        # The delete query is a no-op if the user has no temporary password, there is no need to count them first
+        self.remove_user_temporary_passwords(irods_id)
         pwd = self.get_temp_password(irods_user_name, sessions_cleanup=False)
         creation_time_stamp = self.get_user_temporary_password_creation_timestamp(irods_id)
-        temporary_password_lifetime = int(self.get_temporary_password_lifetime())
+        temporary_password_lifetime = self.get_cached_temporary_password_lifetime()
         if not creation_time_stamp:
             raise QueryException
         # Add the temporary password lifetime (from irods server) to the creation timestamp to get it validity date
@@ -237,9 +283,112 @@ class RuleManager(
         int:
             irods user id
         """
-        user_id = self.session.users.get(user_name).id
+        user_id, _ = self.get_irods_user_id_and_type(user_name)
         return user_id
 
+    def get_irods_user_id_and_type(self, user_name: str) -> tuple[int, str]:
+        """
+        Get the irods user id and user type for a give irods username, with a single query.
+        The result is cached in CacheTTL.CACHE_USER_ACCOUNTS.
+
+        Raises
+        ------
+        UserDoesNotExist
+
+        Parameters
+        ----------
+        user_name : str
+            The irods user_name
+
+        Returns
+        -------
+        tuple[int, str]:
+            irods user id and user type; e.g: (10045, 'rodsuser')
+        """
+        account = CacheTTL.CACHE_USER_ACCOUNTS.get(user_name)
+        if account is None:
+            try:
+                result = self.session.query(User.id, User.type).filter(User.name == user_name).one()
+            except NoResultFound as err:
+                raise UserDoesNotExist() from err
+            account = (int(result[User.id]), result[User.type])
+            CacheTTL.CACHE_USER_ACCOUNTS[user_name] = account
+
+        return account
+
+    @retry_api_call
+    def get_user_accounts(self, user_ids=None) -> dict[str, dict]:
+        """
+        Get the name, type and AVUs (displayName, email & description) of the users and groups, with one query for
+        the accounts and one for the AVUs (per GenQuery 'IN' chunk of ids).
+
+        Parameters
+        ----------
+        user_ids: Iterable[str]
+            Optional; the ids of the accounts to get. By default, all the users and groups.
+
+        Returns
+        -------
+        dict[str, dict]
+            Per user or group id, its account; e.g:
+            {"id": "10043", "name": "jmelius", "type": "rodsuser", "displayName": "Jonathan Melius", "email": "..."}
+        """
+        if user_ids is None:
+            chunks = [None]
+        else:
+            chunks = split_in_values(sorted(user_ids))
+
+        output = {}
+        for chunk in chunks:
+            conditions = [In(User.type, USER_ACCOUNT_TYPES)]
+            if chunk is not None:
+                conditions.append(In(User.id, chunk))
+            for row in self.session.query(User.id, User.name, User.type).filter(*conditions):
+                user_id = str(row[User.id])
+                output[user_id] = {"id": user_id, "name": row[User.name], "type": row[User.type]}
+            query = self.session.query(User.id, UserMeta.name, UserMeta.value).filter(
+                *conditions, In(UserMeta.name, USER_ACCOUNT_AVUS)
+            )
+            for row in query:
+                account = output.get(str(row[User.id]))
+                if account is not None:
+                    account[row[UserMeta.name]] = row[UserMeta.value]
+        return output
+
+    @retry_api_call
+    def get_group_memberships(self) -> list[tuple[str, str]]:
+        """
+        Get all the group memberships of the users, with a single query.
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            The (user id, group id) pairs
+        """
+        query = self.session.query(User.id, UserGroup.id).filter(User.type != "rodsgroup")
+        output = []
+        for row in query:
+            user_id, group_id = str(row[User.id]), str(row[UserGroup.id])
+            # Each user is the only member of its own personal group
+            if user_id != group_id:
+                output.append((user_id, group_id))
+        return output
+
+    def get_cached_temporary_password_lifetime(self) -> int:
+        """
+        Get the temporary password lifetime in the server configuration.
+        The value is cached in CacheTTL.CACHE_TEMPORARY_PASSWORD_LIFETIME.
+
+        Returns
+        -------
+        int
+            Life time of temporary password in seconds
+        """
+        if CacheTTL.CACHE_TEMPORARY_PASSWORD_LIFETIME is None:
+            CacheTTL.CACHE_TEMPORARY_PASSWORD_LIFETIME = int(self.get_temporary_password_lifetime())
+
+        return CacheTTL.CACHE_TEMPORARY_PASSWORD_LIFETIME
+
     def download_file(self, path):
         """
         Returns the file buffer of the path given, if the file exists
@@ -324,6 +473,68 @@ class RuleManager(
 
         return self.session.data_objects.exists(full_path)
 
+    @retry_api_call
+    def exists_many(self, full_paths) -> dict[str, PathKind]:
+        """
+        Check the existence of many paths at once; bulk alternative to does_collection_exist and
+        does_data_object_exist. The paths are grouped by parent collection, and each group is resolved with a
+        GenQuery 'IN' condition on the collections and another one on the data objects.
+
+        Parameters
+        ----------
+        full_paths: list[str]
+            The absolute paths to check in iRODS
+
+        Returns
+        -------
+        dict[str, PathKind]
+            Per input path, the kind of iRODS object found at this path
+
+        Raises
+        ------
+        NetworkException
+        RuleInputValidationError
+        """
+        paths_by_parent = {}
+        for full_path in full_paths:
+            try:
+                validators.validate_full_path_safety(full_path)
+            except exceptions.ValidationError as err:
+                raise RuleInputValidationError("Invalid path provided") from err
+            parent, name = posixpath.split(full_path.rstrip("/"))
+            # The same name may come from several input paths; e.g: '/a/b' and '/a/b/', or a duplicated path
+            paths_by_parent.setdefault(parent, {}).setdefault(name, []).append(full_path)
+
+        output = {full_path: PathKind.MISSING for full_path in full_paths}
+        for parent, paths_by_name in paths_by_parent.items():
+            # The 'IN' values can't be escaped: names with a single quote are checked one by one
+            quoted_names = [name for name in paths_by_name if "'" in name]
+            for name in quoted_names:
+                same_paths = paths_by_name.pop(name)
+                full_path = posixpath.join(parent, name)
+                if self.session.collections.exists(full_path):
+                    output.update(dict.fromkeys(same_paths, PathKind.COLLECTION))
+                elif self.session.data_objects.exists(full_path):
+                    output.update(dict.fromkeys(same_paths, PathKind.DATA_OBJECT))
+
+            collection_names = {posixpath.join(parent, name): name for name in paths_by_name}
+            for chunk in split_in_values(list(collection_names)):
+                query = self.session.query(Collection.name).filter(
+                    Criterion("=", Collection.parent_name, parent), In(Collection.name, chunk)
+                )
+                for row in query:
+                    name = collection_names[row[Collection.name]]
+                    output.update(dict.fromkeys(paths_by_name[name], PathKind.COLLECTION))
+
+            for chunk in split_in_values(list(paths_by_name)):
+                query = self.session.query(DataObject.name).filter(
+                    Criterion("=", Collection.name, parent), In(DataObject.name, chunk)
+                )
+                for row in query:
+                    output.update(dict.fromkeys(paths_by_name[row[DataObject.name]], PathKind.DATA_OBJECT))
+
+        return output
+
     @retry_api_call
     def move_collection(self, source_path, destination_path):
         """
@@ -428,6 +639,142 @@ class RuleManager(
 
         self.session.data_objects.unlink(full_path, force=force)
 
+    def move_collections(self, moves, max_workers=BULK_OPERATION_WORKERS) -> dict[str, BulkOperationResult]:
+        """
+        Move many iRODS collections concurrently; bulk variant of move_collection.
+        All the paths are validated before moving any collection. A failed move does not stop the other ones.
+
+        Parameters
+        ----------
+        moves: list[tuple[str, str]]
+            The absolute source and destination paths of each collection
+        max_workers: int
+            The maximum number of collections moved at the same time
+
+        Returns
+        -------
+        dict[str, BulkOperationResult]
+            Per source path, the result of its move
+
+        Raises
+        ------
+        RuleInputValidationError
+        """
+        validate_bulk_paths([path for move in moves for path in move])
+        return self._run_bulk_operation(self.session.collections.move, moves, max_workers)
+
+    def move_data_objects(self, moves, max_workers=BULK_OPERATION_WORKERS) -> dict[str, BulkOperationResult]:
+        """
+        Move many iRODS data objects concurrently; bulk variant of move_data_object, see move_collections.
+
+        Parameters
+        ----------
+        moves: list[tuple[str, str]]
+            The absolute source and destination paths of each data object
+        max_workers: int
+            The maximum number of data objects moved at the same time
+
+        Returns
+        -------
+        dict[str, BulkOperationResult]
+            Per source path, the result of its move
+
+        Raises
+        ------
+        RuleInputValidationError
+        """
+        validate_bulk_paths([path for move in moves for path in move])
+        return self._run_bulk_operation(self.session.data_objects.move, moves, max_workers)
+
+    def remove_collections(
+        self, full_paths, force, max_workers=BULK_OPERATION_WORKERS
+    ) -> dict[str, BulkOperationResult]:
+        """
+        Remove many iRODS collections concurrently; bulk variant of remove_collection, see move_collections.
+
+        Parameters
+        ----------
+        full_paths: list[str]
+            The absolute paths to the collections to delete in iRODS
+        force: bool
+            If true, Immediate removal of the collections without putting them in trash
+        max_workers: int
+            The maximum number of collections removed at the same time
+
+        Returns
+        -------
+        dict[str, BulkOperationResult]
+            Per path, the result of its removal
+
+        Raises
+        ------
+        RuleInputValidationError
+        """
+        validate_bulk_paths(full_paths)
+        if not isinstance(force, bool):
+            raise RuleInputValidationError("invalid type for *force: expected a bool")
+
+        def remove(full_path):
+            self.session.collections.remove(full_path, force=force)
+
+        return self._run_bulk_operation(remove, [(full_path,) for full_path in full_paths], max_workers)
+
+    def remove_data_objects(
+        self, full_paths, force, max_workers=BULK_OPERATION_WORKERS
+    ) -> dict[str, BulkOperationResult]:
+        """
+        Remove many iRODS data objects concurrently; bulk variant of remove_data_object, see move_collections.
+
+        Parameters
+        ----------
+        full_paths: list[str]
+            The absolute paths to the data objects to delete in iRODS
+        force: bool
+            If true, Immediate removal of the data objects without putting them in trash
+        max_workers: int
+            The maximum number of data objects removed at the same time
+
+        Returns
+        -------
+        dict[str, BulkOperationResult]
+            Per path, the result of its removal
+
+        Raises
+        ------
+        RuleInputValidationError
+        """
+        validate_bulk_paths(full_paths)
+        if not isinstance(force, bool):
+            raise RuleInputValidationError("invalid type for *force: expected a bool")
+
+        def unlink(full_path):
+            self.session.data_objects.unlink(full_path, force=force)
+
+        return self._run_bulk_operation(unlink, [(full_path,) for full_path in full_paths], max_workers)
+
+    def _run_bulk_operation(self, operation, arguments_list, max_workers):
+        """
+        Execute the operation once per arguments tuple in a thread pool, each call on its own pooled connection.
+        Like retry_api_call, a call is retried on NetworkException; any other iRODS error is reported as is.
+        """
+
+        def run(arguments):
+            for retry_index in range(MAX_RETRY_API_CALL):
+                try:
+                    with self.checkout_session():
+                        operation(*arguments)
+                    return {"status": "ok" if retry_index == 0 else "retried", "retries": retry_index, "error": None}
+                except NetworkException as error:
+                    if retry_index < MAX_RETRY_API_CALL - 1:
+                        continue
+                    return {"status": "error", "retries": retry_index, "error": repr(error)}
+                except (PycommandsException, iRODSException) as error:
+                    return {"status": "error", "retries": retry_index, "error": repr(error)}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(run, arguments_list)
+            return {arguments[0]: result for arguments, result in zip(arguments_list, results)}
+
     @retry_api_call
     def create_collection(self, full_path):
         """
@@ -545,6 +892,122 @@ class RuleManager(
 
         return self.session.data_objects.open(full_path, mode)
 
+    @retry_api_call
+    def get_collection_stats(self, full_path, batch_size=GENQUERY_BATCH_SIZE) -> CollectionStats:
+        """
+        Count the data objects and sum their size in the collection and all its sub-collections.
+        Client-side alternative to the rules walking the collection: the GenQuery rows are streamed in pages of
+        'batch_size' rows and aggregated on the fly.
+
+        Parameters
+        ----------
+        full_path: str
+            The absolute path of the collection; e.g: /nlmumc/projects/P000000010/C000000001
+        batch_size: int
+            The number of rows requested per GenQuery page
+
+        Raises
+        ------
+        NetworkException
+        RuleInputValidationError
+
+        Returns
+        -------
+        CollectionStats
+            The total number of files and the total size in bytes
+        """
+        try:
+            validators.validate_full_path_safety(full_path)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError("Invalid path provided") from err
+
+        total_file_count = 0
+        total_file_size = 0
+        # The rows are distinct over (id, size): the replicas of a data object with different sizes (e.g. a stale
+        # replica) have a row each. Sorted by id, they are consecutive: only the first one is counted.
+        previous_id = None
+        columns = (DataObject.id, DataObject.size)
+        for batch in self._query_collection_batches(full_path, batch_size, *columns, order_by=DataObject.id):
+            for row in batch:
+                if row[DataObject.id] == previous_id:
+                    continue
+                previous_id = row[DataObject.id]
+                total_file_count += 1
+                total_file_size += int(row[DataObject.size])
+
+        return CollectionStats(total_file_count=total_file_count, total_file_size=total_file_size)
+
+    @retry_api_call
+    def get_project_collection_sizes(self, project_id, batch_size=GENQUERY_BATCH_SIZE) -> CollectionSizes:
+        """
+        Compute the data size per resource of each project collection.
+        Client-side alternative to the rule "get_collection_size_per_resource", see get_collection_stats.
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID; e.g: P000000010
+        batch_size: int
+            The number of rows requested per GenQuery page
+
+        Raises
+        ------
+        NetworkException
+        RuleInputValidationError
+
+        Returns
+        -------
+        CollectionSizes
+            Per collection id, the size in bytes and the relative size (percentage) per resource
+        """
+        try:
+            validators.validate_project_id(project_id)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError("invalid project id; eg. P000000001") from err
+
+        project_path = f"/nlmumc/projects/{project_id}"
+        # The empty project collections have no data object row, they are listed first
+        query = self.session.query(Collection.name).filter(Criterion("=", Collection.parent_name, project_path))
+        sizes = {posixpath.basename(row[Collection.name]): {} for row in query}
+        columns = (Collection.name, DataObject.id, DataObject.resource_name, DataObject.size)
+        # The project collections are the sub-collections of the project: skip the data objects at the project level
+        for batch in self._query_collection_batches(project_path, batch_size, *columns, include_root=False):
+            for row in batch:
+                collection_id = row[Collection.name][len(project_path) + 1 :].split("/")[0]
+                collection_sizes = sizes.setdefault(collection_id, {})
+                resource = row[DataObject.resource_name]
+                collection_sizes[resource] = collection_sizes.get(resource, 0) + int(row[DataObject.size])
+
+        result = {}
+        for collection_id, collection_sizes in sizes.items():
+            total_size = sum(collection_sizes.values())
+            result[collection_id] = [
+                {
+                    "resourceName": resource,
+                    "size": size,
+                    "relativeSize": round(size / total_size * 100, 1) if total_size else 0.0,
+                }
+                for resource, size in sorted(collection_sizes.items(), key=lambda item: item[1], reverse=True)
+            ]
+
+        return CollectionSizes.create_from_rule_result(result)
+
+    def _query_collection_batches(self, full_path, batch_size, *columns, include_root=True, order_by=None):
+        """
+        Yield the GenQuery result pages of the input columns, for the data objects below the collection.
+        GenQuery conditions can't be OR-ed, so the collection itself and its sub-collections are queried separately;
+        'order_by' sorts the rows of each query.
+        """
+        criteria = [Like(Collection.name, f"{full_path}/%")]
+        if include_root:
+            criteria.insert(0, Criterion("=", Collection.name, full_path))
+        for criterion in criteria:
+            query = self.session.query(*columns).filter(criterion).limit(batch_size)
+            if order_by is not None:
+                query = query.order_by(order_by)
+            for batch in query.get_batches():
+                yield batch
+
     def remove_dropzone(self, token, dropzone_type):
         """
         This function is meant to be called as an admin:
@@ -582,6 +1045,56 @@ class RuleManager(
         self.delete_dropzone(token)
 
 
+def validate_bulk_paths(full_paths):
+    """
+    Validate all the paths of a bulk operation, before executing any of them.
+
+    Raises
+    ------
+    RuleInputValidationError
+        The message mentions the first invalid path
+    """
+    for full_path in full_paths:
+        try:
+            validators.validate_full_path_safety(full_path)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError(f"Invalid path provided: {full_path}") from err
+
+
+def split_in_values(values, max_length=GENQUERY_IN_MAX_LENGTH):
+    """
+    Split the values of a GenQuery 'IN' condition into chunks, whose formatted value list is at most max_length
+    characters long; e.g: "('a','b')". A value longer than max_length gets its own chunk.
+
+    Parameters
+    ----------
+    values: list[str]
+        The condition values
+    max_length: int
+        The maximum length of a formatted value list
+
+    Returns
+    -------
+    list[list[str]]
+        The chunks of values
+    """
+    chunks = []
+    chunk = []
+    length = 1
+    for value in values:
+        # Each value adds its quotes and a comma, or the closing parenthesis
+        value_length = len(value) + 3
+        if chunk and length + value_length > max_length:
+            chunks.append(chunk)
+            chunk = []
+            length = 1
+        chunk.append(value)
+        length += value_length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
 class RuleJSONManager(RuleManager):
     """
     RuleJSONManager inherit all RuleManager's rule methods. And set parse_to_dto as False.
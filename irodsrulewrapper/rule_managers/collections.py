@@ -4,6 +4,7 @@ import json
 from cedarparsingutils.dto.general_instance import GeneralInstance
 from dhpythonirodsutils import validators, exceptions, formatters
 
+from irodsrulewrapper.cache import ALL_PROJECTS_TAG, path_tags
 from irodsrulewrapper.decorator import rule_call
 from irodsrulewrapper.dto.attribute_value import AttributeValue
 from irodsrulewrapper.dto.boolean import Boolean
@@ -48,7 +49,14 @@ class CollectionRuleManager(BaseRuleManager):
         if not isinstance(rights, str):
             raise RuleInputValidationError("invalid type for *rights: expected a string")
 
-        return RuleInfo(name="openProjectCollection", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="openProjectCollection",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(formatters.format_project_collection_path(project, project_collection))
+            + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def close_project_collection(self, project, project_collection):
@@ -68,7 +76,14 @@ class CollectionRuleManager(BaseRuleManager):
         except exceptions.ValidationError as err:
             raise RuleInputValidationError("invalid project or collection id; eg. P000000001") from err
 
-        return RuleInfo(name="close_project_collection", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="close_project_collection",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(formatters.format_project_collection_path(project, project_collection))
+            + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def set_collection_avu(self, collection_path, attribute, value):
@@ -95,7 +110,13 @@ class CollectionRuleManager(BaseRuleManager):
         if not isinstance(value, str):
             raise RuleInputValidationError("invalid type for *value: expected a string")
 
-        return RuleInfo(name="setCollectionAVU", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="setCollectionAVU",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(collection_path) + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def get_collections(self, project_path):
@@ -376,7 +397,14 @@ class CollectionRuleManager(BaseRuleManager):
             raise RuleInputValidationError(
                 "invalid value for *open_collection/close_collection: expected 'true' or 'false'"
             )
-        return RuleInfo(name="setCollectionSize", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="setCollectionSize",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(formatters.format_project_collection_path(project_id, collection_id))
+            + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def get_collection_tree(self, relative_path):
@@ -515,7 +543,14 @@ class CollectionRuleManager(BaseRuleManager):
         if open_acl not in expected_values and close_acl not in expected_values:
             raise RuleInputValidationError("invalid value for *open_acl/close_acl: expected 'true' or 'false'")
 
-        return RuleInfo(name="set_acl_for_metadata_snapshot", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="set_acl_for_metadata_snapshot",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(formatters.format_project_collection_path(project_id, collection_id))
+            + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def revoke_project_collection_user_access(self, user_project_collection: str, reason: str, description: str):
@@ -544,7 +579,13 @@ class CollectionRuleManager(BaseRuleManager):
         if not isinstance(description, str):
             raise RuleInputValidationError("invalid type for *description: expected a string")
 
-        return RuleInfo(name="revoke_project_collection_user_access", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="revoke_project_collection_user_access",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(user_project_collection) + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def get_project_collection_process_activity(self, user_project_collection: str):
@@ -37,6 +37,30 @@ class GroupRuleManager(BaseRuleManager):
             ) from err
         return RuleInfo(name="get_groups", get_result=True, session=self.session, dto=Groups)
 
+    @rule_call
+    def iter_groups(self, show_service_accounts):
+        """
+        Get the list of groups, parsed one group at a time while iterating.
+        Prefer it over get_groups for large group lists.
+
+        Parameters
+        ----------
+        show_service_accounts : str
+            'true'/'false' excepted values; If true, hide the special groups in the result
+
+        Returns
+        -------
+        Iterator[Group]
+            Iterator of dto.Group objects
+        """
+        try:
+            validators.validate_string_boolean(show_service_accounts)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError(
+                "invalid value for *showServiceAccounts: expected 'true' or 'false'"
+            ) from err
+        return RuleInfo(name="get_groups", get_result=True, session=self.session, dto=Groups, stream_result=True)
+
     @rule_call
     def get_user_group_memberships(self, show_special_groups, username):
         """
@@ -1,6 +1,7 @@
 """This module contains the IngestRuleManager class."""
 from dhpythonirodsutils import validators, formatters, exceptions
 
+from irodsrulewrapper.cache import ANY_PROJECT_TAG, project_tag
 from irodsrulewrapper.decorator import rule_call
 from irodsrulewrapper.dto.collection_stats import CollectionStats
 from irodsrulewrapper.dto.drop_zones import DropZone
@@ -13,6 +14,7 @@ from irodsrulewrapper.utils import (
     RuleInfo,
     RuleInputValidationError,
     format_rule_argument,
+    get_irods_exception,
 )
 
 
@@ -77,7 +79,10 @@ class IngestRuleManager(BaseRuleManager):
             validators.validate_dropzone_type(dropzone_type)
         except exceptions.ValidationError as err:
             raise RuleInputValidationError("invalid value for *dropzone_type: expected 'mounted' or 'direct'") from err
-        return RuleInfo(name="start_ingest", get_result=False, session=self.session, dto=None)
+        # The project of the dropzone is not known here: all the cached project results are evicted
+        return RuleInfo(
+            name="start_ingest", get_result=False, session=self.session, dto=None, invalidates=[ANY_PROJECT_TAG]
+        )
 
     def ingest(self, user: str, token: str, dropzone_type: str):
         """
@@ -95,15 +100,18 @@ class IngestRuleManager(BaseRuleManager):
         """
         if dropzone_type == "direct":
             # CAUTION: This is an admin level rule call
-            self.set_acl(
-                "default", "admin:own", user, formatters.format_instance_dropzone_path(token, dropzone_type)
-            )
-            self.set_acl(
-                "default", "admin:own", user, formatters.format_schema_dropzone_path(token, dropzone_type)
-            )
-            self.set_acl(
-                "recursive", "admin:own", 'rods', formatters.format_dropzone_path(token, dropzone_type)
+            statuses = self.set_acls(
+                [
+                    ("default", "admin:own", user, formatters.format_instance_dropzone_path(token, dropzone_type)),
+                    ("default", "admin:own", user, formatters.format_schema_dropzone_path(token, dropzone_type)),
+                    ("recursive", "admin:own", "rods", formatters.format_dropzone_path(token, dropzone_type)),
+                ],
+                stop_on_error=True,
             )
+            # The entries after the failing one are not applied (None)
+            errors = [status for status in statuses if status]
+            if errors:
+                raise get_irods_exception(errors[0], f"set_acl failed for the dropzone {token}")
 
         self.start_ingest(user, token, dropzone_type)
 
@@ -412,7 +420,13 @@ class IngestRuleManager(BaseRuleManager):
         except exceptions.ValidationError as err:
             raise RuleInputValidationError("invalid project or collection id: e.g P000000010") from err
 
-        return RuleInfo(name="set_project_acl_to_dropzones", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="set_project_acl_to_dropzones",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=[project_tag(project_id)],
+        )
 
     @rule_call
     def set_project_acl_to_dropzone(self, project_id, dropzone_token, new_dropzone):
@@ -446,7 +460,13 @@ class IngestRuleManager(BaseRuleManager):
         except exceptions.ValidationError as err:
             raise RuleInputValidationError("invalid value for new_dropzone: expected 'true' or 'false'") from err
 
-        return RuleInfo(name="set_project_acl_to_dropzone", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="set_project_acl_to_dropzone",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=[project_tag(project_id)],
+        )
 
     @rule_call
     def calculate_direct_dropzone_size_files(self, token):
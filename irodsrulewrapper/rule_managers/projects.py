@@ -1,7 +1,20 @@
 """This module contains the ProjectRuleManager class."""
+import json
+import time
+
 from dhpythonirodsutils.enums import ProjectAVUs
 from dhpythonirodsutils import validators, exceptions
-
+from irods.exception import NO_RULE_FOUND_ERR, NO_RULE_OR_MSI_FUNCTION_FOUND_ERR
+
+from irodsrulewrapper.cache import (
+    ALL_PROJECTS_TAG,
+    ANY_PROJECT_TAG,
+    EXPIRED,
+    STALE,
+    CacheTTL,
+    path_tags,
+    project_tag,
+)
 from irodsrulewrapper.decorator import rule_call
 from irodsrulewrapper.dto.boolean import Boolean
 from irodsrulewrapper.dto.contributing_project import ContributingProject
@@ -15,18 +28,44 @@ from irodsrulewrapper.dto.projects_minimal import ProjectsMinimal
 from irodsrulewrapper.dto.project import Project
 from irodsrulewrapper.dto.projects_cost import ProjectsCost
 from irodsrulewrapper.dto.projects_overview import ProjectsOverview
+from irodsrulewrapper.pagination import DEFAULT_PAGE_SIZE, PageIterator
 from irodsrulewrapper.utils import (
     BaseRuleManager,
     RuleInfo,
     RuleInputValidationError,
+    format_rule_argument,
+    log_warning_message,
 )
 
+# Seconds subtracted from the snapshot timestamp, to cover the clock drift between the client and the iCAT server
+PROJECTS_OVERVIEW_REFRESH_OVERLAP = 60
+# Per iRODS server (host, port, zone), False if the rule optimized_list_projects_modified_since is not installed.
+# Not probed again: a process restart picks up a newly installed rule.
+MODIFIED_SINCE_RULE_SUPPORT = {}
+# The errors of a rule call to a rule which is not installed on the iRODS server
+MISSING_RULE_ERRORS = (NO_RULE_FOUND_ERR, NO_RULE_OR_MSI_FUNCTION_FOUND_ERR)
+# Maximum number of ACL entries applied per rule call by set_acls
+SET_ACLS_CHUNK_SIZE = 50
+# With stop_on_error, each entry has a longer rule statement: fewer entries fit in a rule call
+SET_ACLS_STOP_ON_ERROR_CHUNK_SIZE = 30
+ACL_MODES = ["default", "recursive"]
+ACL_ACCESS_LEVELS = [
+    "own",
+    "modify_object",
+    "read_object",
+    "null",
+    "admin:own",
+    "admin:modify_object",
+    "admin:read_object",
+    "admin:null",
+]
+
 
 class ProjectRuleManager(BaseRuleManager):
     """This class bundles the project related wrapped rules methods."""
 
-    def __init__(self, client_user=None, admin_mode=False):
-        BaseRuleManager.__init__(self, client_user, admin_mode=admin_mode)
+    def __init__(self, client_user=None, admin_mode=False, config=None):
+        BaseRuleManager.__init__(self, client_user, config, admin_mode)
 
     @rule_call
     def get_project_details(self, project_path, show_service_accounts):
@@ -63,6 +102,7 @@ class ProjectRuleManager(BaseRuleManager):
             session=self.session,
             dto=Project,
             parse_to_dto=self.parse_to_dto,
+            cache_tags=path_tags(project_path) + [ANY_PROJECT_TAG],
         )
 
     @rule_call
@@ -126,7 +166,11 @@ class ProjectRuleManager(BaseRuleManager):
             ) from err
 
         return RuleInfo(
-            name="list_contributing_projects", get_result=True, session=self.session, dto=ContributingProjects
+            name="list_contributing_projects",
+            get_result=True,
+            session=self.session,
+            dto=ContributingProjects,
+            cache_tags=[ALL_PROJECTS_TAG],
         )
 
     @rule_call
@@ -152,7 +196,13 @@ class ProjectRuleManager(BaseRuleManager):
         if not isinstance(users, str):
             raise RuleInputValidationError("invalid type for *users: expected a string")
 
-        return RuleInfo(name="changeProjectPermissions", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="changeProjectPermissions",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=[project_tag(project_id), ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def set_acl(self, mode, access_level, user, path):
@@ -170,16 +220,92 @@ class ProjectRuleManager(BaseRuleManager):
         path : str
             The absolute path of the collection
         """
-        if mode not in ["default", "recursive"]:
-            raise RuleInputValidationError("invalid value for *mode: expected 'default' or 'recursive'")
-        if access_level not in ["own", "modify_object", "read_object", "null", "admin:own", "admin:modify_object", "admin:read_object", "admin:null"]:
-            raise RuleInputValidationError("invalid value for *access_level: expected 'read_object', 'modify_object', 'own, 'null'")
-        if not isinstance(user, str):
-            raise RuleInputValidationError("invalid type for *user: expected a string")
-        if not isinstance(path, str):
-            raise RuleInputValidationError("invalid type for *path: expected a string")
+        validate_acl(mode, access_level, user, path)
+
+        return RuleInfo(
+            name="set_acl",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(path) + [ALL_PROJECTS_TAG],
+        )
+
+    def set_acls(self, acls, stop_on_error=False):
+        """
+        Set many ACLs at once; batch variant of set_acl.
+        All the entries are validated first, then applied in order, in one rule call per SET_ACLS_CHUNK_SIZE entries
+        (SET_ACLS_STOP_ON_ERROR_CHUNK_SIZE with stop_on_error).
 
-        return RuleInfo(name="set_acl", get_result=False, session=self.session, dto=None)
+        Parameters
+        ----------
+        acls : list[tuple[str, str, str, str]]
+            The (mode, access_level, user, path) of each ACL, see set_acl
+        stop_on_error : bool
+            If true, the first failing entry stops the other ones, like consecutive set_acl calls.
+            Otherwise, a failing entry does not stop the other ones.
+
+        Returns
+        -------
+        list[int | None]
+            Per entry, in the same order: 0 if the ACL is set, otherwise the iRODS error code.
+            None for the entries not applied, after the failing one with stop_on_error.
+        """
+        for acl in acls:
+            validate_acl(*acl)
+
+        if not stop_on_error:
+            statuses = []
+            for index in range(0, len(acls), SET_ACLS_CHUNK_SIZE):
+                statuses.extend(self._set_acls_chunk(acls[index : index + SET_ACLS_CHUNK_SIZE]))
+            return statuses
+
+        statuses = []
+        for index in range(0, len(acls), SET_ACLS_STOP_ON_ERROR_CHUNK_SIZE):
+            applied, status = self._set_acls_chunk(acls[index : index + SET_ACLS_STOP_ON_ERROR_CHUNK_SIZE], True)
+            statuses.extend([0] * (applied - 1) + [status])
+            if status != 0:
+                statuses.extend([None] * (len(acls) - len(statuses)))
+                break
+        return statuses
+
+    @rule_call
+    def _set_acls_chunk(self, acls, stop_on_error=False):
+        input_params = {}
+        # With stop_on_error, *e is the status of the last applied entry and *n the number of applied entries
+        statements = ["*e=0;*n=0;"] if stop_on_error else []
+        # The rule text is limited to 2700 characters (META_STR_LEN): the variables names are kept short
+        for index, (mode, access_level, user, path) in enumerate(acls):
+            input_params[f"*m{index}"] = format_rule_argument(mode)
+            input_params[f"*a{index}"] = format_rule_argument(access_level)
+            input_params[f"*u{index}"] = format_rule_argument(user)
+            input_params[f"*p{index}"] = format_rule_argument(path)
+            status = f"errorcode(set_acl(*m{index},*a{index},*u{index},*p{index}))"
+            if stop_on_error:
+                statements.append(f"if(*e==0){{*e={status};*n=*n+1;}}")
+            else:
+                statements.append(f"*s{index}={status};")
+        if stop_on_error:
+            statuses = "*n,*e"
+        else:
+            statuses = ",".join(f"*s{index}" for index in range(len(acls)))
+
+        rule_body = f"""
+               execute_rule{{
+                   {"".join(statements)}
+                   writeLine('stdout', "[{statuses}]");
+               }}
+               """
+
+        return RuleInfo(
+            name="set_acls",
+            get_result=True,
+            session=self.session,
+            dto=None,
+            input_params=input_params,
+            rule_body=rule_body,
+            parse_to_dto=False,
+            invalidates=[tag for acl in acls for tag in path_tags(acl[3])] + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def check_edit_metadata_permission(self, path):
@@ -204,6 +330,21 @@ class ProjectRuleManager(BaseRuleManager):
 
         return RuleInfo(name="get_projects_finance", get_result=True, session=self.session, dto=ProjectsCost)
 
+    @rule_call
+    def iter_projects_finance(self):
+        """
+        Get the list of projects financial information, parsed one project at a time while iterating.
+        Unlike get_projects_finance, an empty iterator is returned when there are no projects.
+
+        Returns
+        -------
+        Iterator[ProjectCost]
+            Iterator of the projects financial information
+        """
+        return RuleInfo(
+            name="get_projects_finance", get_result=True, session=self.session, dto=ProjectsCost, stream_result=True
+        )
+
     @rule_call
     def get_projects_minimal(self):
         """
@@ -341,7 +482,13 @@ class ProjectRuleManager(BaseRuleManager):
                     f"invalid type for *{ProjectAVUs.COLLECTION_METADATA_SCHEMAS.value}: expected a string"
                 )
 
-        return RuleInfo(name="create_new_project", get_result=True, session=self.session, dto=CreateProject)
+        return RuleInfo(
+            name="create_new_project",
+            get_result=True,
+            session=self.session,
+            dto=CreateProject,
+            invalidates=[ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def get_project_contributors(self, project_id, inherited, show_service_accounts):
@@ -382,7 +529,11 @@ class ProjectRuleManager(BaseRuleManager):
             ) from err
 
         return RuleInfo(
-            name="list_project_contributors", get_result=True, session=self.session, dto=ProjectContributors
+            name="list_project_contributors",
+            get_result=True,
+            session=self.session,
+            dto=ProjectContributors,
+            cache_tags=[project_tag(project_id), ANY_PROJECT_TAG],
         )
 
     @rule_call
@@ -430,6 +581,117 @@ class ProjectRuleManager(BaseRuleManager):
 
         return RuleInfo(name="optimized_list_projects", get_result=True, session=self.session, dto=ProjectsOverview)
 
+    @rule_call
+    def get_projects_overview_modified_since(self, modified_since):
+        """
+        Get the list of projects whose collection, AVUs or ACL changed since the input timestamp.
+
+        Server rule: optimized_list_projects_modified_since(*modifiedSince, *result), deployed with
+        optimized_list_projects. *modifiedSince is the epoch timestamp string. *result has the JSON format of
+        optimized_list_projects: an array with one object per project visible by the client user, restricted to the
+        projects whose collection, AVUs or ACL have a modify time >= *modifiedSince; an empty array if none changed.
+        Each object has the keys: "path", "title", "description", "OBI:0000103" (the principal investigator AVU),
+        "dataSteward", "dataSizeGiB", and "managers", "contributors" & "viewers" (lists of user or group ids); see
+        ProjectOverview.create_from_rule_result.
+        e.g: [{"path": "/nlmumc/projects/P000000010", "title": "...", "OBI:0000103": "psuppers", "managers": [], ...}]
+        The deleted projects and revoked accesses are not listed, see get_projects_overview_incremental.
+        If the rule is not installed, get_projects_overview_incremental falls back to get_projects_overview.
+
+        Parameters
+        ----------
+        modified_since: str
+            Epoch timestamp in seconds; e.g: '1666606633'
+
+        Returns
+        -------
+        ProjectsOverview
+            dto.ProjectsOverview object, only containing the modified projects
+        """
+        if not isinstance(modified_since, str) or not modified_since.isdigit():
+            raise RuleInputValidationError("invalid value for *modified_since: expected an epoch timestamp as string")
+
+        return RuleInfo(
+            name="optimized_list_projects_modified_since",
+            get_result=True,
+            session=self.session,
+            dto=ProjectsOverview,
+        )
+
+    def get_projects_overview_incremental(self):
+        """
+        Get the list of projects, by refreshing the last ProjectsOverview snapshot of the client user.
+        Only the projects modified since the previous call are queried and rebuilt. The first call, and the first call
+        after the snapshot exceeded the maximum staleness (see CacheTTL.get_freshness), request the full overview.
+        A stale snapshot is still refreshed incrementally, while its full rebuild runs in the background.
+        If the rule optimized_list_projects_modified_since is not installed, the full overview is always requested.
+
+        Returns
+        -------
+        ProjectsOverview
+            dto.ProjectsOverview object
+        """
+        CacheTTL.check_if_cache_expired()
+        username = self.session.username
+        snapshot = CacheTTL.get_projects_overview_snapshot(username)
+        # Take the timestamp before the query, so changes made while it runs are picked up by the next refresh
+        refresh_time = int(time.time())
+        changes = None
+        if snapshot is not None and CacheTTL.get_freshness(snapshot[2]) != EXPIRED:
+            snapshot_time, snapshot_overview, built_at = snapshot
+            modified_since = max(snapshot_time - PROJECTS_OVERVIEW_REFRESH_OVERLAP, 0)
+            changes = self._get_projects_overview_changes(str(modified_since))
+        if changes is None:
+            projects_overview = self.get_projects_overview()
+            built_at = refresh_time
+        else:
+            # Deleted projects and revoked access do not show up as modified, prune them based on the visible ids
+            project_ids = {project.id for project in self.get_projects_minimal()}
+            projects_overview = snapshot_overview.merge(changes, project_ids)
+            if CacheTTL.get_freshness(built_at) == STALE:
+                # The snapshot embeds User & Group DTOs cached at its full build, which may be outdated by now
+                CacheTTL.refresh_in_background(
+                    ("projects_overview", username), self.rebuild_projects_overview_snapshot, username
+                )
+
+        CacheTTL.set_projects_overview_snapshot(username, refresh_time, projects_overview, built_at)
+        return projects_overview
+
+    def _get_projects_overview_changes(self, modified_since):
+        """
+        Returns
+        -------
+        ProjectsOverview | None
+            The projects modified since the timestamp, see get_projects_overview_modified_since. None if the rule is
+            not installed on the iRODS server.
+        """
+        server = (self.session.host, self.session.port, self.session.zone)
+        if not MODIFIED_SINCE_RULE_SUPPORT.get(server, True):
+            return None
+        try:
+            return self.get_projects_overview_modified_since(modified_since)
+        except MISSING_RULE_ERRORS:
+            log_warning_message(
+                self.session.username,
+                "Rule optimized_list_projects_modified_since not installed, fallback to optimized_list_projects",
+            )
+            MODIFIED_SINCE_RULE_SUPPORT[server] = False
+            return None
+
+    def rebuild_projects_overview_snapshot(self, username):
+        """
+        Build the ProjectsOverview snapshot from scratch, with a new rule manager of the same client user: it is
+        executed in the background, and may outlive this rule manager.
+
+        Parameters
+        ----------
+        username: str
+            The session username, the key of the snapshot
+        """
+        with ProjectRuleManager(self.client_user, self.admin_mode, self.config) as rule_manager:
+            build_time = int(time.time())
+            projects_overview = rule_manager.get_projects_overview()
+        CacheTTL.set_projects_overview_snapshot(username, build_time, projects_overview, build_time)
+
     @rule_call
     def get_project_contributors_metadata(self, project_id):
         """
@@ -515,7 +777,13 @@ class ProjectRuleManager(BaseRuleManager):
         if not isinstance(description, str):
             raise RuleInputValidationError("invalid type for *description: expected a string")
 
-        return RuleInfo(name="revoke_project_user_access", get_result=False, session=self.session, dto=None)
+        return RuleInfo(
+            name="revoke_project_user_access",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=path_tags(project) + [ALL_PROJECTS_TAG],
+        )
 
     @rule_call
     def get_project_process_activity(self, project_id: str):
@@ -537,3 +805,235 @@ class ProjectRuleManager(BaseRuleManager):
             raise RuleInputValidationError("invalid project id; e.g: P000000010") from err
 
         return RuleInfo(name="get_project_process_activity", get_result=True, session=self.session, dto=ProjectActivity)
+
+    def get_projects_overview_page(
+        self, offset, limit, principal_investigator="", data_steward="", title="", attribute=""
+    ):
+        """
+        Get a page of the list of projects, filtered server-side.
+
+        Server rule: optimized_list_projects_page(*offset, *limit, *filters, *result). *offset and *limit are integer
+        strings. *filters is a JSON object string, with the optional keys "OBI:0000103" (the principal investigator
+        AVU) & "dataSteward" (usernames, exact match), "title" (case-insensitive substring) and "attribute" (a feature
+        AVU set to 'true'); e.g: '{"OBI:0000103": "psuppers", "dataSteward": "opalmen"}', '{}' for no filter.
+        The filters are applied before the paging: the projects are sorted by path, and *result is the JSON array of
+        optimized_list_projects (see get_projects_overview_modified_since for its format) sliced to
+        [*offset, *offset + *limit); an empty array past the last project.
+
+        Parameters
+        ----------
+        offset: int
+            The number of (filtered) projects to skip
+        limit: int
+            The maximum number of projects to return
+        principal_investigator: str
+            Optional; only keep the projects with this principal investigator username
+        data_steward: str
+            Optional; only keep the projects with this data steward username
+        title: str
+            Optional; only keep the projects with a title containing this substring (case-insensitive)
+        attribute: str
+            Optional; only keep the projects with this feature AVU enabled. e.g: 'enableArchive'
+
+        Returns
+        -------
+        ProjectsOverview
+            dto.ProjectsOverview object
+        """
+        offset, limit = format_page_arguments(offset, limit)
+        filters = format_project_filters(principal_investigator, data_steward, title, attribute)
+        return self._get_projects_overview_page(offset, limit, filters)
+
+    @rule_call
+    def _get_projects_overview_page(self, offset: str, limit: str, filters: str):
+        return RuleInfo(
+            name="optimized_list_projects_page", get_result=True, session=self.session, dto=ProjectsOverview
+        )
+
+    def get_projects_minimal_page(
+        self, offset, limit, principal_investigator="", data_steward="", title="", attribute=""
+    ):
+        """
+        Get a page of the list of projects with minimal information (id & title), filtered server-side.
+        See get_projects_overview_page for the parameters.
+
+        Server rule: list_projects_minimal_page(*offset, *limit, *filters, *result), with the arguments and the paging
+        of optimized_list_projects_page (see get_projects_overview_page). *result has the JSON format of
+        list_projects_minimal: an array of {"id": "P000000010", "title": "..."} objects.
+
+        Returns
+        -------
+        ProjectsMinimal
+            dto.ProjectsMinimal object
+        """
+        offset, limit = format_page_arguments(offset, limit)
+        filters = format_project_filters(principal_investigator, data_steward, title, attribute)
+        return self._get_projects_minimal_page(offset, limit, filters)
+
+    @rule_call
+    def _get_projects_minimal_page(self, offset: str, limit: str, filters: str):
+        return RuleInfo(name="list_projects_minimal_page", get_result=True, session=self.session, dto=ProjectsMinimal)
+
+    def get_contributing_projects_page(
+        self, show_service_accounts, offset, limit, principal_investigator="", data_steward="", title="", attribute=""
+    ):
+        """
+        Get a page of the list of projects where the client user is at least a contributor, filtered server-side.
+        See get_projects_overview_page for the other parameters.
+
+        Server rule: list_contributing_projects_page(*showServiceAccounts, *offset, *limit, *filters, *result), with
+        the arguments and the paging of optimized_list_projects_page (see get_projects_overview_page). *result has the
+        JSON format of list_contributing_projects: an array with one object per project, with the keys "id", "title",
+        "resource", "collectionMetadataSchemas", "managers" ({"userObjects": [...]}), and "contributors" & "viewers"
+        ({"userObjects": [...], "groupObjects": [...]}); see ContributingProject.
+
+        Parameters
+        ----------
+        show_service_accounts: str
+            'true'/'false' expected; If true, hide the service accounts in the result
+
+        Returns
+        -------
+        ContributingProjects
+            dto.ContributingProjects object; None if the page is empty
+        """
+        try:
+            validators.validate_string_boolean(show_service_accounts)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError(
+                "invalid value for *show_service_accounts: expected 'true' or 'false'"
+            ) from err
+
+        offset, limit = format_page_arguments(offset, limit)
+        filters = format_project_filters(principal_investigator, data_steward, title, attribute)
+        return self._get_contributing_projects_page(show_service_accounts, offset, limit, filters)
+
+    @rule_call
+    def _get_contributing_projects_page(self, show_service_accounts: str, offset: str, limit: str, filters: str):
+        return RuleInfo(
+            name="list_contributing_projects_page", get_result=True, session=self.session, dto=ContributingProjects
+        )
+
+    def iterate_projects_overview(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Iterate over the pages of get_projects_overview_page, the next page is prefetched in the background.
+
+        Parameters
+        ----------
+        page_size: int
+            The number of projects per page
+        filters:
+            principal_investigator, data_steward, title and/or attribute; see get_projects_overview_page
+
+        Returns
+        -------
+        PageIterator
+            Iterable of dto.ProjectsOverview pages
+        """
+        return PageIterator(lambda offset, limit: self.get_projects_overview_page(offset, limit, **filters), page_size)
+
+    def iterate_projects_minimal(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Iterate over the pages of get_projects_minimal_page, the next page is prefetched in the background.
+        See iterate_projects_overview for the parameters.
+
+        Returns
+        -------
+        PageIterator
+            Iterable of dto.ProjectsMinimal pages
+        """
+        return PageIterator(lambda offset, limit: self.get_projects_minimal_page(offset, limit, **filters), page_size)
+
+    def iterate_contributing_projects(self, show_service_accounts, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Iterate over the pages of get_contributing_projects_page, the next page is prefetched in the background.
+        See iterate_projects_overview for the other parameters.
+
+        Returns
+        -------
+        PageIterator
+            Iterable of dto.ContributingProjects pages
+        """
+        return PageIterator(
+            lambda offset, limit: self.get_contributing_projects_page(show_service_accounts, offset, limit, **filters),
+            page_size,
+        )
+
+
+def format_page_arguments(offset, limit):
+    """
+    Validate the pagination arguments and format them as rule arguments.
+
+    Parameters
+    ----------
+    offset: int
+        The number of items to skip; must be positive or zero
+    limit: int
+        The maximum number of items to return; must be strictly positive
+
+    Returns
+    -------
+    tuple[str, str]
+        The offset and limit as strings
+    """
+    if not isinstance(offset, int) or offset < 0:
+        raise RuleInputValidationError("invalid value for *offset: expected a positive integer")
+    if not isinstance(limit, int) or limit <= 0:
+        raise RuleInputValidationError("invalid value for *limit: expected a strictly positive integer")
+
+    return str(offset), str(limit)
+
+
+def format_project_filters(principal_investigator, data_steward, title, attribute):
+    """
+    Validate the project listing filters and format them as a JSON rule argument, keyed by the project AVU names
+    (see get_projects_overview_page). Empty filters are left out.
+
+    Returns
+    -------
+    str
+        e.g: '{"OBI:0000103": "psuppers", "dataSteward": "opalmen", "title": "placeholder"}'
+    """
+    arguments = {
+        "principal_investigator": principal_investigator,
+        "data_steward": data_steward,
+        "title": title,
+        "attribute": attribute,
+    }
+    for name, value in arguments.items():
+        if not isinstance(value, str):
+            raise RuleInputValidationError(f"invalid type for *{name}: expected a string")
+
+    if attribute:
+        try:
+            validators.validate_project_collections_action_avu(attribute)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError("invalid value for *attribute; e.g: 'enableArchive'") from err
+
+    filters = {
+        ProjectAVUs.PRINCIPAL_INVESTIGATOR.value: principal_investigator,
+        ProjectAVUs.DATA_STEWARD.value: data_steward,
+        ProjectAVUs.TITLE.value: title,
+        "attribute": attribute,
+    }
+    return json.dumps({key: value for key, value in filters.items() if value})
+
+
+def validate_acl(mode, access_level, user, path):
+    """
+    Validate the input parameters of the rule set_acl.
+
+    Raises
+    ------
+    RuleInputValidationError
+    """
+    if mode not in ACL_MODES:
+        raise RuleInputValidationError("invalid value for *mode: expected 'default' or 'recursive'")
+    if access_level not in ACL_ACCESS_LEVELS:
+        raise RuleInputValidationError(
+            "invalid value for *access_level: expected 'read_object', 'modify_object', 'own, 'null'"
+        )
+    if not isinstance(user, str):
+        raise RuleInputValidationError("invalid type for *user: expected a string")
+    if not isinstance(path, str):
+        raise RuleInputValidationError("invalid type for *path: expected a string")
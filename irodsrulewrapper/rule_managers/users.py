@@ -1,6 +1,9 @@
 """This module contains the UserRuleManager class."""
+from concurrent.futures import ThreadPoolExecutor
+
 from dhpythonirodsutils import validators, exceptions
 
+from irodsrulewrapper.cache import ALL_PROJECTS_TAG, ANY_PROJECT_TAG, user_tag
 from irodsrulewrapper.decorator import rule_call
 from irodsrulewrapper.dto.active_processes import ActiveProcesses
 from irodsrulewrapper.dto.attribute_value import AttributeValue
@@ -9,7 +12,13 @@ from irodsrulewrapper.dto.data_stewards import DataStewards
 from irodsrulewrapper.dto.user_or_group import UserOrGroup
 from irodsrulewrapper.dto.users import Users
 from irodsrulewrapper.dto.users_groups_expanded import UsersGroupsExpanded
-from irodsrulewrapper.utils import BaseRuleManager, RuleInfo, RuleInputValidationError
+from irodsrulewrapper.utils import BaseRuleManager, RuleInfo, RuleInputValidationError, RuleOutputTooLargeError
+
+# Bounds of each get_expanded_user_group_information rule call: number of users & groups, and length of their list
+EXPANDED_INFO_BATCH_SIZE = 50
+EXPANDED_INFO_BATCH_LENGTH = 1000
+# Number of get_expanded_user_group_information rule calls executed concurrently
+EXPANDED_INFO_WORKERS = 4
 
 
 class UserRuleManager(BaseRuleManager):
@@ -43,6 +52,31 @@ class UserRuleManager(BaseRuleManager):
 
         return RuleInfo(name="getUsers", get_result=True, session=self.session, dto=Users)
 
+    @rule_call
+    def iter_users(self, show_service_accounts):
+        """
+        Get the list of users, parsed one user at a time while iterating.
+        Prefer it over get_users for large user lists.
+
+        Parameters
+        ----------
+        show_service_accounts : str
+            'true'/'false' excepted values; If true, hide the service accounts in the result
+
+        Returns
+        -------
+        Iterator[User]
+            Iterator of dto.User objects
+        """
+        try:
+            validators.validate_string_boolean(show_service_accounts)
+        except exceptions.ValidationError as err:
+            raise RuleInputValidationError(
+                "invalid value for *show_service_accounts: expected 'true' or 'false'"
+            ) from err
+
+        return RuleInfo(name="getUsers", get_result=True, session=self.session, dto=Users, stream_result=True)
+
     @rule_call
     def get_data_stewards(self):
         """
@@ -84,7 +118,13 @@ class UserRuleManager(BaseRuleManager):
         except exceptions.ValidationError as err:
             raise RuleInputValidationError("invalid value for *fatal: expected 'true' or 'false'") from err
 
-        return RuleInfo(name="get_user_attribute_value", get_result=True, session=self.session, dto=AttributeValue)
+        return RuleInfo(
+            name="get_user_attribute_value",
+            get_result=True,
+            session=self.session,
+            dto=AttributeValue,
+            cache_tags=[user_tag(username)],
+        )
 
     @rule_call
     def set_user_attribute_value(self, username, attribute, value):
@@ -108,7 +148,18 @@ class UserRuleManager(BaseRuleManager):
         if not isinstance(value, str):
             raise RuleInputValidationError("invalid type for *value: expected a string")
 
-        return RuleInfo(name="set_user_attribute_value", get_result=False, session=self.session, dto=None)
+        invalidates = [user_tag(username)]
+        if attribute == "displayName":
+            # The display names of the project members are part of the cached project results
+            invalidates += [ANY_PROJECT_TAG, ALL_PROJECTS_TAG]
+
+        return RuleInfo(
+            name="set_user_attribute_value",
+            get_result=False,
+            session=self.session,
+            dto=None,
+            invalidates=invalidates,
+        )
 
     @rule_call
     def get_user_or_group_by_id(self, uid):
@@ -173,6 +224,9 @@ class UserRuleManager(BaseRuleManager):
         Wrapper around private function so user can just provide a list to the method
         Functionality: see _get_expanded_user_group_information
 
+        Large sets are split into batches (see split_expanded_info_batches), queried concurrently and merged.
+        A batch whose output exceeds RULE_OUTPUT_MAX_SIZE is split in two and queried again.
+
         Parameters
         ----------
         users: set
@@ -183,8 +237,34 @@ class UserRuleManager(BaseRuleManager):
         dict
             A dictionary (unique) with all users and their emails and display names and groups and their display name
         """
-        users = ";".join(users)
-        return self._get_expanded_user_group_information(users)
+        batches = split_expanded_info_batches(users, EXPANDED_INFO_BATCH_SIZE, EXPANDED_INFO_BATCH_LENGTH)
+        if len(batches) <= 1:
+            return self._get_expanded_user_group_information(";".join(sorted(users)))
+
+        output = {}
+        with ThreadPoolExecutor(max_workers=EXPANDED_INFO_WORKERS) as executor:
+            for result in executor.map(self._get_expanded_user_group_information_batch, batches):
+                for name, user_group in result.items():
+                    # A user member of several groups is returned by several batches
+                    output.setdefault(name, user_group)
+
+        if self.parse_to_dto:
+            return UsersGroupsExpanded(user_groups=output)
+        return output
+
+    def _get_expanded_user_group_information_batch(self, batch: list) -> dict:
+        try:
+            result = self._get_expanded_user_group_information(";".join(batch))
+        except RuleOutputTooLargeError:
+            if len(batch) == 1:
+                raise
+            middle = len(batch) // 2
+            result = self._get_expanded_user_group_information_batch(batch[:middle])
+            result.update(self._get_expanded_user_group_information_batch(batch[middle:]))
+            return result
+        if isinstance(result, UsersGroupsExpanded):
+            return dict(result.user_groups)
+        return result
 
     @rule_call
     def _get_expanded_user_group_information(self, users: str):
@@ -250,3 +330,38 @@ class UserRuleManager(BaseRuleManager):
             raise RuleInputValidationError("invalid value for *query_unarchive: expected 'true' or 'false'") from err
 
         return RuleInfo(name="get_user_active_processes", get_result=True, session=self.session, dto=ActiveProcesses)
+
+
+def split_expanded_info_batches(users, max_size=EXPANDED_INFO_BATCH_SIZE, max_length=EXPANDED_INFO_BATCH_LENGTH):
+    """
+    Split the users and groups of get_expanded_user_group_information into batches, of at most max_size names and
+    whose semicolon separated list is at most max_length characters long. A name longer than max_length gets its own
+    batch.
+
+    Parameters
+    ----------
+    users: Iterable[str]
+        The user and group names
+    max_size: int
+        The maximum number of names per batch
+    max_length: int
+        The maximum length of the semicolon separated list of a batch
+
+    Returns
+    -------
+    list[list[str]]
+        The batches of sorted names
+    """
+    batches = []
+    batch = []
+    length = 0
+    for name in sorted(users):
+        if batch and (len(batch) >= max_size or length + 1 + len(name) > max_length):
+            batches.append(batch)
+            batch = []
+            length = 0
+        length += len(name) + (1 if batch else 0)
+        batch.append(name)
+    if batch:
+        batches.append(batch)
+    return batches
@@ -3,34 +3,141 @@ This module provides rules helpers classes and functions.
 
 Classes:
     BaseRuleManager
+    LazySSLContext
     RuleInputValidationError
     RuleInfo
 
 Functions:
     convert_to_current_timezone
+    convert_many_to_current_timezone
+    iter_json_array
     publish_message
     log_error_message
     log_warning_message
     log_audit_trail_message
 """
+import contextlib
 import datetime
+import functools
+import json
 import logging
+import numbers
 import os
+import re
 import ssl
+import threading
+import zoneinfo
 
-import pytz
 from dhpythonirodsutils import loggers
+from irods.exception import get_exception_by_code, iRODSException
 from irods.session import iRODSSession
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+UTC_TIMEZONE = datetime.timezone.utc
+CURRENT_TIMEZONE = zoneinfo.ZoneInfo("Europe/Amsterdam")
 
-def convert_to_current_timezone(date, date_format="%Y-%m-%d %H:%M:%S"):
-    old_timezone = pytz.timezone("UTC")
-    new_timezone = pytz.timezone("Europe/Amsterdam")
+JSON_DECODER = json.JSONDecoder()
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def convert_to_current_timezone(date, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Convert a UTC date to the current timezone (Europe/Amsterdam).
+
+    Parameters
+    ----------
+    date: str | datetime.datetime | numbers.Real
+        The naive UTC date, as a '%Y-%m-%d %H:%M:%S' string or a datetime; or an epoch timestamp in seconds (any real
+        number: int, float, or a numpy integer or float scalar)
+    date_format: str
+        The output format
+
+    Returns
+    -------
+    str
+        The formatted date in the current timezone
+    """
+    return convert_many_to_current_timezone([date], date_format)[0]
+
+
+def convert_many_to_current_timezone(dates, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Convert many UTC dates to the current timezone in one pass; e.g: the timestamps of a list of drop-zones.
+    The conversions are memoized, so the timestamps shared by several items or requests are only converted once.
+
+    Parameters
+    ----------
+    dates: Iterable[str | datetime.datetime | numbers.Real]
+        The dates, see convert_to_current_timezone; e.g: a list, or a 1-d array of epoch timestamps (array.array,
+        or a numpy array of integers or floats). The numpy datetime64 values are not supported.
+    date_format: str
+        The output format
+
+    Returns
+    -------
+    list[str]
+        The formatted dates in the current timezone, in the same order
+    """
+    convert = convert_date_to_current_timezone
+    return [convert(date, date_format) for date in dates]
+
+
+@functools.lru_cache(maxsize=65536)
+def convert_date_to_current_timezone(date, date_format):
     if isinstance(date, str):
-        date = datetime.datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
-    return old_timezone.localize(date).astimezone(new_timezone).strftime(date_format)
+        # fromisoformat is an order of magnitude faster than strptime, check the format to be as strict
+        if len(date) != 19 or date[10] != " " or date[13] != ":" or date[16] != ":":
+            raise ValueError(f"time data {date!r} does not match format {DEFAULT_DATE_FORMAT!r}")
+        date = datetime.datetime.fromisoformat(date)
+    if isinstance(date, numbers.Real):
+        date = datetime.datetime.fromtimestamp(float(date), UTC_TIMEZONE)
+    else:
+        date = date.replace(tzinfo=UTC_TIMEZONE)
+    date = date.astimezone(CURRENT_TIMEZONE)
+    if date_format == DEFAULT_DATE_FORMAT:
+        return date.replace(tzinfo=None, microsecond=0).isoformat(" ")
+    return date.strftime(date_format)
+
+
+def iter_json_array(text):
+    """
+    Incrementally parse a JSON array, by decoding its top-level elements one at a time.
+    Only the element being consumed is held as Python objects, instead of the whole decoded array.
+
+    Parameters
+    ----------
+    text: str
+        The JSON array; e.g: the rule output '[{"userName": "jmelius"}, {"userName": "opalmen"}]'
+
+    Yields
+    ------
+    Any
+        The decoded array elements
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the text is not a JSON array
+    """
+    index = JSON_WHITESPACE.match(text, 0).end()
+    if text[index : index + 1] != "[":
+        raise json.JSONDecodeError("Expecting '['", text, index)
+    index = JSON_WHITESPACE.match(text, index + 1).end()
+    if text[index : index + 1] == "]":
+        return
+
+    while True:
+        element, index = JSON_DECODER.raw_decode(text, index)
+        yield element
+        index = JSON_WHITESPACE.match(text, index).end()
+        delimiter = text[index : index + 1]
+        index = JSON_WHITESPACE.match(text, index + 1).end()
+        if delimiter == "]":
+            return
+        if delimiter != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
 
 
 def format_rule_argument(argument):
@@ -54,26 +161,63 @@ def format_rule_argument(argument):
     return value
 
 
+class LazySSLContext:
+    """
+    This class is the descriptor of BaseRuleManager.ssl_context: the default SSL context is created on first access,
+    i.e. when the first iRODS session is initialized, instead of at import. Loading the system CA certificates is the
+    slowest part of importing the package.
+    """
+
+    def __init__(self):
+        self.context = None
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        with self.lock:
+            if self.context is None:
+                self.context = ssl.create_default_context(
+                    purpose=ssl.Purpose.SERVER_AUTH, cafile=None, capath=None, cadata=None
+                )
+            return self.context
+
+
 class BaseRuleManager:
     """
     This (abstract) class has the basic methods to set up an iRODS (SSL) connection.
     The class is inherited by the classes in the sub-package irodsrulewrapper.rule_managers.
+
+    A rule manager can be shared by several threads: python-irodsclient checks out a connection from the session pool
+    for each request. Each rule call is registered with checkout_session, so the session is never cleaned up while a
+    call is in flight. Use close() or a with statement to release the connections deterministically.
+
+    Examples
+    --------
+        with RuleManager(admin_mode=True) as rule_manager:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                groups = list(executor.map(rule_manager.get_user_group_memberships, ["true"] * 16, usernames))
     """
 
-    # ssl_context & ssl_settings left as class variables to help with mocking during testing
-    ssl_context = ssl.create_default_context(purpose=ssl.Purpose.SERVER_AUTH, cafile=None, capath=None, cadata=None)
+    # ssl_context & ssl_settings left as class variables to help with mocking during testing.
+    # The SSL context is only created on its first access (see LazySSLContext), ssl_settings does not include it.
+    ssl_context = LazySSLContext()
     ssl_settings = {
         "irods_client_server_negotiation": "request_server_negotiation",
         "irods_encryption_algorithm": "AES-256-CBC",
         "irods_encryption_key_size": 32,
         "irods_encryption_num_hash_rounds": 16,
         "irods_encryption_salt_size": 8,
-        "ssl_context": ssl_context,
     }
 
     def __init__(self, client_user=None, config=None, admin_mode=False):
         self.session = None
         self.parse_to_dto = True
+        self.client_user = client_user
+        self.config = config
+        self.admin_mode = admin_mode
+        # Number of rule & API calls in flight, guarded by the condition; see checkout_session
+        self.session_condition = threading.Condition()
+        self.active_calls = 0
+        self.closed = False
         if not client_user and not admin_mode:
             raise Exception("No user to initialize RuleManager provided")
 
@@ -83,11 +227,65 @@ class BaseRuleManager:
         # __del__() is a finalizer that is called when the object is garbage
         # collected. And this happens *after* all the references to the object
         # have been deleted. This is what CPython does, however it is not
-        # guaranteed behavior by Python. Ideally we do the cleanup() after using
-        # this object to execute a rule/s. Perhaps with a try/finally.
-        if self.session:
+        # guaranteed behavior by Python. Prefer close() or a with statement.
+        if getattr(self, "session", None) and not self.closed:
             self.session.cleanup()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextlib.contextmanager
+    def checkout_session(self):
+        """
+        Register a call in flight on the shared session, for the duration of the with statement.
+
+        Yields
+        ------
+        iRODSSession
+            The session to execute the call with
+
+        Raises
+        ------
+        RuntimeError
+            If the rule manager is closed
+        """
+        with self.session_condition:
+            if self.closed:
+                raise RuntimeError("The rule manager is closed")
+            self.active_calls += 1
+        try:
+            yield self.session
+        finally:
+            with self.session_condition:
+                self.active_calls -= 1
+                if self.active_calls == 0:
+                    self.session_condition.notify_all()
+
+    def cleanup(self):
+        """
+        Wait for the calls in flight to finish, then disconnect all the session connections.
+        The rule manager can still be used afterwards, new connections are opened on demand.
+        Must not be called from inside a call in flight of the same rule manager.
+        """
+        with self.session_condition:
+            self.session_condition.wait_for(lambda: self.active_calls == 0)
+            if self.session:
+                self.session.cleanup()
+
+    def close(self):
+        """
+        Refuse new calls, wait for the calls in flight to finish, then disconnect all the session connections.
+        Calling close() more than once has no effect.
+        """
+        with self.session_condition:
+            if self.closed:
+                return
+            self.closed = True
+        self.cleanup()
+
     def init_irods_session(self, client_user, admin_mode, with_config=None):
         irods_session_settings = {
             "host": with_config["IRODS_HOST"] if with_config else os.environ["IRODS_HOST"],
@@ -97,6 +295,7 @@ class BaseRuleManager:
             "zone": "nlmumc",
             "irods_client_server_policy": os.environ["IRODS_CLIENT_SERVER_POLICY"],
             **self.ssl_settings,
+            "ssl_context": self.ssl_context,
         }
 
         if not admin_mode:
@@ -119,13 +318,55 @@ class RuleInputValidationError(Exception):
         return "RuleInputValidationError, {0}".format(self.message)
 
 
+class RuleOutputTooLargeError(Exception):
+    """Exception raised when a rule output is larger than the configured maximum size (RULE_OUTPUT_MAX_SIZE).
+
+    Attributes:
+        rule_name -- the rule name
+        size -- the size in bytes of the output, or of the chunks received so far for a chunked rule
+        max_size -- the configured maximum size in bytes
+        chunks -- the number of chunks received
+    """
+
+    def __init__(self, rule_name, size, max_size, chunks=1):
+        self.rule_name = rule_name
+        self.size = size
+        self.max_size = max_size
+        self.chunks = chunks
+
+    def __str__(self):
+        return "RuleOutputTooLargeError, {0}: output of {1} bytes ({2} chunk(s)) exceeds the limit of {3} bytes".format(
+            self.rule_name, self.size, self.chunks, self.max_size
+        )
+
+
 class RuleInfo:
     """
     This class represents the extra information required by the @rule_call decorator to execute an iRODS rule.
     Its objects are instantiated inside a rule wrapped method inside a RuleManager.
+
+    Chunked rule output protocol:
+        A rule output is written to a single stdout buffer. To return a large output, a chunked rule takes an extra
+        last argument, the continuation token, and returns one chunk of its output per call:
+            {"part": "<next fragment of the JSON output>", "continuation": "<token of the next chunk>"}
+        The rule is first called with an empty continuation token, then with the returned token until it is empty.
+        The fragments are concatenated back into the JSON output.
     """
 
-    def __init__(self, name, get_result, session, dto, input_params=None, rule_body=None, parse_to_dto=True):
+    def __init__(
+        self,
+        name,
+        get_result,
+        session,
+        dto,
+        input_params=None,
+        rule_body=None,
+        parse_to_dto=True,
+        stream_result=False,
+        chunked=False,
+        cache_tags=None,
+        invalidates=None,
+    ):
         self.name = name
         self.get_result = get_result
         self.session = session
@@ -133,6 +374,36 @@ class RuleInfo:
         self.input_params = input_params
         self.rule_body = rule_body
         self.parse_to_dto = parse_to_dto
+        # If true, the rule output (a JSON array) is parsed incrementally, see iter_json_array
+        self.stream_result = stream_result
+        # If true, the rule returns its output in chunks, see the chunked rule output protocol above
+        self.chunked = chunked
+        # For read rules: the tags the result depends on, if set the result can be cached (see CacheTTL)
+        self.cache_tags = cache_tags
+        # For mutating rules: the tags whose cached results are evicted after the rule succeeded
+        self.invalidates = invalidates
+
+
+def get_irods_exception(code, message):
+    """
+    Parameters
+    ----------
+    code: int
+        The iRODS error code; e.g: -818000
+    message: str
+        The error message
+
+    Returns
+    -------
+    iRODSException
+        The python-irodsclient exception of the error code; iRODSException for a code it does not know
+    """
+    try:
+        return get_exception_by_code(code, message)
+    except KeyError:
+        exception = iRODSException(f"{message} (iRODS error code {code})")
+        exception.code = code
+        return exception
 
 
 def log_error_message(user, message):
@@ -0,0 +1,149 @@
+"""
+This module contains the warm_caches function, to pre-populate the caches of a freshly started process, and its CLI.
+
+The ProjectsOverview snapshots only live in the memory of the process calling warm_caches (e.g: at the web
+application startup). The CLI is meant to fill the persistent users and groups store (USERS_GROUPS_CACHE_PATH),
+shared with the other processes of the host, before they start.
+
+Usage:
+    python -m irodsrulewrapper.warm_up [--overview-users jmelius opalmen] [--max-workers 4]
+"""
+import argparse
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from irods.exception import PycommandsException, iRODSException
+
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.convert_uid import cache_user_or_group
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
+from irodsrulewrapper.rule import RuleManager
+from irodsrulewrapper.utils import log_warning_message
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def warm_caches(overview_usernames=(), max_workers=DEFAULT_MAX_WORKERS, config=None):
+    """
+    Pre-populate the users and groups cache (CacheTTL.CACHE_USERS_GROUPS and the persistent store, if enabled) with
+    two rule calls: getUsers and get_groups. Instead of one get_user_or_group_by_id call per uid, on the first
+    ProjectsOverview requests after a deploy.
+
+    Optionally, also pre-build the ProjectsOverview snapshot of some users (see get_projects_overview_incremental).
+
+    Parameters
+    ----------
+    overview_usernames: Iterable[str]
+        The users whose ProjectsOverview snapshot is built; e.g: the most active users
+    max_workers: int
+        The maximum number of rule calls executed at the same time
+    config: dict
+        Optional; the iRODS connection configuration, see BaseRuleManager
+
+    Returns
+    -------
+    dict
+        The number of cached users, groups and ProjectsOverview snapshots, and the duration in seconds of each step
+    """
+    report = {"users": 0, "groups": 0, "projects_overviews": 0, "failed_projects_overviews": 0, "timings": {}}
+    start = time.perf_counter()
+    CacheTTL.check_if_cache_expired()
+
+    with RuleManager(admin_mode=True, config=config) as rule_manager:
+        with ThreadPoolExecutor(max_workers=min(max_workers, 2)) as executor:
+            users_future = executor.submit(timed_call, lambda: list(rule_manager.iter_users("false")))
+            groups_future = executor.submit(timed_call, lambda: list(rule_manager.iter_groups("false")))
+            users, report["timings"]["get_users"] = users_future.result()
+            groups, report["timings"]["get_groups"] = groups_future.result()
+
+    step_start = time.perf_counter()
+    results = {}
+    # Same format as the get_user_or_group_by_id rule result
+    for user in users:
+        results[user.user_id] = {
+            "account_type": "rodsuser",
+            "userName": user.user_name,
+            "userId": user.user_id,
+            "displayName": user.display_name,
+        }
+    for group in groups:
+        results[group.id] = {
+            "account_type": "rodsgroup",
+            "userName": group.name,
+            "userId": group.id,
+            "displayName": group.display_name,
+            "description": group.description,
+        }
+    for uid, result in results.items():
+        cache_user_or_group(uid, result)
+    try:
+        store = UsersGroupsStore.get_instance()
+        if store:
+            store.set_many(results)
+    except sqlite3.Error as error:
+        log_warning_message(None, f"Users and groups store warm up failed: {error}")
+    report["users"] = len(users)
+    report["groups"] = len(groups)
+    report["timings"]["users_groups_cache"] = time.perf_counter() - step_start
+
+    overview_usernames = list(overview_usernames)
+    if overview_usernames:
+        step_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for built in executor.map(build_projects_overview, overview_usernames, [config] * len(overview_usernames)):
+                report["projects_overviews" if built else "failed_projects_overviews"] += 1
+        report["timings"]["projects_overviews"] = time.perf_counter() - step_start
+
+    report["timings"]["total"] = time.perf_counter() - start
+    return report
+
+
+def build_projects_overview(username, config=None):
+    """
+    Build the ProjectsOverview snapshot of one user. A failure is logged, it does not stop the warm up.
+
+    Returns
+    -------
+    bool
+        True, if the snapshot is built
+    """
+    try:
+        with RuleManager(username, config=config) as rule_manager:
+            rule_manager.get_projects_overview_incremental()
+    except (PycommandsException, iRODSException) as error:
+        log_warning_message(username, f"ProjectsOverview warm up failed: {error!r}")
+        return False
+    return True
+
+
+def timed_call(function):
+    start = time.perf_counter()
+    output = function()
+    return output, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-populate the users and groups cache and ProjectsOverview.")
+    parser.add_argument(
+        "--overview-users", nargs="*", default=[], help="Usernames whose ProjectsOverview snapshot is pre-built"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Maximum number of concurrent rule calls"
+    )
+    args = parser.parse_args(argv)
+
+    report = warm_caches(args.overview_users, args.max_workers)
+    print(f"Cached {report['users']} users and {report['groups']} groups")
+    if args.overview_users:
+        print(
+            f"Built {report['projects_overviews']} ProjectsOverview snapshots, "
+            f"{report['failed_projects_overviews']} failed"
+        )
+    for step, seconds in report["timings"].items():
+        print(f"{step:<20} {seconds:8.3f} s")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,14 @@ def test_dto_groups():
     assert groups[0].description == "CO for PhD project of P7000815"
 
 
+def test_dto_groups_iter():
+    from irodsrulewrapper.dto.groups import MOCK_JSON
+    from irodsrulewrapper.utils import iter_json_array
+
+    groups = list(Groups.iter_from_rule_result(iter_json_array(MOCK_JSON)))
+    assert groups == Groups.create_from_mock_result().groups
+
+
 def test_dto_users_groups_extended():
     result = UsersGroupsExpanded.create_from_mock_result()
     user_groups = result
@@ -137,6 +137,28 @@ def test_dto_projects_overview():
     assert projects[3].viewer_groups == []
 
 
+def test_dto_projects_overview_merge():
+    mock_user_rule_manager = patch("irodsrulewrapper.convert_uid.UserRuleManager").start()
+    instance_user_rule_manager = mock_user_rule_manager.return_value
+    instance_user_rule_manager.get_user_or_group_by_id.side_effect = get_user_or_group_side_effect
+
+    snapshot = ProjectsOverview.create_from_rule_result(json.loads(PROJECTS_OVERVIEW))
+    modified = json.loads(PROJECTS_OVERVIEW)[1:2]
+    modified[0]["title"] = "Modified title"
+    added = json.loads(PROJECTS_OVERVIEW)[0]
+    added["path"] = "P000000016"
+    changes = ProjectsOverview.create_from_rule_result(modified + [added])
+
+    project_ids = {"P000000012", "P000000013", "P000000015", "P000000016"}
+    projects = snapshot.merge(changes, project_ids).projects
+
+    assert [project.id for project in projects] == ["P000000012", "P000000013", "P000000015", "P000000016"]
+    assert projects[0] is snapshot.projects[0]
+    assert projects[1].title == "Modified title"
+    assert projects[3].title == "You recoil from the crude; you tend naturally toward the exquisite."
+    assert len(snapshot.projects) == 4
+
+
 def get_user_or_group_side_effect(uid):
     if uid == "10055":
         user = {
@@ -24,6 +24,14 @@ def test_dto_users():
     assert result.users[6].user_name == "auser"
 
 
+def test_dto_users_iter():
+    from irodsrulewrapper.dto.users import MOCK_JSON
+    from irodsrulewrapper.utils import iter_json_array
+
+    users = list(Users.iter_from_rule_result(iter_json_array(MOCK_JSON)))
+    assert users == Users.create_from_mock_result().users
+
+
 def test_dto_user_extended():
     result = UserExtended.create_from_mock_result()
     assert result is not None
@@ -27,6 +27,15 @@ def test_rule_get_projects_overview_cached_ttl_cached():
     assert result is not None
 
 
+def test_rule_get_projects_overview_incremental():
+    rule_manager = RuleManager(admin_mode=True)
+    full = rule_manager.get_projects_overview()
+    first = rule_manager.get_projects_overview_incremental()
+    refreshed = rule_manager.get_projects_overview_incremental()
+    assert [project.id for project in first.projects] == [project.id for project in full.projects]
+    assert [project.id for project in refreshed.projects] == [project.id for project in full.projects]
+
+
 # def test_create_multiple_projects():
 #     for x in range(100):
 #         manager = RuleManager(admin_mode=True)
@@ -1,4 +1,5 @@
-from irodsrulewrapper.rule import RuleManager, RuleJSONManager
+from irodsrulewrapper.collection_tree import CollectionTreeWalker
+from irodsrulewrapper.rule import PathKind, RuleManager, RuleJSONManager
 
 
 def test_open_project_collection():
@@ -50,6 +51,28 @@ def test_rule_get_collection_tree():
     assert collection is not None
 
 
+def test_collection_tree_walker():
+    rule_manager = RuleJSONManager(admin_mode=True)
+    with CollectionTreeWalker(rule_manager) as walker:
+        path, collections, data_objects = next(walker.walk("P000000010/C000000001"))
+        assert path == "P000000010/C000000001"
+        level = rule_manager.get_collection_tree("P000000010/C000000001")
+        assert len(collections) + len(data_objects) == len(level)
+        assert any(path.endswith("/instance.json") for path, _ in walker.glob("*.json", "P000000010/C000000001"))
+
+
+def test_exists_many():
+    collection = "/nlmumc/projects/P000000010/C000000001"
+    paths = [collection, f"{collection}/instance.json", f"{collection}/missing.json", "/nlmumc/projects/P999999999"]
+    result = RuleManager(admin_mode=True).exists_many(paths)
+    assert result == {
+        collection: PathKind.COLLECTION,
+        f"{collection}/instance.json": PathKind.DATA_OBJECT,
+        f"{collection}/missing.json": PathKind.MISSING,
+        "/nlmumc/projects/P999999999": PathKind.MISSING,
+    }
+
+
 # def create_collection_metadata_snapshot(self, project_id, collection_id)
 
 # def save_metadata_json_to_collection(self, project_id, collection_id, instance, schema_dict)
@@ -1,3 +1,4 @@
+from irodsrulewrapper.decorator import NAMED_RULE_CALLS_SUPPORT
 from irodsrulewrapper.rule import RuleManager, RuleJSONManager
 
 
@@ -24,3 +25,12 @@ def test_rule_get_users_in_group():
 def test_rule_get_user_group_memberships():
     result = RuleManager(admin_mode=True).get_user_group_memberships("true", "jmelius")
     assert result.groups is not None
+
+
+def test_rule_get_groups_named_rule_call(monkeypatch):
+    monkeypatch.setenv("IRODS_NAMED_RULE_CALLS", "true")
+    rule_manager = RuleManager(admin_mode=True)
+    result = rule_manager.get_groups("true")
+    assert NAMED_RULE_CALLS_SUPPORT[(rule_manager.session.host, rule_manager.session.port, "nlmumc")] is True
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS")
+    assert result.groups == RuleManager(admin_mode=True).get_groups("true").groups
@@ -49,6 +49,17 @@ def test_rule_create_new_project():
     manager.set_acl("default", "own", "jmelius", project.project_path)
 
 
+def test_rule_set_acls():
+    statuses = RuleManager(admin_mode=True).set_acls(
+        [
+            ("default", "own", "opalmen", "/nlmumc/projects/P000000010"),
+            ("default", "read_object", "unknown-user", "/nlmumc/projects/P000000010"),
+        ]
+    )
+    assert statuses[0] == 0
+    assert statuses[1] < 0
+
+
 def test_rule_get_project_acl_for_manager():
     project = RuleManager("opalmen").get_project_acl_for_manager("P000000010", "false")
     assert project.viewers is not None
@@ -109,3 +120,21 @@ def test_rule_get_projects_minimal():
 def test_rule_list_contributing_projects_by_attribute():
     projects = RuleManager(admin_mode=True).list_contributing_projects_by_attribute(ProjectAVUs.ENABLE_ARCHIVE.value)
     assert projects[0].id == "P000000012"
+
+
+def test_rule_get_projects_minimal_page():
+    rule_manager = RuleManager(admin_mode=True)
+    projects = rule_manager.get_projects_minimal()
+    page = rule_manager.get_projects_minimal_page(1, 2)
+    assert [project.id for project in page] == [project.id for project in projects[1:3]]
+
+    page = rule_manager.get_projects_minimal_page(0, 10, title="Placeholder")
+    assert page[0].id == "P000000010"
+    assert page[1].id == "P000000011"
+
+
+def test_rule_iterate_projects_minimal():
+    rule_manager = RuleManager(admin_mode=True)
+    projects = rule_manager.get_projects_minimal()
+    pages = list(rule_manager.iterate_projects_minimal(page_size=2))
+    assert [project.id for page in pages for project in page] == [project.id for project in projects]
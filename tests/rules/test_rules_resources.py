@@ -31,3 +31,18 @@ def test_get_project_resource_availability():
     result = RuleManager(admin_mode=True).get_project_resource_availability("P000000001", "true", "false", "false")
     status = result.boolean
     assert status is True
+
+
+def test_get_project_collection_sizes():
+    rule_manager = RuleManager(admin_mode=True)
+    expected = rule_manager.get_collection_size_per_resource("P000000010")
+    result = rule_manager.get_project_collection_sizes("P000000010", batch_size=10)
+    assert result.resources_set == expected.resources_set
+    assert result.collection_sizes.keys() == expected.collection_sizes.keys()
+
+
+def test_get_collection_stats():
+    rule_manager = RuleManager(admin_mode=True)
+    result = rule_manager.get_collection_stats("/nlmumc/projects/P000000010/C000000001", batch_size=10)
+    assert result.total_file_count > 0
+    assert result.total_file_size > 0
@@ -2,6 +2,8 @@ import time
 
 import pytest
 
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.directory import Directory
 from irodsrulewrapper.rule import RuleManager, RuleJSONManager
 from irodsrulewrapper.utils import RuleInputValidationError
 
@@ -137,6 +139,15 @@ def test_generate_temporary_password_invalid_irods_id():
     assert str(e_info.value) == "RuleInputValidationError, invalid type for *irods_id: expected a integer"
 
 
+def test_get_irods_user_id_and_type():
+    rule_manager = RuleJSONManager(admin_mode=True)
+    user_id, user_type = rule_manager.get_irods_user_id_and_type("jmelius")
+    rule_manager.session.cleanup()
+    assert user_id == rule_manager.session.users.get("jmelius").id
+    assert user_type == "rodsuser"
+    assert CacheTTL.CACHE_USER_ACCOUNTS["jmelius"] == (user_id, user_type)
+
+
 def test_remove_user_temporary_passwords():
     rule_manager = RuleJSONManager(admin_mode=True)
     user_id = rule_manager.get_irods_user_id_by_username("jmelius")
@@ -147,3 +158,23 @@ def test_remove_user_temporary_passwords():
 
 
 # endregion
+
+
+# region directory
+
+
+def test_directory():
+    with RuleManager(admin_mode=True) as rule_manager:
+        directory = Directory(rule_manager)
+        directory.refresh()
+        directory.refresh()
+        user_id = str(rule_manager.get_irods_user_id_by_username("jmelius"))
+        groups = rule_manager.get_user_group_memberships("true", "jmelius").groups
+        users = rule_manager.get_users("false").users
+    assert directory.get_user_by_name("jmelius").user_id == user_id
+    directory_groups = directory.get_user_group_memberships("jmelius").groups
+    assert {group.id for group in groups} <= {group.id for group in directory_groups}
+    assert {user.user_name for user in users} == {user.user_name for user in directory.get_users().users}
+
+
+# endregion
@@ -0,0 +1,354 @@
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from irodsrulewrapper import convert_uid, decorator
+from irodsrulewrapper.cache import EXPIRED, FRESH, STALE, CacheTTL, path_tags
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
+from irodsrulewrapper.rule import RuleJSONManager
+
+PROJECT_PATH = "/nlmumc/projects/P000000010"
+COLLECTION_PATH = f"{PROJECT_PATH}/C000000001"
+
+# Per cached rule, a call of it
+CACHED_RULE_CALLS = {
+    "get_project_details": lambda rule_manager: rule_manager.get_project_details(PROJECT_PATH, "false"),
+    "list_project_contributors": lambda rule_manager: rule_manager.get_project_contributors(
+        "P000000010", "true", "false"
+    ),
+    "list_contributing_projects": lambda rule_manager: rule_manager.get_contributing_projects("false"),
+    "get_user_attribute_value": lambda rule_manager: rule_manager.get_user_attribute_value("jmelius", "email", "false"),
+}
+PROJECT_RULES = {"get_project_details", "list_project_contributors"}
+PROJECT_AND_LIST_RULES = PROJECT_RULES | {"list_contributing_projects"}
+
+# Per mutating rule call, the cached rules whose result it changes
+MUTATING_RULE_CALLS = {
+    "change_project_permissions": (
+        lambda rule_manager: rule_manager.change_project_permissions("P000000010", "opalmen:read"),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "set_acl": (
+        lambda rule_manager: rule_manager.set_acl("default", "read_object", "opalmen", COLLECTION_PATH),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "set_acls": (
+        lambda rule_manager: rule_manager.set_acls([("default", "read_object", "opalmen", COLLECTION_PATH)]),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "revoke_project_user_access": (
+        lambda rule_manager: rule_manager.revoke_project_user_access(PROJECT_PATH, "Data removal", ""),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "set_collection_avu": (
+        lambda rule_manager: rule_manager.set_collection_avu(COLLECTION_PATH, "title", "New title"),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "open_project_collection": (
+        lambda rule_manager: rule_manager.open_project_collection("P000000010", "C000000001", "rods", "own"),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "close_project_collection": (
+        lambda rule_manager: rule_manager.close_project_collection("P000000010", "C000000001"),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "set_collection_size": (
+        lambda rule_manager: rule_manager.set_collection_size("P000000010", "C000000001", "false", "false"),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "set_acl_for_metadata_snapshot": (
+        lambda rule_manager: rule_manager.set_acl_for_metadata_snapshot(
+            "P000000010", "C000000001", "jmelius", "true", "false"
+        ),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "revoke_project_collection_user_access": (
+        lambda rule_manager: rule_manager.revoke_project_collection_user_access(COLLECTION_PATH, "Data removal", ""),
+        PROJECT_AND_LIST_RULES,
+    ),
+    "create_new_project": (
+        lambda rule_manager: rule_manager.create_new_project(
+            "ingest", "repl", "Title", "jmelius", "opalmen", "AZM", {}
+        ),
+        {"list_contributing_projects"},
+    ),
+    "start_ingest": (
+        lambda rule_manager: rule_manager.start_ingest("jmelius", "crazy-frog", "mounted"),
+        PROJECT_RULES,
+    ),
+    "set_project_acl_to_dropzones": (
+        lambda rule_manager: rule_manager.set_project_acl_to_dropzones("P000000010"),
+        PROJECT_RULES,
+    ),
+    "set_project_acl_to_dropzone": (
+        lambda rule_manager: rule_manager.set_project_acl_to_dropzone("P000000010", "crazy-frog", "false"),
+        PROJECT_RULES,
+    ),
+    "set_user_attribute_value": (
+        lambda rule_manager: rule_manager.set_user_attribute_value("jmelius", "lastToSAcceptedTimestamp", "1"),
+        {"get_user_attribute_value"},
+    ),
+    "set_user_display_name": (
+        lambda rule_manager: rule_manager.set_user_attribute_value("jmelius", "displayName", "Jonathan Melius"),
+        set(CACHED_RULE_CALLS),
+    ),
+}
+
+
+class FakeRule:
+    """Return an increasing version number for the read rules, and count the rule calls per rule name."""
+
+    calls = {}
+    # The rules parsed to a DTO also by RuleJSONManager
+    outputs = {
+        "list_contributing_projects": [],
+        "list_project_contributors": {"users": [], "groups": []},
+        "get_user_attribute_value": {"value": "jmelius@um.nl"},
+        "create_new_project": {"project_path": "/nlmumc/projects/P000000011", "project_id": "P000000011"},
+    }
+
+    def __init__(self, session, rule_file=None, body="", params=None, **kwargs):
+        rule_text = rule_file.read().decode("utf-8") if rule_file else body
+        self.name = re.search(r"(\w+)\(\*", rule_text).group(1)
+
+    def execute(self, session_cleanup=True):
+        FakeRule.calls[self.name] = FakeRule.calls.get(self.name, 0) + 1
+        output = json.dumps(FakeRule.outputs.get(self.name, {"version": FakeRule.calls[self.name]})).encode("utf-8")
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=output))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+class FakeRuleJSONManager(RuleJSONManager):
+    def init_irods_session(self, client_user, admin_mode, with_config=None):
+        self.session = SimpleNamespace(
+            host="icat.dh.local", port=1247, zone="nlmumc", username=client_user, cleanup=lambda: None
+        )
+
+
+@pytest.fixture
+def rule_manager(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    monkeypatch.delenv("USERS_GROUPS_CACHE_PATH", raising=False)
+    monkeypatch.setenv("RULE_RESULTS_CACHE_TTL", "3600")
+    monkeypatch.setattr(decorator, "Rule", FakeRule)
+    FakeRule.calls = {}
+    CacheTTL.clear_rule_results()
+    yield FakeRuleJSONManager("jmelius")
+    CacheTTL.clear_rule_results()
+
+
+def test_path_tags():
+    assert path_tags(f"{PROJECT_PATH}/C000000001/") == [f"path:{PROJECT_PATH}/C000000001", "project:P000000010"]
+    assert path_tags("/nlmumc/ingest/zones/crazy-frog") == ["path:/nlmumc/ingest/zones/crazy-frog"]
+
+
+def test_rule_result_cached_until_invalidated(rule_manager):
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+    assert FakeRule.calls["get_project_details"] == 1
+    # The result depends on the rule input
+    assert rule_manager.get_project_details(PROJECT_PATH, "true") == {"version": 2}
+
+    # An ACL change on another project keeps the cached result
+    rule_manager.set_acl("default", "read_object", "opalmen", "/nlmumc/projects/P000000011")
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+
+    rule_manager.set_acl("default", "read_object", "opalmen", f"{PROJECT_PATH}/C000000001")
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 3}
+
+
+@pytest.mark.parametrize("mutating_rule", MUTATING_RULE_CALLS)
+def test_mutating_rules_invalidate_cached_results(rule_manager, mutating_rule):
+    mutating_rule_call, expected_rules = MUTATING_RULE_CALLS[mutating_rule]
+    for cached_rule_call in CACHED_RULE_CALLS.values():
+        cached_rule_call(rule_manager)
+    calls = dict(FakeRule.calls)
+
+    mutating_rule_call(rule_manager)
+    for cached_rule_call in CACHED_RULE_CALLS.values():
+        cached_rule_call(rule_manager)
+    assert {name for name in CACHED_RULE_CALLS if FakeRule.calls[name] > calls[name]} == expected_rules
+
+
+def test_cached_rule_result_is_a_copy(rule_manager):
+    rule_manager.get_project_details(PROJECT_PATH, "false")["version"] = "modified"
+    result = rule_manager.get_project_details(PROJECT_PATH, "false")
+    assert result == {"version": 1}
+    result["version"] = "modified"
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+
+
+def test_rule_result_invalidated_by_another_process(rule_manager, monkeypatch, tmp_path):
+    path = str(tmp_path / "users_groups.sqlite")
+    monkeypatch.setenv("USERS_GROUPS_CACHE_PATH", path)
+    try:
+        assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+        assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+
+        # The invalidation of another process is only seen through the shared store
+        UsersGroupsStore(path).increment_tag_generations(["project:P000000011"])
+        assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+        UsersGroupsStore(path).increment_tag_generations(["project:P000000010"])
+        assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 2}
+        assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 2}
+
+        # An invalidation in this process increments the shared generations too
+        rule_manager.set_acl("default", "read_object", "opalmen", COLLECTION_PATH)
+        assert UsersGroupsStore(path).get_tag_generations(["project:P000000010", "projects"]) == {
+            "project:P000000010": 2,
+            "projects": 1,
+        }
+    finally:
+        UsersGroupsStore.INSTANCE = None
+
+
+def test_rule_result_cache_per_user(rule_manager):
+    assert rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 1}
+    other_rule_manager = FakeRuleJSONManager("opalmen")
+    assert other_rule_manager.get_project_details(PROJECT_PATH, "false") == {"version": 2}
+
+
+def test_rule_result_cache_disabled(rule_manager, monkeypatch):
+    monkeypatch.delenv("RULE_RESULTS_CACHE_TTL")
+    rule_manager.get_project_details(PROJECT_PATH, "false")
+    rule_manager.get_project_details(PROJECT_PATH, "false")
+    assert FakeRule.calls["get_project_details"] == 2
+    assert CacheTTL.CACHE_RULE_RESULTS == {}
+
+
+def test_rule_result_not_cached_after_concurrent_invalidation(rule_manager):
+    key = ("get_project_details",)
+    generation = CacheTTL.get_rule_results_generation(["project:P000000010"])
+    CacheTTL.invalidate_tags(["project:P000000010"])
+    CacheTTL.set_rule_result(key, {"version": 1}, ["project:P000000010"], generation)
+    assert CacheTTL.get_rule_result(key) == (False, None)
+
+
+class FakeUserRuleManager:
+    """Return the user display name 'version <n>', n being the number of get_user_or_group_by_id calls."""
+
+    calls = 0
+    release = threading.Event()
+
+    def __init__(self, client_user=None, admin_mode=False):
+        self.session = SimpleNamespace(username=client_user)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def get_user_or_group_by_id(self, uid):
+        FakeUserRuleManager.release.wait(timeout=5)
+        FakeUserRuleManager.calls += 1
+        if uid == "9999":
+            # Deleted user
+            return None
+        if uid == "10001":
+            return SimpleNamespace(result={"account_type": "rodsadmin", "userName": "rods", "userId": uid})
+        result = {"account_type": "rodsuser", "userName": "jmelius", "userId": uid}
+        return SimpleNamespace(result=dict(result, displayName=f"version {FakeUserRuleManager.calls}"))
+
+
+@pytest.fixture
+def users_groups_cache(monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_VALUE", "60")
+    monkeypatch.setenv("CACHE_MAX_STALENESS", "60")
+    monkeypatch.delenv("USERS_GROUPS_CACHE_PATH", raising=False)
+    monkeypatch.setattr(convert_uid, "UserRuleManager", FakeUserRuleManager)
+    FakeUserRuleManager.calls = 0
+    FakeUserRuleManager.release.set()
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    CacheTTL.CACHE_USERS_GROUPS_TIMES.clear()
+    CacheTTL.CACHE_UNKNOWN_UIDS.clear()
+    yield FakeUserRuleManager("service-disqover")
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    CacheTTL.CACHE_USERS_GROUPS_TIMES.clear()
+    CacheTTL.CACHE_UNKNOWN_UIDS.clear()
+
+
+def cache_user(uid, age):
+    CacheTTL.CACHE_USERS_GROUPS[uid] = User(user_name="jmelius", user_id=uid, display_name="stale")
+    CacheTTL.CACHE_USERS_GROUPS_TIMES[uid] = time.time() - age
+
+
+def wait_for_refreshes():
+    while CacheTTL.REFRESHING:
+        time.sleep(0.01)
+
+
+def test_get_freshness(users_groups_cache, monkeypatch):
+    assert CacheTTL.get_freshness(None) == EXPIRED
+    assert CacheTTL.get_freshness(time.time() - 30) == FRESH
+    assert CacheTTL.get_freshness(time.time() - 90) == STALE
+    assert CacheTTL.get_freshness(time.time() - 150) == EXPIRED
+    monkeypatch.setenv("CACHE_MAX_STALENESS", "0")
+    assert CacheTTL.get_freshness(time.time() - 90) == EXPIRED
+
+
+def test_stale_user_refreshed_in_background(users_groups_cache):
+    cache_user("10043", age=90)
+    FakeUserRuleManager.release.clear()
+
+    # The stale DTO is served while a single refresh is pending
+    for _ in range(10):
+        assert convert_uid.get_user_or_group("10043", users_groups_cache).display_name == "stale"
+    assert CacheTTL.REFRESHING == {("users_groups", "10043")}
+
+    FakeUserRuleManager.release.set()
+    wait_for_refreshes()
+    assert FakeUserRuleManager.calls == 1
+    assert convert_uid.get_user_or_group("10043", users_groups_cache).display_name == "version 1"
+    assert CacheTTL.get_freshness(CacheTTL.CACHE_USERS_GROUPS_TIMES["10043"]) == FRESH
+
+
+def test_expired_user_queried_synchronously(users_groups_cache):
+    cache_user("10043", age=150)
+    assert convert_uid.get_user_or_group("10043", users_groups_cache).display_name == "version 1"
+    assert not CacheTTL.REFRESHING
+
+    # Past the maximum staleness, check_if_cache_expired drops the entry
+    cache_user("10044", age=150)
+    CacheTTL.CACHE_TIME_STOMP = 0
+    CacheTTL.check_if_cache_expired()
+    assert list(CacheTTL.CACHE_USERS_GROUPS) == ["10043"]
+
+
+def test_failed_background_refresh(users_groups_cache):
+    def fail():
+        raise ValueError("boom")
+
+    assert CacheTTL.refresh_in_background(("test", "fail"), fail)
+    wait_for_refreshes()
+    # The key is released, so the entry is refreshed again on its next access
+    assert CacheTTL.refresh_in_background(("test", "fail"), fail)
+    wait_for_refreshes()
+
+
+def test_unknown_uids_cached(users_groups_cache, monkeypatch):
+    for _ in range(3):
+        assert convert_uid.get_user_or_group("10001", users_groups_cache) is None
+        assert convert_uid.get_user_or_group("9999", users_groups_cache) is None
+    assert FakeUserRuleManager.calls == 2
+
+    # Once the unknown uids TTL elapsed, they are queried again
+    monkeypatch.setenv("UNKNOWN_UIDS_CACHE_TTL", "0")
+    CacheTTL.CACHE_UNKNOWN_UIDS.clear()
+    assert convert_uid.get_user_or_group("10001", users_groups_cache) is None
+    assert convert_uid.get_user_or_group("10001", users_groups_cache) is None
+    assert FakeUserRuleManager.calls == 4
+
+
+def test_stale_deleted_user_becomes_unknown(users_groups_cache):
+    cache_user("9999", age=90)
+    assert convert_uid.get_user_or_group("9999", users_groups_cache).display_name == "stale"
+    wait_for_refreshes()
+    assert "9999" not in CacheTTL.CACHE_USERS_GROUPS
+    assert convert_uid.get_user_or_group("9999", users_groups_cache) is None
+    assert FakeUserRuleManager.calls == 1
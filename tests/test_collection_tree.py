@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+from irodsrulewrapper.collection_tree import CollectionTreeWalker
+
+TREE = {
+    "P000000010/C000000001": [
+        {"name": "instance.json", "type": "dataObject", "size": 10},
+        {"name": "sub", "type": "coll", "size": "--"},
+        {"name": "empty", "type": "coll", "size": "--"},
+    ],
+    "P000000010/C000000001/sub": [
+        {"name": "image.png", "type": "dataObject", "size": 20},
+        {"name": "deeper", "type": "coll", "size": "--"},
+    ],
+    "P000000010/C000000001/sub/deeper": [{"name": "data.json", "type": "dataObject", "size": 30}],
+    "P000000010/C000000001/empty": [],
+}
+
+
+class FakeRuleJSONManager:
+    parse_to_dto = False
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_collection_tree(self, relative_path):
+        with self.lock:
+            self.calls.append(relative_path)
+        return TREE[relative_path]
+
+
+def test_walk():
+    with CollectionTreeWalker(FakeRuleJSONManager()) as walker:
+        levels = [
+            (path, len(collections), len(data_objects))
+            for path, collections, data_objects in walker.walk("P000000010/C000000001")
+        ]
+    assert levels == [
+        ("P000000010/C000000001", 2, 1),
+        ("P000000010/C000000001/sub", 1, 1),
+        ("P000000010/C000000001/sub/deeper", 0, 1),
+        ("P000000010/C000000001/empty", 0, 0),
+    ]
+
+
+def test_walk_max_depth_and_pruning():
+    with CollectionTreeWalker(FakeRuleJSONManager(), prefetch_depth=0) as walker:
+        paths = [path for path, _, _ in walker.walk("P000000010/C000000001", max_depth=1)]
+        assert paths == ["P000000010/C000000001", "P000000010/C000000001/sub", "P000000010/C000000001/empty"]
+
+        paths = []
+        for path, collections, _ in walker.walk("P000000010/C000000001"):
+            paths.append(path)
+            collections[:] = [collection for collection in collections if collection["name"] != "sub"]
+        assert paths == ["P000000010/C000000001", "P000000010/C000000001/empty"]
+
+
+def test_glob():
+    with CollectionTreeWalker(FakeRuleJSONManager()) as walker:
+        paths = [path for path, _ in walker.glob("*.json", "P000000010/C000000001")]
+        assert paths == ["P000000010/C000000001/instance.json", "P000000010/C000000001/sub/deeper/data.json"]
+        paths = [path for path, _ in walker.glob("sub/*", "P000000010/C000000001", max_depth=1)]
+        assert paths == ["P000000010/C000000001/sub/deeper", "P000000010/C000000001/sub/image.png"]
+
+
+def test_levels_are_cached():
+    rule_manager = FakeRuleJSONManager()
+    with CollectionTreeWalker(rule_manager, prefetch_depth=2) as walker:
+        list(walker.walk("P000000010/C000000001"))
+        list(walker.walk("P000000010/C000000001"))
+    assert sorted(rule_manager.calls) == sorted(TREE)
+
+
+def test_levels_expire():
+    rule_manager = FakeRuleJSONManager()
+    with CollectionTreeWalker(rule_manager, ttl=0, prefetch_depth=0) as walker:
+        walker.list("P000000010/C000000001")
+        walker.list("P000000010/C000000001")
+    assert rule_manager.calls == ["P000000010/C000000001", "P000000010/C000000001"]
+
+
+def test_expired_levels_are_dropped():
+    with CollectionTreeWalker(FakeRuleJSONManager(), ttl=0, prefetch_depth=0) as walker:
+        walker.list("P000000010/C000000001")
+        walker.list("P000000010/C000000001/sub")
+        assert list(walker._levels) == ["P000000010/C000000001/sub"]
+
+
+def test_levels_are_capped():
+    with CollectionTreeWalker(FakeRuleJSONManager(), max_levels=2, prefetch_depth=0) as walker:
+        walker.list("P000000010/C000000001")
+        walker.list("P000000010/C000000001/sub")
+        walker.list("P000000010/C000000001/sub/deeper")
+        assert list(walker._levels) == ["P000000010/C000000001/sub", "P000000010/C000000001/sub/deeper"]
+
+
+def test_requires_json_rule_manager():
+    rule_manager = FakeRuleJSONManager()
+    rule_manager.parse_to_dto = True
+    with pytest.raises(ValueError):
+        CollectionTreeWalker(rule_manager)
@@ -0,0 +1,169 @@
+import contextlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from irodsrulewrapper import decorator
+from irodsrulewrapper.decorator import (
+    NAMED_RULE_CALLS_SUPPORT,
+    compile_named_rule_call,
+    compile_rule_body,
+    create_rule_input,
+    get_rule_output_metrics,
+    named_rule_calls_supported,
+    rule_call,
+)
+from irodsrulewrapper.recording import RuleCallRecorder, read_rule_calls, redact_rule_argument
+from irodsrulewrapper.utils import RuleInfo, RuleOutputTooLargeError
+
+
+def test_compile_rule_body():
+    rule_body = compile_rule_body("test_arg", 2, True)
+    assert rule_body == (
+        b"\nexecute_rule{\n"
+        b'        *result="";\n'
+        b"        test_arg(*arg2,*arg3,*result);\n"
+        b"        writeLine('stdout', \"*result\");\n"
+        b"}\n"
+        b'INPUT *arg2="",*arg3=""\n'
+        b"OUTPUT ruleExecOut\n"
+    )
+    assert compile_rule_body("test_arg", 2, True) is rule_body
+
+
+def test_compile_rule_body_without_result():
+    rule_body = compile_rule_body("test_arg", 0, False).decode("utf-8")
+    assert "test_arg();" in rule_body
+    assert "INPUT" not in rule_body
+
+
+def test_create_rule_input():
+    input_params = create_rule_input(None, "P000000010", 'with "quote"')
+    assert input_params == {"*arg2": '"P000000010"', "*arg3": "'with \"quote\"'"}
+
+
+def test_compile_named_rule_call():
+    assert compile_named_rule_call("test_arg", 2, True) == (
+        '*result="";test_arg(*arg2,*arg3,*result);writeLine(\'stdout\', "*result");'
+    )
+    assert compile_named_rule_call("test_arg", 1, False) == "test_arg(*arg2);"
+
+
+def test_named_rule_calls_disabled(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    session = SimpleNamespace(host="icat.dh.local", port=1247, zone="nlmumc")
+    assert named_rule_calls_supported(session) is False
+    assert NAMED_RULE_CALLS_SUPPORT == {}
+
+
+class FakeRule:
+    """Replace irods.rule.Rule, to return the outputs of FakeRule.outputs by continuation token."""
+
+    outputs = {}
+    calls = []
+
+    def __init__(self, session, params=None, **kwargs):
+        self.params = params
+
+    def execute(self, session_cleanup=True):
+        FakeRule.calls.append(self.params)
+        output = FakeRule.outputs[self.params.get("*arg3", '""').strip('"')].encode("utf-8") + b"\0"
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=output))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+class FakeRuleManager:
+    session = SimpleNamespace(host="icat.dh.local", port=1247, zone="nlmumc", username="rods")
+
+    def checkout_session(self):
+        return contextlib.nullcontext(self.session)
+
+    @rule_call
+    def get_output(self, project_id):
+        return RuleInfo(name="get_output", get_result=True, session=self.session, dto=None, parse_to_dto=False)
+
+    @rule_call
+    def get_chunked_output(self, project_id):
+        return RuleInfo(
+            name="get_chunked_output", get_result=True, session=self.session, dto=None, parse_to_dto=False, chunked=True
+        )
+
+
+@pytest.fixture
+def fake_rule(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    monkeypatch.delenv("RULE_OUTPUT_MAX_SIZE", raising=False)
+    monkeypatch.setattr(decorator, "Rule", FakeRule)
+    FakeRule.outputs = {}
+    FakeRule.calls = []
+    return FakeRule
+
+
+def test_rule_output_chunked(fake_rule):
+    fake_rule.outputs = {
+        "": json.dumps({"part": '[{"id": "P000000010"}, ', "continuation": "token-1"}),
+        "token-1": json.dumps({"part": '{"id": "P000000011"}]', "continuation": ""}),
+    }
+    result = FakeRuleManager().get_chunked_output("P000000010")
+    assert result == [{"id": "P000000010"}, {"id": "P000000011"}]
+    assert [params["*arg3"] for params in fake_rule.calls] == ['""', '"token-1"']
+    assert get_rule_output_metrics()["get_chunked_output"]["chunks"] == 2
+
+
+def test_rule_output_chunked_too_large(fake_rule, monkeypatch):
+    part = "[" + ", ".join(["1"] * 100) + "]"
+    fake_rule.outputs = {
+        "": json.dumps({"part": part, "continuation": "token-1"}),
+        "token-1": json.dumps({"part": part, "continuation": ""}),
+    }
+    monkeypatch.setenv("RULE_OUTPUT_MAX_SIZE", "400")
+    with pytest.raises(RuleOutputTooLargeError) as error:
+        FakeRuleManager().get_chunked_output("P000000010")
+    assert error.value.chunks == 2
+    assert error.value.max_size == 400
+
+
+def test_rule_output_too_large(fake_rule, monkeypatch):
+    fake_rule.outputs = {"": json.dumps(list(range(100)))}
+    assert FakeRuleManager().get_output("P000000010") == list(range(100))
+    metrics = get_rule_output_metrics()["get_output"]
+    assert metrics["max_size"] == len(json.dumps(list(range(100))))
+
+    monkeypatch.setenv("RULE_OUTPUT_MAX_SIZE", "100")
+    with pytest.raises(RuleOutputTooLargeError):
+        FakeRuleManager().get_output("P000000010")
+
+
+def test_rule_call_record_mode(fake_rule, monkeypatch, tmp_path):
+    log_path = tmp_path / "rule_calls.log"
+    monkeypatch.setenv("RULE_CALL_RECORD_PATH", str(log_path))
+    monkeypatch.setenv("RULE_CALL_RECORD_KEY", "test-key")
+    fake_rule.outputs = {
+        "": json.dumps({"part": "[1, ", "continuation": "token-1"}),
+        "token-1": json.dumps({"part": "2]", "continuation": ""}),
+    }
+    try:
+        FakeRuleManager().get_chunked_output("P000000010")
+        FakeRuleManager().get_output("jmelius")
+        # A failed rule call is recorded too
+        output = fake_rule.outputs.pop("")
+        with pytest.raises(KeyError):
+            FakeRuleManager().get_output("P000000010")
+    finally:
+        RuleCallRecorder.INSTANCE.close()
+        RuleCallRecorder.INSTANCE = None
+
+    records = read_rule_calls(log_path)
+    assert [(record[1], record[3]) for record in records] == [
+        ("get_chunked_output", len(output)),
+        ("get_chunked_output", len(fake_rule.outputs["token-1"])),
+        ("get_output", len(output)),
+        ("get_output", None),
+    ]
+    assert [record[5] for record in records] == [0, 0, 0, 1]
+    assert records[0][2] == ["P000000010", ""]
+    # The continuation token and the username are redacted, with stable hashes
+    assert records[1][2][1] == redact_rule_argument("token-1", b"test-key") != "token-1"
+    assert records[2][2] == [redact_rule_argument("jmelius", b"test-key")]
+    assert all(record[4] >= 0 for record in records)
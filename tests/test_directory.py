@@ -0,0 +1,67 @@
+from irodsrulewrapper.directory import Directory
+
+ACCOUNTS = {
+    "10043": {"id": "10043", "name": "jmelius", "type": "rodsuser", "displayName": "Jonathan M", "email": "j@um.nl"},
+    "10088": {"id": "10088", "name": "opalmen", "type": "rodsuser", "displayName": "Olav Palmen", "email": "o@um.nl"},
+    "10112": {"id": "10112", "name": "service-mdl", "type": "rodsuser", "displayName": "service-mdl"},
+    "10130": {"id": "10130", "name": "datahub", "type": "rodsgroup", "displayName": "DataHub", "description": "Team"},
+}
+
+
+class FakeRuleManager:
+    def __init__(self):
+        self.accounts = {account_id: dict(account) for account_id, account in ACCOUNTS.items()}
+        self.memberships = [("10043", "10130"), ("10088", "10130")]
+
+    def get_user_accounts(self):
+        return {account_id: dict(account) for account_id, account in self.accounts.items()}
+
+    def get_group_memberships(self):
+        return list(self.memberships)
+
+
+def test_directory_lookups():
+    directory = Directory(FakeRuleManager())
+    directory.refresh()
+
+    assert directory.get_user("10043").user_name == "jmelius"
+    assert directory.get_user("10130") is None
+    assert directory.get_user_by_name("opalmen").user_id == "10088"
+    assert directory.get_user_by_email("J@UM.NL").user_name == "jmelius"
+    assert directory.get_email("jmelius") == "j@um.nl"
+    assert [user.user_id for user in directory.find_users_by_display_name("olav palmen")] == ["10088"]
+    assert directory.get_group_by_name("datahub").description == "Team"
+
+    assert [user.user_name for user in directory.get_users().users] == ["jmelius", "opalmen"]
+    assert len(directory.get_users(show_service_accounts=True).users) == 3
+    assert [group.name for group in directory.get_groups().groups] == ["datahub"]
+    assert [user.user_name for user in directory.get_users_in_group("10130").users] == ["jmelius", "opalmen"]
+    assert [group.name for group in directory.get_user_group_memberships("jmelius").groups] == ["datahub"]
+
+    expanded = directory.get_expanded_user_group_information(["datahub", "unknown"])
+    assert sorted(expanded) == ["datahub", "jmelius", "opalmen"]
+    assert expanded["jmelius"].email == "j@um.nl"
+    assert expanded["datahub"].display_name == "DataHub"
+
+
+def test_directory_incremental_refresh():
+    rule_manager = FakeRuleManager()
+    directory = Directory(rule_manager)
+    directory.refresh()
+
+    rule_manager.accounts["10043"].update(name="jmelius2", email="jm@um.nl")
+    # A deleted AVU has no modification time: it is only found by reloading all the AVUs
+    del rule_manager.accounts["10130"]["displayName"]
+    del rule_manager.accounts["10088"]
+    rule_manager.accounts["10200"] = {"id": "10200", "name": "dlinssen", "type": "rodsuser", "displayName": "Dean"}
+    rule_manager.memberships = [("10043", "10130"), ("10200", "10130")]
+    directory.refresh()
+
+    assert directory.get_user_by_name("jmelius") is None
+    assert directory.get_user_by_email("j@um.nl") is None
+    assert directory.get_user_by_email("jm@um.nl").user_name == "jmelius2"
+    assert directory.get_user("10088") is None
+    assert directory.find_users_by_display_name("Olav Palmen") == []
+    assert [user.user_name for user in directory.get_users_in_group("10130").users] == ["jmelius2", "dlinssen"]
+    assert directory.get_user_group_memberships("opalmen").groups == []
+    assert directory.get_group_by_name("datahub").display_name == ""
@@ -0,0 +1,160 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.convert_uid import cache_user_or_group
+from irodsrulewrapper.dto.active_proces import ActiveProcess
+from irodsrulewrapper.dto.active_processes import ActiveProcesses
+from irodsrulewrapper.dto.attribute_value import AttributeValue
+from irodsrulewrapper.dto.boolean import Boolean
+from irodsrulewrapper.dto.collection import Collection
+from irodsrulewrapper.dto.collection_details import CollectionDetails
+from irodsrulewrapper.dto.collection_size import CollectionSize
+from irodsrulewrapper.dto.collection_sizes import CollectionSizes
+from irodsrulewrapper.dto.collection_stats import CollectionStats
+from irodsrulewrapper.dto.collections import Collections
+from irodsrulewrapper.dto.contributing_project import ContributingProject
+from irodsrulewrapper.dto.contributing_projects import ContributingProjects
+from irodsrulewrapper.dto.create_project import CreateProject
+from irodsrulewrapper.dto.data_steward import DataSteward
+from irodsrulewrapper.dto.data_stewards import DataStewards
+from irodsrulewrapper.dto.drop_zone import DropZone
+from irodsrulewrapper.dto.drop_zones import DropZones
+from irodsrulewrapper.dto.external_pid import ExternalPID
+from irodsrulewrapper.dto.group import Group
+from irodsrulewrapper.dto.groups import Groups
+from irodsrulewrapper.dto.managing_projects import ManagingProjects
+from irodsrulewrapper.dto.metadata_pid import MetadataPID
+from irodsrulewrapper.dto.project import Project
+from irodsrulewrapper.dto.project_activity import ProjectActivity
+from irodsrulewrapper.dto.project_contributors import ProjectContributors
+from irodsrulewrapper.dto.project_contributors_metadata import ProjectContributorsMetadata
+from irodsrulewrapper.dto.project_cost import ProjectCost
+from irodsrulewrapper.dto.project_minimal import ProjectMinimal
+from irodsrulewrapper.dto.projects_cost import ProjectsCost
+from irodsrulewrapper.dto.projects_minimal import ProjectsMinimal
+from irodsrulewrapper.dto.projects_overview import ProjectsOverview
+from irodsrulewrapper.dto.resource import Resource
+from irodsrulewrapper.dto.resources import Resources
+from irodsrulewrapper.dto.token import Token
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.dto.user_extended import UserExtended
+from irodsrulewrapper.dto.user_group_expanded import UserGroupExpanded
+from irodsrulewrapper.dto.user_or_group import UserOrGroup
+from irodsrulewrapper.dto.users import Users
+from irodsrulewrapper.dto.users_groups_expanded import UsersGroupsExpanded
+from irodsrulewrapper.fixtures import RuleResultGenerator, parse_mock_json
+
+GENERATED_DTOS = [
+    ActiveProcess,
+    ActiveProcesses,
+    AttributeValue,
+    Boolean,
+    Collection,
+    CollectionDetails,
+    CollectionSize,
+    CollectionSizes,
+    CollectionStats,
+    Collections,
+    ContributingProject,
+    ContributingProjects,
+    CreateProject,
+    DataSteward,
+    DataStewards,
+    DropZone,
+    DropZones,
+    ExternalPID,
+    Group,
+    Groups,
+    ManagingProjects,
+    MetadataPID,
+    Project,
+    ProjectActivity,
+    ProjectContributors,
+    ProjectContributorsMetadata,
+    ProjectCost,
+    ProjectMinimal,
+    ProjectsCost,
+    ProjectsMinimal,
+    Resource,
+    Resources,
+    Token,
+    User,
+    UserExtended,
+    UserGroupExpanded,
+    UserOrGroup,
+    Users,
+    UsersGroupsExpanded,
+]
+
+
+def test_parse_mock_json_parses_once():
+    from irodsrulewrapper.dto.users import MOCK_JSON
+
+    assert parse_mock_json(MOCK_JSON) is parse_mock_json(MOCK_JSON)
+    assert Users.create_from_mock_result().users == Users.create_from_mock_result().users
+
+
+def test_mock_results_are_not_modified():
+    # The parsed mocks are shared: the factories must not add the missing keys to their input
+    mock_json = '[{"name": "replRescUM01", "comment": "UM"}]'
+    assert Resources.create_from_rule_result(parse_mock_json(mock_json)).resources[0].available is False
+    assert parse_mock_json(mock_json) == json.loads(mock_json)
+
+    result = RuleResultGenerator().project()
+    del result["principalInvestigatorDisplayName"]
+    assert Project.create_from_rule_result(result).principal_investigator_display_name == ""
+    assert "principalInvestigatorDisplayName" not in result
+
+
+def test_mock_dto_changes_are_not_shared():
+    managing_projects = ManagingProjects.create_from_mock_result()
+    managing_projects.managers.append("intruder")
+    assert ManagingProjects.create_from_mock_result().managers == ["psuppers", "opalmen"]
+
+    project = Project.create_from_mock_result()
+    project.collection_metadata_schemas.append("intruder")
+    assert "intruder" not in Project.create_from_mock_result().collection_metadata_schemas
+
+
+def test_generator_is_seeded():
+    assert RuleResultGenerator(seed=1).projects_cost(count=5) == RuleResultGenerator(seed=1).projects_cost(count=5)
+    assert RuleResultGenerator(seed=1).projects_cost(count=5) != RuleResultGenerator(seed=2).projects_cost(count=5)
+
+
+@pytest.mark.parametrize("dto_class", GENERATED_DTOS, ids=lambda dto_class: dto_class.__name__)
+def test_generated_results_are_parsed(dto_class):
+    result = RuleResultGenerator(seed=42).generate(dto_class)
+    # The generated results are json serializable, like a rule output
+    assert dto_class.create_from_rule_result(json.loads(json.dumps(result))) is not None
+
+
+def test_generated_results_size():
+    generator = RuleResultGenerator()
+    assert len(Users.create_from_rule_result(generator.users(count=5000)).users) == 5000
+    assert len(UsersGroupsExpanded.create_from_rule_result(generator.users_groups_expanded(count=500))) == 500
+    assert len(generator.generate(ProjectsCost, count=1000)) == 1000
+
+    project = Project.create_from_rule_result(generator.project(count=50))
+    assert len(project.manager_users.users) == len(project.viewer_groups.groups) == 50
+
+
+def test_generated_projects_overview(monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_VALUE", "86400")
+    generator = RuleResultGenerator(seed=7)
+    result = generator.projects_overview(count=20, members=4)
+    # The members uids are resolved from the users and groups cache
+    for uid, account in generator.accounts.items():
+        cache_user_or_group(uid, account)
+    with patch("irodsrulewrapper.convert_uid.UserRuleManager") as user_rule_manager:
+        projects = ProjectsOverview.create_from_rule_result(result).projects
+    user_rule_manager.return_value.get_user_or_group_by_id.assert_not_called()
+
+    assert len(projects) == 20
+    assert all(len(project.manager_users) == 4 for project in projects)
+    assert all(len(project.contributor_users) + len(project.contributor_groups) == 4 for project in projects)
+    for uid in generator.accounts:
+        CacheTTL.CACHE_USERS_GROUPS.pop(uid, None)
+        CacheTTL.CACHE_USERS_GROUPS_TIMES.pop(uid, None)
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+from irodsrulewrapper.utils import BaseRuleManager
+
+# Run in a fresh interpreter, the test session may already have imported the deferred modules
+DEFERRED_CHECK = """
+import sys
+import irodsrulewrapper.rule
+from irodsrulewrapper.utils import BaseRuleManager
+assert BaseRuleManager.__dict__["ssl_context"].context is None
+assert "concurrent.futures.process" not in sys.modules
+"""
+
+
+def test_import_defers_ssl_context_and_process_pool():
+    subprocess.run([sys.executable, "-c", DEFERRED_CHECK], check=True)
+
+
+def test_ssl_context_created_on_first_access():
+    ssl_context = BaseRuleManager.ssl_context
+    assert ssl_context is BaseRuleManager.ssl_context
+    assert ssl_context.verify_mode.name == "CERT_REQUIRED"
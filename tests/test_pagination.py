@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import pytest
+
+from irodsrulewrapper.pagination import PageIterator
+
+PROJECTS = [f"P0000000{index}" for index in range(10, 17)]
+
+
+def fetch_page(offset, limit):
+    return SimpleNamespace(projects=PROJECTS[offset : offset + limit])
+
+
+@pytest.mark.parametrize("page_size, expected_pages", [(1, 7), (2, 4), (7, 1), (10, 1)])
+def test_page_iterator(page_size, expected_pages):
+    pages = list(PageIterator(fetch_page, page_size))
+    assert len(pages) == expected_pages
+    assert [project for page in pages for project in page.projects] == PROJECTS
+
+
+def test_page_iterator_empty_page():
+    assert list(PageIterator(lambda offset, limit: None, 5)) == []
+
+
+def test_page_iterator_invalid_page_size():
+    with pytest.raises(ValueError):
+        PageIterator(fetch_page, 0)
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from irodsrulewrapper.dto.projects_cost import ProjectsCost
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.dto.users import MOCK_JSON
+from irodsrulewrapper.parallel import ParsingPool, parse_items
+
+
+@pytest.fixture
+def parallel_parsing(monkeypatch):
+    monkeypatch.setenv("DTO_PARALLEL_PARSING_THRESHOLD", "100")
+    monkeypatch.setenv("DTO_PARALLEL_PARSING_WORKERS", "2")
+    yield
+    ParsingPool.shutdown()
+
+
+def test_parse_items_below_threshold(monkeypatch):
+    monkeypatch.setenv("DTO_PARALLEL_PARSING_THRESHOLD", "100")
+    items = json.loads(MOCK_JSON)
+    assert parse_items(User.create_from_rule_result, items) == [User.create_from_rule_result(item) for item in items]
+    assert ParsingPool.EXECUTOR is None
+
+
+def test_parse_items_in_parallel(parallel_parsing):
+    items = json.loads(MOCK_JSON) * 200
+    users = parse_items(User.create_from_rule_result, items)
+    assert ParsingPool.EXECUTOR is not None
+    assert users == [User.create_from_rule_result(item) for item in items]
+
+
+def test_projects_cost_in_parallel(parallel_parsing):
+    items = json.loads(ProjectsCost.PROJECTS_COST_JSON) * 1000
+    projects_cost = ProjectsCost.create_from_rule_result(items)
+    assert len(projects_cost.projects_cost) == len(items)
+    assert [project.project_id for project in projects_cost.projects_cost] == [item["project_id"] for item in items]
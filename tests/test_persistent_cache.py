@@ -0,0 +1,93 @@
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.convert_uid import get_user_or_group, load_users_groups_cache
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
+
+USER_RESULT = {"account_type": "rodsuser", "userName": "jmelius", "displayName": "Jonathan Melius", "userId": "10043"}
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "users_groups.sqlite")
+    monkeypatch.setenv("USERS_GROUPS_CACHE_PATH", path)
+    monkeypatch.setenv("USERS_GROUPS_CACHE_TTL", "3600")
+    monkeypatch.setenv("CACHE_TTL_VALUE", "3600")
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    yield path
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    UsersGroupsStore.INSTANCE = None
+
+
+def write_rows(path, first_uid, count):
+    store = UsersGroupsStore(path)
+    for uid in range(first_uid, first_uid + count):
+        store.set(str(uid), dict(USER_RESULT, userId=str(uid)))
+
+
+def test_store_expiry(store_path, monkeypatch):
+    store = UsersGroupsStore.get_instance()
+    store.set("10043", USER_RESULT)
+    result, queried_at = store.get("10043")
+    assert result == USER_RESULT
+    assert time.time() - 5 < queried_at <= time.time()
+    assert store.get("10044") is None
+
+    monkeypatch.setenv("USERS_GROUPS_CACHE_TTL", "-1")
+    store.set("10044", USER_RESULT)
+    assert store.get("10044") is None
+    assert list(store.load_all()) == ["10043"]
+    store.purge_expired()
+    assert store._connect().execute("SELECT COUNT(*) FROM users_groups").fetchone()[0] == 1
+
+
+def test_store_concurrent_processes(store_path):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=write_rows, args=(store_path, index * 100, 100)) for index in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(UsersGroupsStore.get_instance().load_all()) == 400
+
+
+def test_get_user_or_group_with_store(store_path):
+    calls = []
+
+    def get_user_or_group_by_id(uid):
+        calls.append(uid)
+        return SimpleNamespace(result=USER_RESULT)
+
+    rule_manager = SimpleNamespace(get_user_or_group_by_id=get_user_or_group_by_id, session=None)
+    assert isinstance(get_user_or_group("10043", rule_manager), User)
+    assert calls == ["10043"]
+
+    # A restarted process: the in-memory cache is empty, the user is loaded from the store at warm start
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    load_users_groups_cache()
+    assert get_user_or_group("10043", rule_manager).user_name == "jmelius"
+    assert calls == ["10043"]
+
+
+def test_warm_start_keeps_query_time(store_path):
+    store = UsersGroupsStore.get_instance()
+    store.set("10043", USER_RESULT)
+    # Stored by another process 1000 seconds ago
+    with store._connect() as connection:
+        connection.execute("UPDATE users_groups SET expires_at = expires_at - 1000")
+
+    load_users_groups_cache()
+    assert abs(CacheTTL.CACHE_USERS_GROUPS_TIMES["10043"] - (time.time() - 1000)) < 5
+
+    # Same for a user read from the store on a cache miss
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    CacheTTL.CACHE_USERS_GROUPS_TIMES.clear()
+    assert get_user_or_group("10043", rule_manager=None).user_name == "jmelius"
+    assert abs(CacheTTL.CACHE_USERS_GROUPS_TIMES["10043"] - (time.time() - 1000)) < 5
+    CacheTTL.CACHE_USERS_GROUPS_TIMES.clear()
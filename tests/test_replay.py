@@ -0,0 +1,120 @@
+import contextlib
+import json
+from types import SimpleNamespace
+
+from irodsrulewrapper import decorator
+from irodsrulewrapper.replay import READ_RULES, FakeTransport, ReplayRuleManager, get_percentile, main, replay
+
+
+class FakeRule:
+    """Replace irods.rule.Rule, to record the rule body and input parameters."""
+
+    calls = []
+
+    def __init__(self, session, rule_file=None, params=None, **kwargs):
+        FakeRule.calls.append((rule_file.read().decode("utf-8"), params))
+
+    def execute(self, session_cleanup=True):
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=b'{"id": "P000000010"}\0'))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+class FakeReplayRuleManager(ReplayRuleManager):
+    def __init__(self):
+        self.session = SimpleNamespace(host="icat.dh.local", port=1247, zone="nlmumc", username="rods")
+        # No iRODS session to clean up
+        self.closed = True
+
+    def checkout_session(self):
+        return contextlib.nullcontext(self.session)
+
+
+def create_records(count, interval, latency):
+    return [
+        (
+            1700000000.0 + index * interval,
+            "get_project_details" if index % 2 else "get_groups",
+            ["false"],
+            42,
+            latency,
+            0,
+        )
+        for index in range(count)
+    ]
+
+
+class FailingTransport:
+    """Fail the rule calls, like an iRODS server given an unknown username"""
+
+    def execute(self, record):
+        raise ValueError(record[1])
+
+
+def test_get_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert get_percentile(values, 50) == 50.0
+    assert get_percentile(values, 99) == 99.0
+    assert get_percentile([3.0], 90) == 3.0
+
+
+def test_replay_fake_transport():
+    # 1 second of traffic, replayed 10 times faster
+    report = replay(create_records(20, 0.05, 0.01), FakeTransport(), speed=10, concurrency=4)
+    assert report["calls"] == 20
+    assert report["errors"] == 0
+    assert report["duration"] < 0.5
+    assert set(report["rules"]) == {"get_groups", "get_project_details"}
+    rule_report = report["rules"]["get_groups"]
+    assert rule_report["calls"] == 10
+    assert 0.01 <= rule_report["p50"] <= rule_report["p99"] <= rule_report["max"]
+
+
+def test_replay_concurrency_lag():
+    # 10 calls of 50 ms at once with 1 worker: the last one starts ~450 ms late
+    report = replay(create_records(10, 0, 0.05), FakeTransport(), concurrency=1)
+    assert report["max_lag"] >= 0.4
+    assert replay(create_records(10, 0, 0.05), FakeTransport(), concurrency=10)["max_lag"] < 0.04
+
+
+def test_replay_rules_filter():
+    records = create_records(6, 0, 0.001)
+    records.append((1700000000.0, "set_project_acl", ["P000000010", "~3f2a9c41d0be", "own"], None, 0.001, 0))
+    report = replay(records, FakeTransport(), rules=READ_RULES)
+    assert report["calls"] == 6
+    assert report["skipped"] == 1
+    assert "set_project_acl" not in report["rules"]
+
+
+def test_replay_errors():
+    records = [
+        (1700000000.0, "get_user_attribute_value", ["~3f2a9c41d0be", "email", "true"], None, 0.001, 0),
+        (1700000000.0, "get_project_details", ["/nlmumc/projects/P000000010", "false"], None, 0.001, 0),
+    ]
+    report = replay(records, FailingTransport())
+    assert report["errors"] == report["redacted_errors"] == 1
+    assert report["rules"]["get_user_attribute_value"]["redacted_errors"] == 1
+    # The failures on redacted arguments are left out of the latency percentiles
+    assert report["rules"]["get_user_attribute_value"]["p50"] is None
+    assert report["rules"]["get_project_details"]["errors"] == 1
+
+    # The calls which failed when they were recorded fail again on the fake transport
+    report = replay([records[1][:5] + (1,)], FakeTransport())
+    assert report["errors"] == 1
+
+
+def test_replay_rule_call(monkeypatch):
+    monkeypatch.setattr(decorator, "Rule", FakeRule)
+    FakeRule.calls = []
+    result = FakeReplayRuleManager().replay_rule_call("get_project_details", True, "P000000010", "~3f2a9c41d0be")
+    assert result == {"id": "P000000010"}
+    rule_body, params = FakeRule.calls[0]
+    assert "get_project_details(*arg2,*arg3,*result);" in rule_body
+    assert params == {"*arg2": '"P000000010"', "*arg3": '"~3f2a9c41d0be"'}
+
+
+def test_replay_cli(tmp_path, capsys):
+    log_path = tmp_path / "rule_calls.log"
+    log_path.write_text("\n".join(json.dumps(record) for record in create_records(4, 0.01, 0.001)) + "\n")
+    report = main([str(log_path), "--speed", "2", "--latency-scale", "0.5"])
+    assert report["calls"] == 4
+    assert "get_project_details" in capsys.readouterr().out
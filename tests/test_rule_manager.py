@@ -0,0 +1,479 @@
+import fnmatch
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from irods.exception import (
+    CAT_NO_ACCESS_PERMISSION,
+    NO_RULE_OR_MSI_FUNCTION_FOUND_ERR,
+    DataObjectDoesNotExist,
+    NetworkException,
+    iRODSException,
+)
+from irods.models import Collection, DataObject
+
+from irodsrulewrapper import decorator
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.dto.groups import MOCK_JSON, Groups
+from irodsrulewrapper.rule import PathKind, RuleManager
+from irodsrulewrapper.rule_managers import projects, users
+from irodsrulewrapper.rule_managers.groups import GroupRuleManager
+from irodsrulewrapper.rule_managers.users import split_expanded_info_batches
+from irodsrulewrapper.utils import RuleInputValidationError
+
+THREADS = 64
+CALLS_PER_THREAD = 20
+
+
+class FakeSession:
+    """Count the rule executions in flight, and the cleanups done while some were in flight."""
+
+    host = "icat.dh.local"
+    port = 1247
+    zone = "nlmumc"
+    username = "rods"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.executions = 0
+        self.cleanups = 0
+        self.unsafe_cleanups = 0
+
+    def cleanup(self):
+        with self.lock:
+            self.cleanups += 1
+            if self.in_flight:
+                self.unsafe_cleanups += 1
+
+
+class FakeRule:
+    def __init__(self, session, **kwargs):
+        self.session = session
+
+    def execute(self, session_cleanup=True):
+        with self.session.lock:
+            self.session.in_flight += 1
+            self.session.executions += 1
+        time.sleep(0.001)
+        with self.session.lock:
+            self.session.in_flight -= 1
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=MOCK_JSON.encode("utf-8") + b"\0"))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+class FakeGroupRuleManager(GroupRuleManager):
+    def init_irods_session(self, client_user, admin_mode, with_config=None):
+        self.session = FakeSession()
+
+
+@pytest.fixture
+def rule_manager(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    monkeypatch.setattr(decorator, "Rule", FakeRule)
+    return FakeGroupRuleManager(admin_mode=True)
+
+
+def test_rule_manager_shared_by_threads(rule_manager):
+    session = rule_manager.session
+    stop = threading.Event()
+
+    def get_groups(thread_index):
+        return [rule_manager.get_groups("true") for _ in range(CALLS_PER_THREAD)]
+
+    def cleanup_loop():
+        while not stop.is_set():
+            rule_manager.cleanup()
+
+    cleanup_thread = threading.Thread(target=cleanup_loop)
+    cleanup_thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            results = list(executor.map(get_groups, range(THREADS)))
+    finally:
+        stop.set()
+        cleanup_thread.join()
+
+    expected = Groups.create_from_mock_result()
+    assert all(groups == expected for thread_results in results for groups in thread_results)
+    assert session.executions == THREADS * CALLS_PER_THREAD
+    assert session.cleanups > 0
+    assert session.unsafe_cleanups == 0
+    assert rule_manager.active_calls == 0
+
+
+def test_rule_manager_close(rule_manager):
+    session = rule_manager.session
+    with rule_manager:
+        assert rule_manager.get_groups("true") is not None
+    assert rule_manager.closed
+    assert session.cleanups == 1
+
+    rule_manager.close()
+    assert session.cleanups == 1
+    with pytest.raises(RuntimeError):
+        rule_manager.get_groups("true")
+
+
+class FakeDataObjects:
+    def __init__(self, failures):
+        self.failures = failures
+        self.unlinked = []
+
+    def unlink(self, full_path, force=False):
+        failure = self.failures.get(full_path)
+        if failure:
+            # Each path fails as many times as listed
+            self.failures[full_path] = failure[1:]
+            raise failure[0]
+        self.unlinked.append(full_path)
+
+
+class FakeDataObjectsRuleManager(RuleManager):
+    def init_irods_session(self, client_user, admin_mode, with_config=None):
+        self.session = FakeSession()
+
+
+def test_remove_data_objects_partial_failure():
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    collection = "/nlmumc/ingest/zones/crazy-frog"
+    data_objects = FakeDataObjects(
+        {
+            f"{collection}/retried.txt": [NetworkException("timeout")],
+            f"{collection}/missing.txt": [DataObjectDoesNotExist()],
+            f"{collection}/unreachable.txt": [NetworkException("timeout")] * decorator.MAX_RETRY_API_CALL,
+        }
+    )
+    rule_manager.session.data_objects = data_objects
+    paths = [f"{collection}/{name}" for name in ["ok.txt", "retried.txt", "missing.txt", "unreachable.txt"]]
+
+    result = rule_manager.remove_data_objects(paths, force=True, max_workers=4)
+
+    assert result[f"{collection}/ok.txt"] == {"status": "ok", "retries": 0, "error": None}
+    assert result[f"{collection}/retried.txt"] == {"status": "retried", "retries": 1, "error": None}
+    assert result[f"{collection}/missing.txt"]["status"] == "error"
+    assert result[f"{collection}/unreachable.txt"]["status"] == "error"
+    assert result[f"{collection}/unreachable.txt"]["retries"] == decorator.MAX_RETRY_API_CALL - 1
+    assert sorted(data_objects.unlinked) == [f"{collection}/ok.txt", f"{collection}/retried.txt"]
+
+
+def test_remove_data_objects_invalid_path():
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    rule_manager.session.data_objects = FakeDataObjects({})
+    paths = ["/nlmumc/ingest/zones/crazy-frog/ok.txt", "/nlmumc/ingest/zones/crazy-frog/../../../projects"]
+    with pytest.raises(RuleInputValidationError):
+        rule_manager.remove_data_objects(paths, force=True)
+    assert rule_manager.session.data_objects.unlinked == []
+
+
+class SetAclsRule:
+    """Set the ACLs of the rule call, failing for the users in 'errors', and keep the rule texts."""
+
+    bodies = []
+    errors = {}
+    applied = []
+
+    def __init__(self, session, rule_file=None, params=None, **kwargs):
+        self.body = rule_file.read().decode("utf-8")
+        SetAclsRule.bodies.append(self.body)
+        self.params = params
+
+    def execute(self, session_cleanup=True):
+        statuses = []
+        for index in range(len(self.params) // 4):
+            user = self.params[f"*u{index}"].strip('"')
+            statuses.append(SetAclsRule.errors.get(user, 0))
+            SetAclsRule.applied.append(user)
+            if statuses[-1] and "*e=0;" in self.body:
+                # stop_on_error: the number of applied entries and the last status
+                statuses = [len(statuses), statuses[-1]]
+                break
+        else:
+            if "*e=0;" in self.body:
+                statuses = [len(statuses), 0]
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=json.dumps(statuses).encode("utf-8")))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+@pytest.fixture
+def set_acls_rule(monkeypatch):
+    monkeypatch.setattr(decorator, "Rule", SetAclsRule)
+    SetAclsRule.bodies = []
+    SetAclsRule.errors = {}
+    SetAclsRule.applied = []
+    return SetAclsRule
+
+
+def test_set_acls_chunks(set_acls_rule):
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    acls = [("default", "read_object", f"user{index}", "/nlmumc/projects/P000000010") for index in range(120)]
+
+    assert rule_manager.set_acls(acls) == [0] * 120
+    assert len(SetAclsRule.bodies) == 3
+    # iRODS rejects rule texts longer than META_STR_LEN
+    assert all(len(body) < 2700 for body in SetAclsRule.bodies)
+
+
+def test_set_acls_stop_on_error(set_acls_rule):
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    acls = [("default", "read_object", f"user{index}", "/nlmumc/projects/P000000010") for index in range(100)]
+    set_acls_rule.errors = {"user5": -818000, "user45": -818000}
+
+    assert rule_manager.set_acls(acls) == [0] * 5 + [-818000] + [0] * 39 + [-818000] + [0] * 54
+    set_acls_rule.bodies = []
+    set_acls_rule.applied = []
+    assert rule_manager.set_acls(acls, stop_on_error=True) == [0] * 5 + [-818000] + [None] * 94
+    assert set_acls_rule.applied == [f"user{index}" for index in range(6)]
+
+    set_acls_rule.bodies = []
+    set_acls_rule.errors = {}
+    assert rule_manager.set_acls(acls, stop_on_error=True) == [0] * 100
+    assert all(len(body) < 2700 for body in set_acls_rule.bodies)
+
+
+@pytest.mark.parametrize("code, exception_class", [(-818000, CAT_NO_ACCESS_PERMISSION), (-12345678, iRODSException)])
+def test_ingest_stops_at_failing_acl(set_acls_rule, code, exception_class):
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    set_acls_rule.errors = {"jmelius": code}
+    with patch.object(RuleManager, "start_ingest") as start_ingest:
+        with pytest.raises(exception_class) as error:
+            rule_manager.ingest("jmelius", "crazy-frog", "direct")
+    assert error.value.code == code
+    # The recursive 'rods' ACL and the ingestion are not started
+    assert set_acls_rule.applied == ["jmelius"]
+    start_ingest.assert_not_called()
+
+
+def test_set_acls_invalid_entry():
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    with pytest.raises(RuleInputValidationError):
+        rule_manager.set_acls([("default", "own", "opalmen", "/nlmumc/projects/P000000010"), ("all", "own", "a", "/")])
+
+
+class ExpandedInfoRule:
+    """Expand each 'group<n>' to the members 'user<n>' & 'user<n+1>', and count the rule calls."""
+
+    calls = []
+
+    def __init__(self, session, params=None, **kwargs):
+        self.names = list(params.values())[0].strip('"').split(";")
+        ExpandedInfoRule.calls.append(self.names)
+
+    def execute(self, session_cleanup=True):
+        output = {}
+        for name in self.names:
+            output[name] = {"displayName": name.capitalize()}
+            if name.startswith("group"):
+                index = int(name[len("group") :])
+                for member in (f"user{index}", f"user{index + 1}"):
+                    output[member] = {"displayName": member.capitalize(), "email": f"{member}@um.nl"}
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=json.dumps(output).encode("utf-8")))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+def test_split_expanded_info_batches():
+    assert split_expanded_info_batches({"c", "a", "b"}, max_size=2) == [["a", "b"], ["c"]]
+    batches = split_expanded_info_batches(["aaaa", "bb", "c", "dddddd"], max_length=4)
+    assert batches == [["aaaa"], ["bb", "c"], ["dddddd"]]
+
+
+def test_get_expanded_user_group_information_batches(monkeypatch):
+    monkeypatch.setattr(decorator, "Rule", ExpandedInfoRule)
+    monkeypatch.setattr(users, "EXPANDED_INFO_BATCH_SIZE", 4)
+    monkeypatch.setenv("RULE_OUTPUT_MAX_SIZE", "400")
+    ExpandedInfoRule.calls = []
+    rule_manager = FakeDataObjectsRuleManager(admin_mode=True)
+    names = {f"group{index}" for index in range(6)} | {"user0", "user3"}
+
+    result = rule_manager.get_expanded_user_group_information(names)
+
+    assert sorted(result) == sorted({f"group{index}" for index in range(6)} | {f"user{index}" for index in range(7)})
+    assert result["user3"].email == "user3@um.nl"
+    # The output of the first batch (4 groups) exceeds RULE_OUTPUT_MAX_SIZE, the batch is split in two
+    assert sorted(len(batch) for batch in ExpandedInfoRule.calls) == [2, 2, 4, 4]
+
+
+class FakeQuery:
+    """Replace a GenQuery on the catalog rows: the rows having all the columns, filtered, distinct and paged."""
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.criteria = []
+        self.batch_size = None
+        self.order = None
+
+    def filter(self, *criteria):
+        self.criteria.extend(criteria)
+        return self
+
+    def limit(self, batch_size):
+        self.batch_size = batch_size
+        return self
+
+    def order_by(self, column):
+        self.order = column
+        return self
+
+    def get_results(self):
+        results = []
+        for row in self.rows:
+            if all(column in row for column in self.columns) and all(matches(row, c) for c in self.criteria):
+                result = {column: row[column] for column in self.columns}
+                if result not in results:
+                    results.append(result)
+        if self.order is not None:
+            results.sort(key=lambda result: result[self.order])
+        return results
+
+    def get_batches(self):
+        results = self.get_results()
+        batch_size = self.batch_size or max(len(results), 1)
+        for index in range(0, len(results), batch_size):
+            yield results[index : index + batch_size]
+
+    def __iter__(self):
+        return iter(self.get_results())
+
+
+def matches(row, criterion):
+    value = row.get(criterion.query_key)
+    if criterion.op == "like":
+        return value is not None and fnmatch.fnmatchcase(value, criterion._value.replace("%", "*"))
+    if criterion.op == "in":
+        return value in criterion._value
+    return value == criterion._value
+
+
+class FakeCatalogSession(FakeSession):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def query(self, *columns):
+        return FakeQuery(self.rows, columns)
+
+
+class FakeCatalogRuleManager(RuleManager):
+    def init_irods_session(self, client_user, admin_mode, with_config=None):
+        self.session = FakeCatalogSession([])
+
+
+def collection_row(path):
+    return {Collection.name: path, Collection.parent_name: path.rsplit("/", 1)[0]}
+
+
+def data_object_row(collection, data_object_id, resource, size):
+    row = collection_row(collection)
+    row.update({DataObject.id: data_object_id, DataObject.resource_name: resource, DataObject.size: str(size)})
+    return row
+
+
+def test_get_collection_stats_replicas():
+    rule_manager = FakeCatalogRuleManager(admin_mode=True)
+    collection = "/nlmumc/projects/P000000010/C000000001"
+    rule_manager.session.rows = [
+        data_object_row(collection, 1, "replRescUM01", 100),
+        # A stale replica, of another size: the data object is counted once
+        data_object_row(collection, 1, "arcRescSURF01", 80),
+        data_object_row(f"{collection}/sub", 2, "replRescUM01", 50),
+        data_object_row(f"{collection}/sub", 3, "replRescUM01", 50),
+        data_object_row("/nlmumc/projects/P000000010/C000000002", 4, "replRescUM01", 10),
+    ]
+    stats = rule_manager.get_collection_stats(collection, batch_size=1)
+    assert (stats.total_file_count, stats.total_file_size) == (3, 200)
+
+
+def test_get_project_collection_sizes_empty_collection():
+    rule_manager = FakeCatalogRuleManager(admin_mode=True)
+    project = "/nlmumc/projects/P000000010"
+    rule_manager.session.rows = [
+        collection_row(f"{project}/C000000002"),
+        data_object_row(f"{project}/C000000001", 1, "replRescUM01", 300),
+        data_object_row(f"{project}/C000000001/sub", 2, "arcRescSURF01", 100),
+        data_object_row(project, 3, "replRescUM01", 10),
+    ]
+    result = rule_manager.get_project_collection_sizes("P000000010", batch_size=2)
+    assert sorted(result.collection_sizes) == ["C000000001", "C000000002"]
+    assert result.collection_sizes["C000000002"] == []
+    assert [size.resource for size in result.collection_sizes["C000000001"]] == ["replRescUM01", "arcRescSURF01"]
+
+
+def test_exists_many_same_name():
+    rule_manager = FakeCatalogRuleManager(admin_mode=True)
+    collection = "/nlmumc/projects/P000000010/C000000001"
+    instance = {Collection.name: collection, DataObject.name: "instance.json"}
+    rule_manager.session.rows = [collection_row(collection), collection_row(f"{collection}/sub"), instance]
+    paths = [f"{collection}/sub", f"{collection}/sub/", f"{collection}/instance.json", f"{collection}/instance.json"]
+    result = rule_manager.exists_many(paths + [f"{collection}/missing.json"])
+    assert result == {
+        f"{collection}/sub": PathKind.COLLECTION,
+        f"{collection}/sub/": PathKind.COLLECTION,
+        f"{collection}/instance.json": PathKind.DATA_OBJECT,
+        f"{collection}/missing.json": PathKind.MISSING,
+    }
+
+
+class ProjectsPageRule:
+    """Return an empty project list, and keep the rule input parameters."""
+
+    params = []
+
+    def __init__(self, session, rule_file=None, params=None, **kwargs):
+        ProjectsPageRule.params.append(params)
+
+    def execute(self, session_cleanup=True):
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=b"[]"))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+def test_projects_overview_page_filters(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    monkeypatch.setattr(decorator, "Rule", ProjectsPageRule)
+    ProjectsPageRule.params = []
+    rule_manager = FakeDataObjectsRuleManager("jmelius")
+    rule_manager.get_projects_overview_page(0, 10, principal_investigator="psuppers", data_steward="opalmen")
+
+    # The filters are keyed by the project AVU names, see get_projects_overview_page
+    filters = """'{"OBI:0000103": "psuppers", "dataSteward": "opalmen"}'"""
+    assert list(ProjectsPageRule.params[0].values()) == ['"0"', '"10"', filters]
+    with pytest.raises(RuleInputValidationError, match=r"\*principal_investigator"):
+        rule_manager.get_projects_overview_page(0, 10, principal_investigator=None)
+
+
+class MissingModifiedSinceRule:
+    """Return empty project lists, the rule optimized_list_projects_modified_since is not installed."""
+
+    calls = []
+
+    def __init__(self, session, rule_file=None, body="", **kwargs):
+        rule_text = rule_file.read().decode("utf-8") if rule_file else body
+        self.name = next(name for name in ("modified_since", "minimal", "optimized") if name in rule_text)
+
+    def execute(self, session_cleanup=True):
+        MissingModifiedSinceRule.calls.append(self.name)
+        if self.name == "modified_since":
+            raise NO_RULE_OR_MSI_FUNCTION_FOUND_ERR()
+        stdout = SimpleNamespace(stdoutBuf=SimpleNamespace(buf=b"[]"))
+        return SimpleNamespace(MsParam_PI=[SimpleNamespace(inOutStruct=stdout)])
+
+
+def test_projects_overview_incremental_without_modified_since_rule(monkeypatch):
+    monkeypatch.delenv("IRODS_NAMED_RULE_CALLS", raising=False)
+    monkeypatch.setenv("CACHE_TTL_VALUE", "3600")
+    monkeypatch.setattr(decorator, "Rule", MissingModifiedSinceRule)
+    monkeypatch.setattr(projects, "MODIFIED_SINCE_RULE_SUPPORT", {})
+    MissingModifiedSinceRule.calls = []
+    rule_manager = FakeDataObjectsRuleManager("jmelius")
+    try:
+        for _ in range(3):
+            assert rule_manager.get_projects_overview_incremental().projects == []
+    finally:
+        CacheTTL.CACHE_PROJECTS_OVERVIEW.pop("rods", None)
+
+    # The missing rule is only called once, then the full overview is requested
+    assert MissingModifiedSinceRule.calls == ["optimized", "modified_since", "optimized", "optimized"]
@@ -1,8 +1,15 @@
+import array
+import datetime
+import json
+
 import pytest
 
 from dhpythonirodsutils import validators
 from dhpythonirodsutils.exceptions import ValidationError
 
+from irodsrulewrapper.rule import split_in_values
+from irodsrulewrapper.utils import convert_many_to_current_timezone, convert_to_current_timezone, iter_json_array
+
 
 @pytest.mark.parametrize(
     "path, expected_result",
@@ -22,3 +29,76 @@ def test_is_safe_path(path, expected_result):
     except ValidationError:
         result = False
     assert result is expected_result
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[]",
+        " [ ]\n",
+        "[1]",
+        '[1, "a,]", {"b": [2, 3]}, null]',
+        '\n[\n  {"userName": "jmelius"},\n  {"userName": "opalmen"}\n]\n',
+    ],
+)
+def test_iter_json_array(text):
+    assert list(iter_json_array(text)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1 2]", "[1,", '"a"'])
+def test_iter_json_array_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(text))
+
+
+def test_split_in_values():
+    values = ["a" * 7] * 10
+    # Each formatted value takes 10 characters: "'aaaaaaa'," and the list adds a parenthesis
+    chunks = split_in_values(values, max_length=31)
+    assert chunks == [["a" * 7] * 3] * 3 + [["a" * 7]]
+    assert split_in_values(["a" * 50, "b"], max_length=31) == [["a" * 50], ["b"]]
+    assert split_in_values([]) == []
+
+
+@pytest.mark.parametrize(
+    "date, expected_result",
+    [
+        ("2022-01-15 12:30:00", "2022-01-15 13:30:00"),
+        ("2022-07-15 12:30:00", "2022-07-15 14:30:00"),
+        # Daylight saving time transitions
+        ("2022-03-27 00:59:59", "2022-03-27 01:59:59"),
+        ("2022-03-27 01:00:00", "2022-03-27 03:00:00"),
+        ("2022-10-30 00:30:00", "2022-10-30 02:30:00"),
+        ("2022-10-30 01:30:00", "2022-10-30 02:30:00"),
+        (datetime.datetime(2022, 7, 15, 12, 30), "2022-07-15 14:30:00"),
+        (1657888200, "2022-07-15 14:30:00"),
+        (1657888200.75, "2022-07-15 14:30:00"),
+    ],
+)
+def test_convert_to_current_timezone(date, expected_result):
+    assert convert_to_current_timezone(date) == expected_result
+
+
+def test_convert_many_to_current_timezone():
+    dates = ["2022-01-15 12:30:00", 1657888200, "2022-01-15 12:30:00"]
+    assert convert_many_to_current_timezone(dates) == ["2022-01-15 13:30:00", "2022-07-15 14:30:00"] + [
+        "2022-01-15 13:30:00"
+    ]
+    assert convert_many_to_current_timezone(dates, "%d/%m/%Y %H:%M %Z") == [
+        "15/01/2022 13:30 CET",
+        "15/07/2022 14:30 CEST",
+        "15/01/2022 13:30 CET",
+    ]
+    assert convert_many_to_current_timezone([]) == []
+
+
+def test_convert_many_to_current_timezone_array():
+    expected = ["2022-01-15 13:30:00", "2022-07-15 14:30:00"]
+    assert convert_many_to_current_timezone(array.array("q", [1642249800, 1657888200])) == expected
+    assert convert_many_to_current_timezone(array.array("d", [1642249800.0, 1657888200.0])) == expected
+
+
+@pytest.mark.parametrize("date", ["2022-01-15T12:30:00", "2022-01-15 12:30", "15-01-2022 12:30:00"])
+def test_convert_to_current_timezone_invalid(date):
+    with pytest.raises(ValueError):
+        convert_to_current_timezone(date)
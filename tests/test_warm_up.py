@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from irods.exception import NetworkException
+
+from irodsrulewrapper import warm_up
+from irodsrulewrapper.cache import CacheTTL
+from irodsrulewrapper.dto.group import Group
+from irodsrulewrapper.dto.user import User
+from irodsrulewrapper.persistent_cache import UsersGroupsStore
+
+USERS = [User(user_name="jmelius", user_id="10043", display_name="Jonathan Melius")]
+GROUPS = [Group(name="datahub", id="10130", display_name="DataHub", description="Group of the DataHub team")]
+
+
+class FakeRuleManager:
+    overviews = []
+    lock = threading.Lock()
+
+    def __init__(self, client_user=None, config=None, admin_mode=False):
+        self.client_user = client_user
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def iter_users(self, show_service_accounts):
+        return iter(USERS)
+
+    def iter_groups(self, show_service_accounts):
+        return iter(GROUPS)
+
+    def get_projects_overview_incremental(self):
+        if self.client_user == "unknown":
+            raise NetworkException("Connection refused")
+        with self.lock:
+            self.overviews.append(self.client_user)
+
+
+@pytest.fixture
+def fake_rule_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(warm_up, "RuleManager", FakeRuleManager)
+    monkeypatch.setenv("CACHE_TTL_VALUE", "3600")
+    monkeypatch.setenv("USERS_GROUPS_CACHE_PATH", str(tmp_path / "users_groups.sqlite"))
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    FakeRuleManager.overviews = []
+    yield FakeRuleManager
+    CacheTTL.CACHE_USERS_GROUPS.clear()
+    UsersGroupsStore.INSTANCE = None
+
+
+def test_warm_caches(fake_rule_manager):
+    report = warm_up.warm_caches(["jmelius", "opalmen", "unknown"], max_workers=2)
+
+    assert CacheTTL.CACHE_USERS_GROUPS == {"10043": USERS[0], "10130": GROUPS[0]}
+    stored = UsersGroupsStore.get_instance().load_all()
+    assert User.create_from_rule_result(stored["10043"][0]) == USERS[0]
+    assert Group.create_from_rule_result(stored["10130"][0]) == GROUPS[0]
+
+    assert sorted(fake_rule_manager.overviews) == ["jmelius", "opalmen"]
+    assert report["users"] == 1
+    assert report["groups"] == 1
+    assert report["projects_overviews"] == 2
+    assert report["failed_projects_overviews"] == 1
+    assert set(report["timings"]) == {"get_users", "get_groups", "users_groups_cache", "projects_overviews", "total"}
+
+
+def test_warm_caches_cli(fake_rule_manager, capsys):
+    report = warm_up.main(["--max-workers", "1"])
+
+    assert report["projects_overviews"] == 0
+    assert "projects_overviews" not in report["timings"]
+    assert "Cached 1 users and 1 groups" in capsys.readouterr().out